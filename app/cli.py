@@ -0,0 +1,239 @@
+"""
+Command line interface for scripts, cron jobs and shell hooks.
+
+Usage:
+    python -m app.cli COMMAND [options] [--db PATH] [--user NAME]
+
+Commands:
+    add NAME [--category C] [--deadline YYYY-MM-DD] [--priority]
+    list [--open | --done] [--sort name|deadline|priority|category] [--search TEXT]
+    start TASK_ID
+    stop [TASK_ID]
+    status
+    export PATH [--table T ...] [--start DATE] [--end DATE]
+    import {tasks,entries} PATH
+    report {period,task,category,velocity,deadlines} [--start DATE] [--end DATE] [--period P]
+    serve [--host 127.0.0.1] [--port 8765] [--readers 4]   (HTTP/JSON API, see app/server.py)
+
+Every command acts for one user (--user, default: default_user): other
+users' tasks and timers in the same database are not visible. A timer
+started here keeps running after the command exits (the session
+is detached, see TimerRegistry.detach_all) until `stop`, or until the GUI
+picks it up. Sessions a running GUI or API server is timing are left to
+it: `status` lists them as "held" and `start`/`stop` don't touch them.
+Output is tab-separated for use in pipes.
+
+Only the modules a command needs are imported, and never tkinter, so a
+call costs little more than opening the database.
+"""
+import argparse
+import sys
+
+# Commands understood by main(); main.py hands these over to the CLI
+COMMANDS = ("add", "list", "start", "stop", "status", "export", "import", "report", "serve")
+
+# report command -> (ReportController method, default period)
+REPORTS = {
+    "period": ("time_per_period", "day"),
+    "task": ("time_per_task", "all"),
+    "category": ("time_per_category", "all"),
+    "velocity": ("completion_velocity", "week"),
+    "deadlines": ("deadline_adherence", "month"),
+}
+
+
+def _print_rows(rows, columns):
+    """Print a header line and one tab-separated line per row"""
+    print("\t".join(columns))
+    for row in rows:
+        print("\t".join("" if row[column] is None else str(row[column]) for column in columns))
+
+
+def cmd_add(db, args):
+    from app.controllers.task_controller import TaskController
+
+    task_id = TaskController(db, owner=args.user).create_task(args.name, category=args.category,
+                                             deadline=args.deadline, priority=args.priority)
+    print(task_id)
+
+
+def cmd_list(db, args):
+    from app.controllers.task_controller import TaskController
+
+    tasks = TaskController(db, owner=args.user)
+    completed = True if args.done else False if args.open else None
+    if args.search:
+        rows = tasks.search(args.search, completed=completed, limit=args.limit)
+    else:
+        rows = tasks.get_filtered_tasks(completed=completed, sort_by=args.sort)
+    _print_rows(rows, ("id", "name", "category", "deadline", "priority", "completed", "total_time"))
+
+
+def cmd_start(db, args):
+    from app.controllers.timer_controller import TimerRegistry
+
+    # Pick up timers started by earlier calls, so a paused or running
+    # session of the task continues instead of a second one starting
+    registry = TimerRegistry(db, owner=args.user)
+    registry.recover(resume=True, task_ids=[args.task_id])
+    try:
+        print(registry.start(args.task_id))
+    finally:
+        registry.detach_all()
+
+
+def cmd_stop(db, args):
+    from app.controllers.timer_controller import TimerRegistry
+
+    # Only claim the session being stopped; other crashed ones are left
+    # for the GUI (or a later stop) to recover
+    registry = TimerRegistry(db, owner=args.user)
+    registry.recover(resume=True, task_ids=None if args.task_id is None else [args.task_id])
+    try:
+        if args.task_id is not None:
+            durations = registry.stop_many([args.task_id])
+        else:
+            durations = registry.stop_all()
+    finally:
+        registry.detach_all()
+    for task_id, seconds in durations.items():
+        print(f"{task_id}\t{seconds}")
+
+
+def cmd_status(db, args):
+    from app.controllers.timer_controller import TimerRegistry
+
+    rows = [dict(session, state="running" if session["detached"] else "held" if session["held"] else "paused")
+            for session in TimerRegistry(db, owner=args.user).stored_sessions()]
+    _print_rows(rows, ("task_id", "entry_id", "start_time", "seconds", "state"))
+
+
+def cmd_export(db, args):
+    from app.controllers.export_controller import ExportController
+
+    files = ExportController(db, owner=args.user).export(args.path, tables=args.table, start=args.start, end=args.end)
+    for table, path in files.items():
+        print(f"{table}\t{path}")
+
+
+def cmd_import(db, args):
+    from app.controllers.import_controller import ImportController
+
+    importer = ImportController(db, owner=args.user)
+    run = importer.import_tasks if args.kind == "tasks" else importer.import_time_entries
+    report = run(args.path)
+    print(f"rows\t{report.rows}\ninserted\t{report.inserted}\n"
+          f"duplicates\t{report.duplicates}\nerrors\t{report.error_count}")
+    for line, message in report.errors:
+        print(f"line {line}: {message}", file=sys.stderr)
+    return 1 if report.error_count else 0
+
+
+def cmd_report(db, args):
+    from app.controllers.report_controller import ReportController
+
+    method, default_period = REPORTS[args.kind]
+    rows = getattr(ReportController(db, cache_size=0, owner=args.user), method)(
+        start=args.start, end=args.end, period=args.period or default_period
+    )
+    _print_rows(rows, rows[0].keys() if rows else ("period",))
+
+
+def cmd_serve(db, args):
+    from app import server
+
+    server.run(db, args.host, args.port, args.readers, owner=args.user)
+
+
+def build_parser():
+    """Create the argument parser with one sub-command per command"""
+    # Database options, accepted after any command
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--db", default="time_app.db", help="Path to the SQLite database file")
+    common.add_argument("--db-profile", default="wal", help="SQLite connection profile (default: wal)")
+    common.add_argument("--user", default="default_user", help="User to act for (default: default_user)")
+
+    parser = argparse.ArgumentParser(prog="time-tamer", description="My Time Tamer (command line)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", parents=[common], help="Create a task")
+    add.add_argument("name")
+    add.add_argument("--category")
+    add.add_argument("--deadline", help="YYYY-MM-DD")
+    add.add_argument("--priority", action="store_true")
+    add.set_defaults(func=cmd_add)
+
+    listing = commands.add_parser("list", parents=[common], help="List tasks")
+    status = listing.add_mutually_exclusive_group()
+    status.add_argument("--open", action="store_true", help="Only tasks not completed")
+    status.add_argument("--done", action="store_true", help="Only completed tasks")
+    listing.add_argument("--sort", default="name", choices=["name", "deadline", "priority", "category"])
+    listing.add_argument("--search", help="Full-text search instead of listing everything")
+    listing.add_argument("--limit", type=int, default=50, help="Most search results shown")
+    listing.set_defaults(func=cmd_list)
+
+    start = commands.add_parser("start", parents=[common], help="Start (or resume) a task's timer")
+    start.add_argument("task_id", type=int)
+    start.set_defaults(func=cmd_start)
+
+    stop = commands.add_parser("stop", parents=[common], help="Stop a task's timer (default: all)")
+    stop.add_argument("task_id", type=int, nargs="?")
+    stop.set_defaults(func=cmd_stop)
+
+    commands.add_parser("status", parents=[common], help="Show open timer sessions").set_defaults(func=cmd_status)
+
+    export = commands.add_parser("export", parents=[common], help="Export tables to CSV/JSON Lines")
+    export.add_argument("path", help="Base output path, e.g. backup.csv or backup.jsonl.gz")
+    export.add_argument("--table", action="append", help="Table to export (repeatable; default: all)")
+    export.add_argument("--start", help="Only rows at or after this date")
+    export.add_argument("--end", help="Only rows before this date")
+    export.set_defaults(func=cmd_export)
+
+    importing = commands.add_parser("import", parents=[common], help="Import tasks or time entries")
+    importing.add_argument("kind", choices=["tasks", "entries"])
+    importing.add_argument("path")
+    importing.set_defaults(func=cmd_import)
+
+    report = commands.add_parser("report", parents=[common], help="Print a report")
+    report.add_argument("kind", choices=list(REPORTS))
+    report.add_argument("--start", help="First day included (YYYY-MM-DD)")
+    report.add_argument("--end", help="First day excluded (YYYY-MM-DD)")
+    report.add_argument("--period", choices=["day", "week", "month", "year", "all"])
+    report.set_defaults(func=cmd_report)
+
+    serve = commands.add_parser("serve", parents=[common], help="Run the local HTTP/JSON API")
+    serve.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: localhost only)")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--readers", type=int, default=4, help="Reader threads for database queries")
+    serve.set_defaults(func=cmd_serve)
+
+    return parser
+
+
+def main(argv=None):
+    """
+    Run one command.
+
+    Returns:
+        int: Exit status (0 on success)
+    """
+    args = build_parser().parse_args(argv)
+
+    from app.models.database import Database
+
+    try:
+        db = Database(args.db, profile=args.db_profile)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    try:
+        return args.func(db, args) or 0
+    except (ValueError, RuntimeError, OSError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
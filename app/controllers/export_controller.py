@@ -0,0 +1,232 @@
+import csv
+import gzip
+import json
+import os
+import threading
+
+from app.models.database import DEFAULT_OWNER
+
+class ExportController:
+    # Exportable tables and the timestamp column used by the date filter
+    TABLES = {
+        "tasks": "created_at",
+        "time_entries": "start_time",
+        "notes": "created_at",
+        "task_history": "change_date",
+    }
+
+    FORMATS = ("csv", "jsonl")
+
+    def __init__(self, db_connection, chunk_size=1000, owner=DEFAULT_OWNER):
+        """
+        Initialize the export controller with database connection.
+
+        Only one user's data is exported: their tasks and the time entries,
+        notes and history of those tasks.
+
+        Args:
+            db_connection: Database instance to export from
+            chunk_size: Rows read from SQLite and written to disk per batch
+            owner: User whose data is exported
+        """
+        self.db = db_connection
+        self.chunk_size = chunk_size
+        self.owner = owner
+
+    def export(self, path, tables=None, fmt=None, compress=None, start=None, end=None,
+               progress=None, cancel_event=None):
+        """
+        Export several tables, one file per table.
+
+        A path like "backup.csv" produces "backup_tasks.csv",
+        "backup_time_entries.csv" and so on.
+
+        Args:
+            path: Base output path; its extension picks format/compression
+            tables: Table names to export (default: all of TABLES)
+            fmt: "csv" or "jsonl" (default: from the extension, else csv)
+            compress: Gzip the output (default: when the path ends in .gz)
+            start: Only rows at or after this date/datetime (optional)
+            end: Only rows before this date/datetime (optional)
+            progress: Callback progress(table, rows_written) after each chunk
+            cancel_event: threading.Event that stops the export when set
+
+        Returns:
+            dict: Output file path per exported table
+        """
+        base, suffix = self._split_path(path)
+        files = {}
+        for table in tables or self.TABLES:
+            table_path = f"{base}_{table}{suffix}"
+            self.export_table(table, table_path, fmt=fmt, compress=compress, start=start, end=end,
+                              progress=progress, cancel_event=cancel_event)
+            files[table] = table_path
+            if cancel_event is not None and cancel_event.is_set():
+                break
+        return files
+
+    def export_table(self, table, path, fmt=None, compress=None, start=None, end=None,
+                     progress=None, cancel_event=None):
+        """
+        Stream one table to a CSV or JSON Lines file.
+
+        Rows are read with a cursor and written in chunks, so memory use
+        does not depend on the size of the table.
+
+        Args:
+            table: Name of the table (a key of TABLES)
+            path: Output file path
+            fmt, compress, start, end, progress, cancel_event: See export()
+
+        Returns:
+            int: Number of rows written
+
+        Raises:
+            ValueError: If the table or format is unknown
+        """
+        if table not in self.TABLES:
+            raise ValueError(f"Cannot export unknown table: {table}")
+        fmt, compress = self._resolve_format(path, fmt, compress)
+
+        query, params = self._build_query(table, start, end)
+        rows = self.db.iterate(query, params, chunk_size=self.chunk_size)
+
+        written = 0
+        with self._open(path, compress) as out:
+            columns = None
+            writer = None
+            chunk = []
+            for row in rows:
+                if columns is None:
+                    columns = row.keys()
+                    if fmt == "csv":
+                        writer = csv.writer(out)
+                        writer.writerow(columns)
+                chunk.append(row)
+
+                if len(chunk) >= self.chunk_size:
+                    written += self._write_chunk(out, writer, fmt, chunk)
+                    chunk = []
+                    if progress:
+                        progress(table, written)
+                    if cancel_event is not None and cancel_event.is_set():
+                        break
+            else:
+                if chunk:
+                    written += self._write_chunk(out, writer, fmt, chunk)
+                if progress:
+                    progress(table, written)
+
+            # Empty CSV exports still get a header line
+            if columns is None and fmt == "csv":
+                header = [col[1] for col in self.db.execute(f"PRAGMA table_info({table})", fetchall=True)]
+                csv.writer(out).writerow(header)
+
+        return written
+
+    def export_in_background(self, path, **options):
+        """
+        Run export() on a worker thread with its own database connection.
+
+        Args:
+            path: Base output path (see export())
+            **options: Any other export() argument except progress/cancel_event
+
+        Returns:
+            ExportJob: Handle to poll for progress, result and errors
+        """
+        job = ExportJob()
+
+        def run():
+            # The worker thread reads through its own connection (see Database._state)
+            try:
+                job.files = self.export(path, progress=job._update, cancel_event=job.cancel_event, **options)
+            except Exception as e:
+                job.error = e
+            finally:
+                self.db.close_thread_connection()
+                job.finished.set()
+
+        job.thread = threading.Thread(target=run, name="export", daemon=True)
+        job.thread.start()
+        return job
+
+    def _build_query(self, table, start, end):
+        """Build the SELECT for a table with the owner and the optional date range"""
+        date_column = self.TABLES[table]
+        if table == "tasks":
+            query = "SELECT x.* FROM tasks x WHERE x.owner = ?"
+        else:
+            # The other tables belong to a user through their task
+            query = f"SELECT x.* FROM {table} x JOIN tasks t ON t.id = x.task_id WHERE t.owner = ?"
+        params = [self.owner]
+
+        if start is not None:
+            query += f" AND x.{date_column} >= ?"
+            params.append(str(start))
+        if end is not None:
+            query += f" AND x.{date_column} < ?"
+            params.append(str(end))
+
+        query += " ORDER BY x.id"
+        return query, tuple(params)
+
+    def _write_chunk(self, out, writer, fmt, chunk):
+        """Write a list of rows and return how many were written"""
+        if fmt == "csv":
+            writer.writerows(tuple(row) for row in chunk)
+        else:
+            out.write("".join(json.dumps(dict(row), default=str) + "\n" for row in chunk))
+        return len(chunk)
+
+    def _resolve_format(self, path, fmt, compress):
+        """Fill in format and compression from the file name when not given"""
+        _, suffix = self._split_path(path)
+        if compress is None:
+            compress = suffix.endswith(".gz")
+        if fmt is None:
+            fmt = "jsonl" if suffix.split(".")[1:2] == ["jsonl"] else "csv"
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        return fmt, compress
+
+    def _split_path(self, path):
+        """Split "dir/name.csv.gz" into ("dir/name", ".csv.gz")"""
+        head, name = os.path.split(path)
+        stem, dot, rest = name.partition(".")
+        return os.path.join(head, stem), dot + rest
+
+    def _open(self, path, compress):
+        """Open an output file for text writing, gzipped if requested"""
+        if compress:
+            return gzip.open(path, "wt", encoding="utf-8", newline="")
+        return open(path, "w", encoding="utf-8", newline="")
+
+
+class ExportJob:
+    """Progress and outcome of an export running in the background"""
+
+    def __init__(self):
+        self.thread = None
+        self.rows = {}                  # Rows written so far per table
+        self.files = None               # Output files once finished
+        self.error = None               # Exception raised by the export, if any
+        self.finished = threading.Event()
+        self.cancel_event = threading.Event()
+
+    @property
+    def done(self):
+        """True once the export has finished, failed or been cancelled"""
+        return self.finished.is_set()
+
+    @property
+    def total_rows(self):
+        """Rows written so far across all tables"""
+        return sum(self.rows.values())
+
+    def cancel(self):
+        """Ask the export to stop after the current chunk"""
+        self.cancel_event.set()
+
+    def _update(self, table, rows_written):
+        self.rows[table] = rows_written
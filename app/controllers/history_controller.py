@@ -0,0 +1,180 @@
+import datetime
+
+class HistoryController:
+    """
+    Keeps task_history small: compaction and retention.
+
+    Compaction merges the timer rows ("total_time" with a delta) of a
+    task on the same day into one row whose merged column counts the
+    originals. Retention is opt-in: with retention_days set, rows older
+    than that horizon are removed, moving them to task_history_archive
+    unless archiving is off; creation rows are always kept.
+
+    Both run in small batches, each in its own short transaction, so
+    other writers never wait long for the write lock.
+    """
+
+    def __init__(self, db_connection, retention_days=None, archive=True, batch_size=200):
+        """
+        Initialize the history controller with database connection.
+
+        Args:
+            db_connection: Database instance holding the history
+            retention_days: Age in days after which rows expire (None or 0 = keep forever)
+            archive: Move expired rows to task_history_archive instead of deleting them
+            batch_size: Tasks per compaction batch / rows per retention batch
+        """
+        self.db = db_connection
+        self.retention_days = retention_days or None
+        self.archive = archive
+        self.batch_size = batch_size
+        self.reset()
+
+    def reset(self):
+        """Start the next run_step() cycle from the beginning"""
+        self._phase = "compact"
+        self._cursor = 0
+        self.merged = 0             # Rows removed by compaction this cycle
+        self.expired = 0            # Rows removed by retention this cycle
+
+    def run(self, max_batches=None):
+        """
+        Run compaction and retention to completion (or for max_batches batches).
+
+        Returns:
+            dict: Rows "merged" away and "expired" in this cycle
+        """
+        batches = 0
+        while self.run_step():
+            batches += 1
+            if max_batches is not None and batches >= max_batches:
+                break
+        return {"merged": self.merged, "expired": self.expired}
+
+    def run_step(self):
+        """
+        Process one batch of the current cycle.
+
+        Returns:
+            bool: True while work remains
+        """
+        if self._phase == "compact":
+            next_cursor, removed = self.compact_batch(self._cursor)
+            self.merged += removed
+            if next_cursor is None:
+                self._phase = "retain" if self.retention_days is not None else "done"
+                self._cursor = 0
+            else:
+                self._cursor = next_cursor
+            return self._phase != "done"
+
+        if self._phase == "retain":
+            next_cursor, removed = self.retention_batch(self._cursor)
+            self.expired += removed
+            if next_cursor is None:
+                self._phase = "done"
+            else:
+                self._cursor = next_cursor
+            return self._phase != "done"
+
+        return False
+
+    def compact_batch(self, after_task_id, before=None):
+        """
+        Merge same-day timer rows for the next batch of tasks.
+
+        The first row of each group is kept (so ids stay in time order)
+        and takes the summed delta, the merged count and the latest
+        change date; the other rows of the group are deleted.
+
+        Args:
+            after_task_id: Continue with tasks after this id (0 to start)
+            before: Only compact rows older than this (default: start of today, UTC)
+
+        Returns:
+            tuple: (cursor for the next batch or None when done, rows removed)
+        """
+        if before is None:
+            before = self.db.execute("SELECT date('now')", fetchone=True)[0]
+
+        task_ids = [row[0] for row in self.db.execute(
+            "SELECT DISTINCT task_id FROM task_history WHERE task_id > ? ORDER BY task_id LIMIT ?",
+            (after_task_id, self.batch_size), fetchall=True
+        )]
+        if not task_ids:
+            return None, 0
+
+        removed = 0
+        with self.db.transaction():
+            groups = self.db.execute("""
+            SELECT task_id, date(change_date) AS day, MIN(id) AS keep_id, COUNT(*) AS rows,
+                   SUM(delta) AS delta, SUM(merged) AS merged, MAX(change_date) AS last_change
+            FROM task_history
+            WHERE task_id BETWEEN ? AND ? AND field_name = 'total_time' AND change_date < ?
+            GROUP BY task_id, day
+            HAVING rows > 1
+            """, (task_ids[0], task_ids[-1], before), fetchall=True)
+
+            if groups:
+                self.db.executemany(
+                    "UPDATE task_history SET delta = ?, merged = ?, change_date = ? WHERE id = ?",
+                    [(g['delta'], g['merged'], g['last_change'], g['keep_id']) for g in groups]
+                )
+                self.db.executemany("""
+                DELETE FROM task_history
+                WHERE task_id = ? AND change_date >= ? AND change_date < date(?, '+1 day')
+                  AND change_date < ? AND field_name = 'total_time' AND id != ?
+                """, [(g['task_id'], g['day'], g['day'], before, g['keep_id']) for g in groups])
+                removed = sum(g['rows'] - 1 for g in groups)
+
+        if removed:
+            self.db.notify_change("task_history")
+        return task_ids[-1], removed
+
+    def retention_batch(self, after_id, horizon=None):
+        """
+        Expire the next batch of rows older than the retention horizon.
+
+        History is appended in time order, so the scan stops at the first
+        batch that reaches the horizon.
+
+        Args:
+            after_id: Continue with rows after this id (0 to start)
+            horizon: Expire rows changed before this timestamp
+                     (default: retention_days ago, UTC)
+
+        Returns:
+            tuple: (cursor for the next batch or None when done, rows removed)
+        """
+        if horizon is None:
+            horizon = self._horizon()
+
+        rows = self.db.execute(
+            "SELECT id, change_date, field_name FROM task_history WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id, self.batch_size), fetchall=True
+        )
+        if not rows:
+            return None, 0
+
+        expired = [row['id'] for row in rows
+                   if row['change_date'] < horizon and row['field_name'] != 'creation']
+        if expired:
+            placeholders = ", ".join("?" * len(expired))
+            with self.db.transaction():
+                if self.archive:
+                    self.db.execute(f"""
+                    INSERT OR REPLACE INTO task_history_archive
+                        (id, task_id, change_date, user, field_name, old_value, new_value, delta, merged)
+                    SELECT id, task_id, change_date, user, field_name, old_value, new_value, delta, merged
+                    FROM task_history WHERE id IN ({placeholders})
+                    """, tuple(expired))
+                self.db.execute(f"DELETE FROM task_history WHERE id IN ({placeholders})", tuple(expired))
+            self.db.notify_change("task_history")
+
+        done = rows[-1]['change_date'] >= horizon or len(rows) < self.batch_size
+        return (None if done else rows[-1]['id']), len(expired)
+
+    def _horizon(self):
+        """Timestamp (UTC, like CURRENT_TIMESTAMP) before which rows expire"""
+        horizon = datetime.datetime.utcnow() - datetime.timedelta(days=self.retention_days)
+        return horizon.strftime("%Y-%m-%d %H:%M:%S")
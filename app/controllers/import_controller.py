@@ -0,0 +1,322 @@
+import csv
+import gzip
+import io
+import json
+import os
+from itertools import islice
+
+from app.models.database import DEFAULT_OWNER
+from app.utils.validators import ValidationError, validate_task, validate_time_entry
+
+# Fold a range of imported time entries into daily_rollups: params (first_id, last_id)
+ROLLUP_IMPORT = """
+INSERT INTO daily_rollups (task_id, day, category, owner, seconds, entries)
+SELECT te.task_id, date(te.start_time), t.category, t.owner, SUM(te.duration), COUNT(*)
+FROM time_entries te JOIN tasks t ON t.id = te.task_id
+WHERE te.id BETWEEN ? AND ?
+GROUP BY te.task_id, date(te.start_time)
+ON CONFLICT(task_id, day) DO UPDATE SET
+    category = excluded.category,
+    seconds = seconds + excluded.seconds,
+    entries = entries + excluded.entries
+"""
+
+# Most rows checked against the database in one duplicate lookup
+LOOKUP_BATCH_SIZE = 400
+
+
+def _timestamp(value):
+    """Format a datetime/date the way sqlite3 stores them"""
+    if value is None:
+        return None
+    if hasattr(value, "hour"):
+        return value.isoformat(" ")
+    return value.isoformat()
+
+
+class ImportController:
+    FORMATS = ("csv", "jsonl")
+
+    def __init__(self, db_connection, chunk_size=1000, owner=DEFAULT_OWNER):
+        """
+        Initialize the import controller with database connection.
+
+        Args:
+            db_connection: Database instance to import into
+            chunk_size: Rows validated and inserted per transaction
+            owner: User the imported tasks and entries belong to; task
+                   references and duplicates only match this user's tasks
+        """
+        self.db = db_connection
+        self.chunk_size = chunk_size
+        self.owner = owner
+
+    def import_tasks(self, path, fmt=None, progress=None, cancel_event=None):
+        """
+        Stream tasks from a CSV or JSON Lines file into the tasks table.
+
+        Columns: name (required), description, category, deadline, priority,
+        completed, created_at. Tasks whose name and category match an
+        existing task (or an earlier row) are skipped as duplicates.
+
+        Args:
+            path: Input file; ".gz" files are decompressed on the fly
+            fmt: "csv" or "jsonl" (default: from the extension, else csv)
+            progress: Callback progress(report) after each chunk
+            cancel_event: threading.Event that stops the import when set
+
+        Returns:
+            ImportReport: Counts and per-row errors
+        """
+        return self._import(path, fmt, validate_task, self._insert_tasks, progress, cancel_event)
+
+    def import_time_entries(self, path, fmt=None, progress=None, cancel_event=None):
+        """
+        Stream finished time entries from a CSV or JSON Lines file.
+
+        Columns: task_id or task (the task name), start_time, end_time
+        and/or duration in seconds. Entries with the same task and start
+        time as an existing entry are skipped as duplicates. Task totals,
+        history and daily rollups are updated as if the sessions had been
+        timed in the app.
+
+        Args:
+            path, fmt, progress, cancel_event: See import_tasks()
+
+        Returns:
+            ImportReport: Counts and per-row errors
+        """
+        return self._import(path, fmt, validate_time_entry, self._insert_time_entries, progress, cancel_event)
+
+    def _import(self, path, fmt, validate, insert, progress, cancel_event):
+        """Validate and insert the rows of a file chunk by chunk"""
+        report = ImportReport()
+        rows = self._read_rows(path, self._resolve_format(path, fmt))
+
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+
+            valid = []
+            for line, row, error in chunk:
+                report.rows += 1
+                if error is None:
+                    try:
+                        valid.append((line, validate(row)))
+                        continue
+                    except ValidationError as e:
+                        error = str(e)
+                report.add_error(line, error)
+
+            # Each chunk commits on its own, so later chunks find its rows
+            # as duplicates in the database and a re-run is safe
+            if valid:
+                with self.db.transaction():
+                    insert(valid, report)
+
+            if progress:
+                progress(report)
+            if cancel_event is not None and cancel_event.is_set():
+                report.cancelled = True
+                break
+
+        if report.inserted:
+            self.db.notify_change("tasks")
+            self.db.notify_change("time_entries")
+        return report
+
+    def _insert_tasks(self, records, report):
+        """Insert validated tasks that aren't duplicates"""
+        existing = set()
+        names = list({task["name"] for _, task in records})
+        for start in range(0, len(names), LOOKUP_BATCH_SIZE):
+            batch = names[start:start + LOOKUP_BATCH_SIZE]
+            existing.update(
+                (row["name"], row["category"]) for row in self.db.execute(
+                    f"SELECT name, category FROM tasks WHERE owner = ? AND name IN ({', '.join('?' * len(batch))})",
+                    (self.owner, *batch), fetchall=True
+                )
+            )
+
+        seen = set()
+        rows = []
+        for line, task in records:
+            key = (task["name"], task["category"])
+            if key in existing or key in seen:
+                report.duplicates += 1
+                continue
+            seen.add(key)
+            rows.append((task["name"], task["description"], task["category"], _timestamp(task["deadline"]),
+                         task["priority"], task["completed"], _timestamp(task["created_at"]), self.owner))
+        if not rows:
+            return
+
+        self.db.executemany(
+            "INSERT INTO tasks (name, description, category, deadline, priority, completed, created_at, owner) "
+            "VALUES (?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP), ?)",
+            rows
+        )
+        # AUTOINCREMENT ids of one write transaction are consecutive
+        last_id = self.db.execute("SELECT last_insert_rowid()", fetchone=True)[0]
+        self.db.execute(
+            "INSERT INTO task_history (task_id, user, field_name, old_value, new_value) "
+            "SELECT id, owner, 'creation', NULL, 'Task imported: ' || name FROM tasks WHERE id BETWEEN ? AND ?",
+            (last_id - len(rows) + 1, last_id)
+        )
+        report.inserted += len(rows)
+
+    def _insert_time_entries(self, records, report):
+        """Insert validated time entries for known tasks that aren't duplicates"""
+        task_ids = self._resolve_tasks([entry for _, entry in records])
+
+        candidates = []
+        for line, entry in records:
+            task_id = task_ids.get(entry["task_id"] if entry["task_id"] is not None else entry["task"])
+            if task_id is None:
+                report.add_error(line, f"Unknown task: {entry['task_id'] or entry['task']}")
+                continue
+            candidates.append((task_id, _timestamp(entry["start_time"]), entry))
+
+        # Duplicates against the database (joining a VALUES list lets each
+        # pair seek the (task_id, start_time) index), then within the chunk
+        existing = set()
+        for start in range(0, len(candidates), LOOKUP_BATCH_SIZE):
+            batch = candidates[start:start + LOOKUP_BATCH_SIZE]
+            params = [value for task_id, start_time, _ in batch for value in (task_id, start_time)]
+            existing.update(
+                (row["task_id"], row["start_time"]) for row in self.db.execute(
+                    f"SELECT te.task_id, te.start_time FROM (VALUES {', '.join(['(?, ?)'] * len(batch))}) AS v "
+                    "JOIN time_entries te ON te.task_id = v.column1 AND te.start_time = v.column2",
+                    tuple(params), fetchall=True
+                )
+            )
+
+        seen = set()
+        rows = []
+        totals = {}
+        for task_id, start_time, entry in candidates:
+            key = (task_id, start_time)
+            if key in existing or key in seen:
+                report.duplicates += 1
+                continue
+            seen.add(key)
+            rows.append((task_id, self.owner, start_time, _timestamp(entry["end_time"]),
+                         entry["duration"], entry["duration"] * 1_000_000_000))
+            totals[task_id] = totals.get(task_id, 0) + entry["duration"]
+        if not rows:
+            return
+
+        self.db.executemany(
+            "INSERT INTO time_entries (task_id, owner, start_time, end_time, duration, duration_ns) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        last_id = self.db.execute("SELECT last_insert_rowid()", fetchone=True)[0]
+        first_id = last_id - len(rows) + 1
+
+        # One run segment per imported session, as for migrated entries
+        self.db.execute(
+            "INSERT INTO time_segments (entry_id, started_at, ended_at, duration_ns) "
+            "SELECT id, start_time, end_time, duration_ns FROM time_entries WHERE id BETWEEN ? AND ?",
+            (first_id, last_id)
+        )
+        self.db.executemany(
+            "UPDATE tasks SET total_time = total_time + ? WHERE id = ?",
+            [(seconds, task_id) for task_id, seconds in totals.items()]
+        )
+        self.db.executemany(
+            "INSERT INTO task_history (task_id, user, field_name, delta) VALUES (?, ?, 'total_time', ?)",
+            [(task_id, self.owner, seconds) for task_id, seconds in totals.items()]
+        )
+        self.db.execute(ROLLUP_IMPORT, (first_id, last_id))
+        report.inserted += len(rows)
+
+    def _resolve_tasks(self, entries):
+        """Map the task_id / task name references of entries to task ids"""
+        ids = list({entry["task_id"] for entry in entries if entry["task_id"] is not None})
+        names = list({entry["task"] for entry in entries if entry["task_id"] is None})
+        resolved = {}
+
+        for start in range(0, len(ids), LOOKUP_BATCH_SIZE):
+            batch = ids[start:start + LOOKUP_BATCH_SIZE]
+            for row in self.db.execute(
+                    f"SELECT id FROM tasks WHERE id IN ({', '.join('?' * len(batch))}) AND owner = ?",
+                    (*batch, self.owner), fetchall=True):
+                resolved[row["id"]] = row["id"]
+
+        # Names shared by several tasks resolve to the oldest one
+        for start in range(0, len(names), LOOKUP_BATCH_SIZE):
+            batch = names[start:start + LOOKUP_BATCH_SIZE]
+            for row in self.db.execute(
+                    f"SELECT name, MIN(id) AS id FROM tasks WHERE owner = ? AND name IN ({', '.join('?' * len(batch))}) "
+                    "GROUP BY name",
+                    (self.owner, *batch), fetchall=True):
+                resolved[row["name"]] = row["id"]
+        return resolved
+
+    def _read_rows(self, path, fmt):
+        """
+        Stream the records of a file.
+
+        Yields:
+            tuple: (line number, record dict or None, error message or None)
+        """
+        with self._open(path) as stream:
+            if fmt == "csv":
+                reader = csv.DictReader(stream)
+                for row in reader:
+                    if None in row:
+                        yield reader.line_num, None, "Row has more fields than the header"
+                    else:
+                        yield reader.line_num, row, None
+            else:
+                for line, text in enumerate(stream, 1):
+                    if not text.strip():
+                        continue
+                    try:
+                        record = json.loads(text)
+                    except json.JSONDecodeError as e:
+                        yield line, None, f"Invalid JSON: {e.msg}"
+                        continue
+                    if not isinstance(record, dict):
+                        yield line, None, "Expected a JSON object"
+                    else:
+                        yield line, record, None
+
+    def _resolve_format(self, path, fmt):
+        """Pick the input format from the file name when not given"""
+        name = os.path.basename(path)
+        if name.endswith(".gz"):
+            name = name[:-3]
+        if fmt is None:
+            fmt = "jsonl" if name.endswith(".jsonl") else "csv"
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Unsupported import format: {fmt}")
+        return fmt
+
+    def _open(self, path):
+        """Open an input file for text reading, gunzipping if needed"""
+        if path.endswith(".gz"):
+            return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8-sig", newline="")
+        return open(path, "r", encoding="utf-8-sig", newline="")
+
+
+class ImportReport:
+    """Outcome of an import"""
+
+    # Errors kept in detail; the rest are only counted
+    MAX_ERRORS = 1000
+
+    def __init__(self):
+        self.rows = 0                   # Records read
+        self.inserted = 0               # Records stored
+        self.duplicates = 0             # Records skipped as already present
+        self.error_count = 0            # Records rejected
+        self.errors = []                # (line, message) for the first MAX_ERRORS rejections
+        self.cancelled = False
+
+    def add_error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < self.MAX_ERRORS:
+            self.errors.append((line, message))
@@ -0,0 +1,207 @@
+from app.models.database import DEFAULT_OWNER
+from app.utils.validators import validate_note_content
+
+class NoteController:
+    # Characters of a note returned by list queries; the rest is read on demand
+    PREVIEW_LENGTH = 200
+
+    def __init__(self, db_connection, owner=DEFAULT_OWNER):
+        """
+        Initialize the note controller with database connection.
+
+        Notes belong to tasks, so they are scoped by the task's owner:
+        notes of other users' tasks can't be read, added or changed.
+
+        Args:
+            db_connection: Database instance for CRUD operations
+            owner: User whose tasks' notes this controller sees
+        """
+        self.db = db_connection
+        self.owner = owner
+
+    def add_note(self, task_id, content):
+        """
+        Add a note to a task.
+
+        Args:
+            task_id: ID of the task the note belongs to
+            content: Note text
+
+        Returns:
+            int: ID of the created note
+
+        Raises:
+            ValueError: If the content is empty or the task doesn't exist
+        """
+        content = validate_note_content(content)
+
+        # Check if task exists
+        if not self.db.execute("SELECT 1 FROM tasks WHERE id = ? AND owner = ?", (task_id, self.owner),
+                               fetchone=True):
+            raise ValueError(f"Task with ID {task_id} does not exist")
+
+        note_id = self.db.execute(
+            "INSERT INTO notes (task_id, content) VALUES (?, ?)",
+            (task_id, content)
+        )
+        self.db.notify_change("notes", note_id)
+        return note_id
+
+    def update_note(self, note_id, content):
+        """
+        Replace the text of a note.
+
+        Args:
+            note_id: ID of the note to update
+            content: New note text
+
+        Returns:
+            bool: True if the text changed
+
+        Raises:
+            ValueError: If the content is empty or the note doesn't exist
+        """
+        content = validate_note_content(content)
+
+        note = self.db.execute(
+            "SELECT n.content FROM notes n JOIN tasks t ON t.id = n.task_id WHERE n.id = ? AND t.owner = ?",
+            (note_id, self.owner), fetchone=True
+        )
+        if not note:
+            raise ValueError(f"Note with ID {note_id} does not exist")
+        if note['content'] == content:
+            return False
+
+        self.db.execute("UPDATE notes SET content = ? WHERE id = ?", (content, note_id))
+        self.db.notify_change("notes", note_id)
+        return True
+
+    def delete_note(self, note_id):
+        """
+        Delete a note.
+
+        Args:
+            note_id: ID of the note to delete
+
+        Returns:
+            bool: True if successful
+
+        Raises:
+            ValueError: If the note doesn't exist
+        """
+        with self.db.transaction():
+            if not self.db.execute(
+                "SELECT 1 FROM notes n JOIN tasks t ON t.id = n.task_id WHERE n.id = ? AND t.owner = ?",
+                (note_id, self.owner), fetchone=True
+            ):
+                raise ValueError(f"Note with ID {note_id} does not exist")
+            self.db.execute("DELETE FROM notes WHERE id = ?", (note_id,))
+        self.db.notify_change("notes", note_id)
+        return True
+
+    def get_note(self, note_id):
+        """
+        Get a note with its full text.
+
+        Args:
+            note_id: ID of the note to retrieve
+
+        Returns:
+            dict: Note data or None if not found
+        """
+        return self.db.execute(
+            "SELECT n.* FROM notes n JOIN tasks t ON t.id = n.task_id WHERE n.id = ? AND t.owner = ?",
+            (note_id, self.owner), fetchone=True
+        )
+
+    def get_notes_page(self, task_id, after=None, limit=50):
+        """
+        Get one page of a task's notes, newest first.
+
+        Pages follow the (task_id, created_at, id) order of idx_notes_task,
+        so every page is a single index seek however many notes the task
+        has. Rows carry a preview of the text and its full length instead
+        of the whole content (see read_content).
+
+        Args:
+            task_id: ID of the task
+            after: Cursor of the last note of the previous page (see note_cursor)
+            limit: Maximum number of notes to return
+
+        Returns:
+            list: Rows with id, task_id, created_at, preview and length
+        """
+        query = f"""
+        SELECT n.id, n.task_id, n.created_at,
+               substr(n.content, 1, {self.PREVIEW_LENGTH}) AS preview,
+               length(n.content) AS length
+        FROM notes n JOIN tasks t ON t.id = n.task_id
+        WHERE n.task_id = ? AND t.owner = ?
+        """
+        params = [task_id, self.owner]
+
+        if after is not None:
+            query += " AND (n.created_at, n.id) < (?, ?)"
+            params.extend(after)
+
+        query += " ORDER BY n.created_at DESC, n.id DESC LIMIT ?"
+        params.append(limit)
+
+        return self.db.execute(query, tuple(params), fetchall=True)
+
+    def note_cursor(self, note):
+        """
+        Get the pagination cursor of a note row.
+
+        Args:
+            note: Row returned by get_notes_page or get_note
+
+        Returns:
+            tuple: (created_at, id), to pass as `after`
+        """
+        return (note['created_at'], note['id'])
+
+    def count_notes(self, task_id):
+        """Return the number of notes of a task"""
+        return self.db.execute(
+            "SELECT COUNT(*) FROM notes n JOIN tasks t ON t.id = n.task_id WHERE n.task_id = ? AND t.owner = ?",
+            (task_id, self.owner), fetchone=True
+        )[0]
+
+    def read_content(self, note_id, offset=0, length=4096):
+        """
+        Read part of a note's text.
+
+        Args:
+            note_id: ID of the note
+            offset: Index of the first character to read
+            length: Maximum number of characters to read
+
+        Returns:
+            str: The requested text ("" past the end), or None if the note doesn't exist
+        """
+        row = self.db.execute(
+            "SELECT substr(n.content, ?, ?) FROM notes n JOIN tasks t ON t.id = n.task_id "
+            "WHERE n.id = ? AND t.owner = ?",
+            (offset + 1, length, note_id, self.owner), fetchone=True
+        )
+        return row[0] if row else None
+
+    def iter_content(self, note_id, chunk_size=4096):
+        """
+        Stream a note's text in chunks.
+
+        Args:
+            note_id: ID of the note
+            chunk_size: Characters per chunk
+
+        Yields:
+            str: Consecutive pieces of the text
+        """
+        offset = 0
+        while True:
+            chunk = self.read_content(note_id, offset, chunk_size)
+            if not chunk:
+                return
+            yield chunk
+            offset += len(chunk)
@@ -0,0 +1,310 @@
+import threading
+from collections import OrderedDict
+
+from app.models.database import DEFAULT_OWNER
+
+# Tables whose changes can alter a report's result
+REPORT_TABLES = frozenset({"time_entries", "daily_rollups", "tasks"})
+
+
+class ReportController:
+    # Grouping expressions for each reporting period; {day} is the
+    # column or expression holding the day ("YYYY-MM-DD")
+    PERIODS = {
+        'day': "{day}",
+        'week': "strftime('%Y-W%W', {day})",
+        'month': "strftime('%Y-%m', {day})",
+        'year': "strftime('%Y', {day})",
+        'all': "'all'",                 # One group for the whole range
+    }
+
+    def __init__(self, db_connection, cache_size=64, owner=DEFAULT_OWNER):
+        """
+        Initialize the report controller with database connection.
+
+        Report results are cached per (report, range, grouping) until a
+        time entry, rollup or task changes.
+
+        Args:
+            db_connection: Database instance to report on
+            cache_size: Maximum number of report results kept (0 disables the cache)
+            owner: User whose tasks and tracked time are reported
+        """
+        self.db = db_connection
+        self.cache_size = cache_size
+        self.owner = owner
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_generation = 0
+
+        self.db.add_change_listener(self._on_data_change)
+
+    def time_per_task(self, start=None, end=None, period='day', task_id=None):
+        """
+        Get tracked time per task and period from the daily rollups.
+
+        Args:
+            start: First day included (date or "YYYY-MM-DD", optional)
+            end: First day excluded (date or "YYYY-MM-DD", optional)
+            period: Grouping period (day, week, month, year, all)
+            task_id: Restrict the report to one task (optional)
+
+        Returns:
+            list: Rows with period, task_id, name and seconds
+        """
+        return self._cached(("time_per_task", start, end, period, task_id),
+                            self._time_per_task, start, end, period, task_id)
+
+    def _time_per_task(self, start, end, period, task_id):
+        period_expr = self._period_expression(period)
+        where, params = self._range_filter(start, end)
+        if task_id is not None:
+            where += " AND r.task_id = ?"
+            params.append(task_id)
+
+        query = f"""
+        SELECT {period_expr} AS period, r.task_id, t.name, SUM(r.seconds) AS seconds
+        FROM daily_rollups r JOIN tasks t ON t.id = r.task_id
+        WHERE {where}
+        GROUP BY period, r.task_id
+        ORDER BY period, t.name
+        """
+        return self.db.execute(query, tuple(params), fetchall=True)
+
+    def time_per_category(self, start=None, end=None, period='day'):
+        """
+        Get tracked time per category and period from the daily rollups.
+
+        Args:
+            start: First day included (date or "YYYY-MM-DD", optional)
+            end: First day excluded (date or "YYYY-MM-DD", optional)
+            period: Grouping period (day, week, month, year, all)
+
+        Returns:
+            list: Rows with period, category and seconds
+        """
+        return self._cached(("time_per_category", start, end, period),
+                            self._time_per_category, start, end, period)
+
+    def _time_per_category(self, start, end, period):
+        period_expr = self._period_expression(period)
+        where, params = self._range_filter(start, end)
+
+        query = f"""
+        SELECT {period_expr} AS period, r.category, SUM(r.seconds) AS seconds
+        FROM daily_rollups r
+        WHERE {where}
+        GROUP BY period, r.category
+        ORDER BY period, r.category
+        """
+        return self.db.execute(query, tuple(params), fetchall=True)
+
+    def time_per_period(self, start=None, end=None, period='day'):
+        """
+        Get total tracked time per period from the daily rollups.
+
+        Args:
+            start: First day included (date or "YYYY-MM-DD", optional)
+            end: First day excluded (date or "YYYY-MM-DD", optional)
+            period: Grouping period (day, week, month, year, all)
+
+        Returns:
+            list: Rows with period and seconds
+        """
+        return self._cached(("time_per_period", start, end, period),
+                            self._time_per_period, start, end, period)
+
+    def _time_per_period(self, start, end, period):
+        period_expr = self._period_expression(period)
+        where, params = self._range_filter(start, end)
+
+        # Sum per day first: that follows idx_daily_rollups_owner_day (covering),
+        # so the period expression runs once per day instead of once per row
+        query = f"""
+        SELECT {period_expr} AS period, SUM(seconds) AS seconds
+        FROM (
+            SELECT r.day, SUM(r.seconds) AS seconds
+            FROM daily_rollups r
+            WHERE {where}
+            GROUP BY r.day
+        )
+        GROUP BY period
+        ORDER BY period
+        """
+        return self.db.execute(query, tuple(params), fetchall=True)
+
+    def completion_velocity(self, start=None, end=None, period='week'):
+        """
+        Get the number of tasks completed per period.
+
+        Args:
+            start: First day included (date or "YYYY-MM-DD", optional)
+            end: First day excluded (date or "YYYY-MM-DD", optional)
+            period: Grouping period (day, week, month, year, all)
+
+        Returns:
+            list: Rows with period and completed
+        """
+        return self._cached(("completion_velocity", start, end, period),
+                            self._completion_velocity, start, end, period)
+
+    def _completion_velocity(self, start, end, period):
+        # completed_at is UTC (CURRENT_TIMESTAMP); days are counted in local
+        # time like deadlines, and the range bounds are converted to UTC
+        # instead of the column, so the range stays an index search
+        period_expr = self._period_expression(period, "date(completed_at, 'localtime')")
+        where, params = self._range_filter(start, end, "completed_at", "owner", bound="datetime(?, 'utc')")
+
+        query = f"""
+        SELECT {period_expr} AS period, COUNT(*) AS completed
+        FROM tasks
+        WHERE completed = 1 AND completed_at IS NOT NULL AND {where}
+        GROUP BY period
+        ORDER BY period
+        """
+        return self.db.execute(query, tuple(params), fetchall=True)
+
+    def deadline_adherence(self, start=None, end=None, period='month'):
+        """
+        Count tasks per deadline period by how they met their deadline.
+
+        A task is on time when completed on or before its deadline day
+        (in local time, like the deadline), late when completed after it,
+        overdue when still open past it and pending otherwise. Tasks completed before completion times were
+        recorded are left out.
+
+        Args:
+            start: First deadline day included (date or "YYYY-MM-DD", optional)
+            end: First deadline day excluded (date or "YYYY-MM-DD", optional)
+            period: Grouping period (day, week, month, year, all)
+
+        Returns:
+            list: Rows with period, on_time, late, overdue and pending
+        """
+        return self._cached(("deadline_adherence", start, end, period),
+                            self._deadline_adherence, start, end, period)
+
+    def _deadline_adherence(self, start, end, period):
+        period_expr = self._period_expression(period, "date(deadline)")
+        where, params = self._range_filter(start, end, "deadline", "owner")
+
+        # "(deadline IS NULL) = 0" matches the second column of
+        # idx_tasks_owner_deadline, so the deadline range is an index search
+        query = f"""
+        SELECT {period_expr} AS period,
+               SUM(completed = 1 AND IFNULL(date(completed_at, 'localtime') <= date(deadline), 0)) AS on_time,
+               SUM(completed = 1 AND IFNULL(date(completed_at, 'localtime') > date(deadline), 0)) AS late,
+               SUM(completed = 0 AND date(deadline) < date('now', 'localtime')) AS overdue,
+               SUM(completed = 0 AND date(deadline) >= date('now', 'localtime')) AS pending
+        FROM tasks
+        WHERE (deadline IS NULL) = 0 AND {where}
+        GROUP BY period
+        ORDER BY period
+        """
+        return self.db.execute(query, tuple(params), fetchall=True)
+
+    def rebuild_rollups(self):
+        """
+        Recompute daily_rollups from the raw time entries.
+
+        Covers every user's entries. Categories and owners are taken from
+        the tasks as they are now.
+
+        Returns:
+            int: Number of rollup rows written
+        """
+        with self.db.transaction():
+            self.db.execute("DELETE FROM daily_rollups")
+            self.db.execute("""
+            INSERT INTO daily_rollups (task_id, day, category, owner, seconds, entries)
+            SELECT te.task_id, date(te.start_time), t.category, t.owner, SUM(te.duration), COUNT(*)
+            FROM time_entries te JOIN tasks t ON t.id = te.task_id
+            WHERE te.end_time IS NOT NULL
+            GROUP BY te.task_id, date(te.start_time)
+            """)
+            count = self.db.execute("SELECT COUNT(*) FROM daily_rollups", fetchone=True)[0]
+        self.db.notify_change("daily_rollups")
+        return count
+
+    def cache_stats(self):
+        """
+        Get cache counters.
+
+        Returns:
+            dict: hits, misses and size of the report cache
+        """
+        with self._cache_lock:
+            return {"hits": self.cache_hits, "misses": self.cache_misses, "size": len(self._cache)}
+
+    @property
+    def cache_generation(self):
+        """Counter bumped whenever cached results are dropped (lets views cache derived data)"""
+        return self._cache_generation
+
+    def invalidate(self):
+        """Drop every cached report result"""
+        with self._cache_lock:
+            self._cache_generation += 1
+            self._cache.clear()
+
+    def _on_data_change(self, table, row_id):
+        """Change listener: reports read several tables, so any change clears them all"""
+        if table in REPORT_TABLES:
+            self.invalidate()
+
+    def _cached(self, key, compute, *args):
+        """
+        Return a cached report result, computing and storing it on a miss.
+
+        Args:
+            key: Report name and arguments
+            compute: Function running the report query
+            *args: Arguments for compute
+
+        Returns:
+            list: The report rows (a new list on every call)
+        """
+        with self._cache_lock:
+            rows = self._cache.get(key)
+            if rows is not None:
+                self.cache_hits += 1
+                self._cache.move_to_end(key)
+                return list(rows)
+            self.cache_misses += 1
+            generation = self._cache_generation
+
+        rows = compute(*args)
+
+        if self.cache_size != 0:
+            with self._cache_lock:
+                # Don't cache a result that may predate a change made while it ran
+                if generation == self._cache_generation:
+                    self._cache[key] = tuple(rows)
+                    if len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+        return rows
+
+    def _period_expression(self, period, day="day"):
+        """Return the SQL grouping expression for a period over a day column"""
+        if period not in self.PERIODS:
+            raise ValueError(f"Unknown report period: {period}")
+        return self.PERIODS[period].format(day=day)
+
+    def _range_filter(self, start, end, column="r.day", owner_column="r.owner", bound="?"):
+        """
+        Build the WHERE clause for the owner and an optional [start, end) day range.
+
+        bound is the SQL expression each day is compared through ("?" or
+        e.g. "datetime(?, 'utc')" for a UTC timestamp column).
+        """
+        where = f"{owner_column} = ?"
+        params = [self.owner]
+        if start is not None:
+            where += f" AND {column} >= {bound}"
+            params.append(str(start))
+        if end is not None:
+            where += f" AND {column} < {bound}"
+            params.append(str(end))
+        return where, params
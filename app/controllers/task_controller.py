@@ -1,14 +1,166 @@
 import datetime
+import re
+import threading
+from collections import OrderedDict
+
+from app.models.database import DEFAULT_OWNER
+from app.utils.validators import validate_name
+
+# ORDER BY clause for each sort mode. Every clause (after the owner, with
+# and without a "completed" filter) is backed by an index created in
+# app/models/migrations.py, so changing one here needs a new migration.
+SORT_ORDERS = {
+    'name': "name",
+    'deadline': "deadline IS NULL, deadline, name",
+    'priority': "priority DESC, name",
+    'category': "category, name",
+}
+
+# Sort keys for keyset pagination: (expression, descending) per sort mode.
+# They spell out SORT_ORDERS so a page can resume right after a given row;
+# the task id is always appended as the final tie-breaker.
+SORT_KEYS = {
+    'name': (("name", False),),
+    'deadline': (("(deadline IS NULL)", False), ("deadline", False), ("name", False)),
+    'priority': (("priority", True), ("name", False)),
+    'category': (("category", False), ("name", False)),
+}
+
+# Sort keys that may hold NULL (name and the 0/1 flags never do)
+NULLABLE_SORT_KEYS = {"deadline", "category"}
+
+# Fields update_task() / update_tasks() may change
+UPDATABLE_FIELDS = ('name', 'description', 'category', 'deadline', 'completed', 'priority')
+
+# Most ids bound into one "IN (...)" list, well below SQLite's variable limit
+ID_BATCH_SIZE = 500
+
+# bm25() column weights for search(): a hit in the name counts most;
+# note hits rank below task hits of the same strength
+SEARCH_NAME_WEIGHT = 10.0
+SEARCH_DESCRIPTION_WEIGHT = 2.0
+SEARCH_NOTE_FACTOR = 0.5
+
+def _fts_query(text):
+    """
+    Turn free text typed by a user into an FTS5 query.
+    
+    Every word becomes a quoted prefix term and all of them must match, so
+    "rep fin" finds "Final report". FTS5 operators in the input are treated
+    as plain words.
+    
+    Returns:
+        str: The MATCH expression, or None if the text has no words
+    """
+    words = re.findall(r"\w+", text)
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+def _history_value(value):
+    """Store a value in task_history as text; flags become 0 or 1"""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return str(int(value))
+    return str(value)
+
+def _batches(items, size=ID_BATCH_SIZE):
+    """Split a list into consecutive slices of at most `size` items"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def _sort_key_value(task, expression):
+    """Evaluate a SORT_KEYS expression against a task row"""
+    if expression == "(deadline IS NULL)":
+        return int(task['deadline'] is None)
+    return task[expression]
+
+def _keyset_condition(keys, values):
+    """
+    Build the WHERE clause selecting rows that sort strictly after `values`.
+    
+    NULL sorts first in ascending order (and last in descending order), as
+    in SQLite. The clause starts with a plain range bound on the leading
+    keys so SQLite can seek into the index instead of scanning from the top.
+    
+    Args:
+        keys: Sequence of (expression, descending) tuples
+        values: Cursor values, one per key
+        
+    Returns:
+        tuple: (sql, params)
+    """
+    clauses = []
+    params = []
+    
+    # Range bound over the leading keys that share a direction. A NULL in a
+    # descending key sorts after every value but fails the comparison, so
+    # the bound stops before any nullable descending key.
+    prefix = []
+    for (expression, descending), value in zip(keys, values):
+        if descending != keys[0][1] or value is None:
+            break
+        if descending and expression in NULLABLE_SORT_KEYS:
+            break
+        prefix.append((expression, value))
+    if prefix:
+        operator = "<=" if keys[0][1] else ">="
+        columns = ", ".join(expression for expression, _ in prefix)
+        clauses.append(f"({columns}) {operator} ({', '.join('?' * len(prefix))})")
+        params.extend(value for _, value in prefix)
+    
+    # Lexicographic "greater than" over all keys
+    alternatives = []
+    for i, (expression, descending) in enumerate(keys):
+        value = values[i]
+        equal = [f"{expr} IS ?" for expr, _ in keys[:i]]
+        if value is None:
+            if descending:
+                continue  # Nothing sorts after NULL in descending order
+            after = f"{expression} IS NOT NULL"
+            after_params = []
+        elif descending:
+            after = f"({expression} < ? OR {expression} IS NULL)"
+            after_params = [value]
+        else:
+            after = f"{expression} > ?"
+            after_params = [value]
+        alternatives.append("(" + " AND ".join(equal + [after]) + ")")
+        params.extend(values[:i])
+        params.extend(after_params)
+    clauses.append("(" + " OR ".join(alternatives) + ")")
+    
+    return " AND ".join(clauses), params
 
 class TaskController:
-    def __init__(self, db_connection):
+    def __init__(self, db_connection, cache_size=None, owner=DEFAULT_OWNER):
         """
         Initialize the task controller with database connection.
         
         Args:
             db_connection: Database instance for CRUD operations
+            cache_size: Maximum number of task rows kept in the cache
+                        (None = unbounded, 0 = no caching)
+            owner: User whose tasks this controller sees and creates;
+                   other users' tasks behave as if they didn't exist
         """
         self.db = db_connection
+        self.owner = owner
+        
+        # Identity map of task rows by id, in least-recently-used order
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache = OrderedDict()
+        
+        # Reads may run on reader threads while the writer invalidates; the
+        # generation tells a reader whether its row went stale meanwhile
+        self._cache_lock = threading.Lock()
+        self._cache_generation = 0
+        
+        # Rows changed elsewhere (e.g. the timer updating total_time) are dropped
+        self.db.add_change_listener(self._on_data_change)
     
     def create_task(self, name, description=None, category=None, deadline=None, priority=False):
         """
@@ -25,24 +177,25 @@ class TaskController:
             int: ID of the created task
             
         Raises:
-            ValueError: If name is empty
+            ValidationError: If name is empty or too long
         """
         # Validate input data
-        if not name or len(name.strip()) == 0:
-            raise ValueError("Task name is required")
+        name = validate_name(name)
         
         # Insert into database
         query = """
-        INSERT INTO tasks (name, description, category, deadline, priority) 
-        VALUES (?, ?, ?, ?, ?)
+        INSERT INTO tasks (name, description, category, deadline, priority, owner) 
+        VALUES (?, ?, ?, ?, ?, ?)
         """
-        task_id = self.db.execute(query, (name, description, category, deadline, priority))
-        
-        # Log creation in history
-        self.db.execute(
-            "INSERT INTO task_history (task_id, field_name, old_value, new_value) VALUES (?, ?, ?, ?)",
-            (task_id, "creation", None, f"Task created: {name}")
-        )
+        with self.db.transaction():
+            task_id = self.db.execute(query, (name, description, category, deadline, bool(priority), self.owner))
+            
+            # Log creation in history
+            self.db.execute(
+                "INSERT INTO task_history (task_id, user, field_name, old_value, new_value) VALUES (?, ?, ?, ?, ?)",
+                (task_id, self.owner, "creation", None, f"Task created: {name}")
+            )
+        self.db.notify_change("tasks", task_id)
         
         return task_id
     
@@ -59,51 +212,72 @@ class TaskController:
             
         Raises:
             ValueError: If task doesn't exist
+            ValidationError: If the new name is blank or too long
         """
         # Check if task exists
         task = self.get_task(task_id)
         if not task:
             raise ValueError(f"Task with ID {task_id} does not exist")
         
-        # Build update query dynamically based on provided fields
-        updates = []
-        params = []
-        history_updates = []
-        
-        # Process each field
-        for field, new_value in kwargs.items():
-            if field not in ['name', 'description', 'category', 'deadline', 'completed', 'priority']:
-                continue
-                
-            updates.append(f"{field} = ?")
-            params.append(new_value)
-            
-            # Track change in history
-            old_value = task[field] if field in task.keys() else None
-            history_updates.append((
-                task_id,
-                field,
-                str(old_value) if old_value is not None else None,
-                str(new_value) if new_value is not None else None
-            ))
-        
-        if not updates:
+        changes = self._changed_fields(task, kwargs)
+        if not changes:
             return False
             
-        # Update the task
-        query = f"UPDATE tasks SET {', '.join(updates)} WHERE id = ?"
-        params.append(task_id)
-        self.db.execute(query, params)
-        
-        # Add entries to history table
-        for update in history_updates:
-            self.db.execute(
-                "INSERT INTO task_history (task_id, field_name, old_value, new_value) VALUES (?, ?, ?, ?)",
-                update
+        # Update the task and its history as one commit
+        query = f"UPDATE tasks SET {', '.join(f'{field} = ?' for field, _, _ in changes)} WHERE id = ?"
+        params = [new_value for _, _, new_value in changes] + [task_id]
+        with self.db.transaction():
+            self.db.execute(query, params)
+            
+            # Add entries to history table
+            self.db.executemany(
+                "INSERT INTO task_history (task_id, user, field_name, old_value, new_value) VALUES (?, ?, ?, ?, ?)",
+                [self._history_row(task_id, change) for change in changes]
             )
+        self.db.notify_change("tasks", task_id)
             
         return True
     
+    def _changed_fields(self, task, fields):
+        """
+        Compare requested field values with a task row.
+        
+        Args:
+            task: Current task row
+            fields: Mapping of field name to new value; unknown fields are ignored
+            
+        Returns:
+            list: (field, old_value, new_value) for every field that changes
+            
+        Raises:
+            ValidationError: If the new name is blank or too long
+        """
+        changes = []
+        for field, new_value in fields.items():
+            if field not in UPDATABLE_FIELDS:
+                continue
+                
+            # Flags are stored as 0/1, never NULL
+            if field in ('completed', 'priority'):
+                new_value = bool(new_value)
+            elif field == 'name':
+                new_value = validate_name(new_value)
+            
+            # Skip fields that already hold this value (dates compare as text)
+            old_value = task[field] if field in task.keys() else None
+            if field in ('completed', 'priority'):
+                unchanged = old_value is not None and bool(old_value) == new_value
+            else:
+                unchanged = (old_value is None) == (new_value is None) and str(old_value) == str(new_value)
+            if not unchanged:
+                changes.append((field, old_value, new_value))
+        return changes
+    
+    def _history_row(self, task_id, change):
+        """Build the task_history parameters for one (field, old, new) change"""
+        field, old_value, new_value = change
+        return (task_id, self.owner, field, _history_value(old_value), _history_value(new_value))
+    
     def delete_task(self, task_id):
         """
         Delete a task and all its related data.
@@ -124,11 +298,150 @@ class TaskController:
             
         # Delete task (cascading will delete related entries)
         self.db.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+        self.db.notify_change("tasks", task_id)
         return True
     
+    def create_tasks(self, tasks):
+        """
+        Create many tasks in one transaction.
+        
+        Args:
+            tasks: Iterable of dicts with the create_task() arguments
+                   (name required; description, category, deadline, priority)
+            
+        Returns:
+            list: IDs of the created tasks, in input order
+            
+        Raises:
+            ValidationError: If a task name is invalid (nothing is created)
+        """
+        rows = []
+        for task in tasks:
+            name = validate_name(task.get('name'))
+            rows.append((name, task.get('description'), task.get('category'),
+                         task.get('deadline'), bool(task.get('priority', False)), self.owner))
+        if not rows:
+            return []
+        
+        with self.db.transaction():
+            self.db.executemany(
+                "INSERT INTO tasks (name, description, category, deadline, priority, owner) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            # AUTOINCREMENT ids of one write transaction are consecutive
+            last_id = self.db.execute("SELECT last_insert_rowid()", fetchone=True)[0]
+            first_id = last_id - len(rows) + 1
+            
+            # Log creation in history with a single statement
+            self.db.execute(
+                "INSERT INTO task_history (task_id, user, field_name, old_value, new_value) "
+                "SELECT id, owner, 'creation', NULL, 'Task created: ' || name FROM tasks WHERE id BETWEEN ? AND ?",
+                (first_id, last_id)
+            )
+        self.db.notify_change("tasks")
+        
+        return list(range(first_id, last_id + 1))
+    
+    def update_tasks(self, task_ids, **kwargs):
+        """
+        Apply the same field changes to many tasks in one transaction.
+        
+        Args:
+            task_ids: IDs of the tasks to update
+            **kwargs: Fields to update (see update_task())
+            
+        Returns:
+            int: Number of tasks that actually changed
+            
+        Raises:
+            ValueError: If one of the tasks doesn't exist (nothing is updated)
+            ValidationError: If the new name is blank or too long
+        """
+        tasks = self.get_tasks(task_ids, require_all=True)
+        
+        # Tasks changing the same set of fields share one UPDATE statement
+        statements = {}
+        history = []
+        for task in tasks:
+            changes = self._changed_fields(task, kwargs)
+            if not changes:
+                continue
+            fields = tuple(field for field, _, _ in changes)
+            statements.setdefault(fields, []).append(
+                [new_value for _, _, new_value in changes] + [task['id']]
+            )
+            history.extend(self._history_row(task['id'], change) for change in changes)
+        
+        if not statements:
+            return 0
+        
+        with self.db.transaction():
+            for fields, params in statements.items():
+                self.db.executemany(
+                    f"UPDATE tasks SET {', '.join(f'{field} = ?' for field in fields)} WHERE id = ?",
+                    params
+                )
+            self.db.executemany(
+                "INSERT INTO task_history (task_id, user, field_name, old_value, new_value) VALUES (?, ?, ?, ?, ?)",
+                history
+            )
+        self.db.notify_change("tasks")
+        
+        return sum(len(params) for params in statements.values())
+    
+    def delete_tasks(self, task_ids):
+        """
+        Delete many tasks and their related data in one transaction.
+        
+        Args:
+            task_ids: IDs of the tasks to delete
+            
+        Returns:
+            int: Number of tasks deleted
+            
+        Raises:
+            ValueError: If one of the tasks doesn't exist (nothing is deleted)
+        """
+        tasks = self.get_tasks(task_ids, require_all=True)
+        if not tasks:
+            return 0
+        
+        # Cascading deletes remove entries, notes and history as well
+        deleted = self.db.executemany("DELETE FROM tasks WHERE id = ?", [(task['id'],) for task in tasks])
+        self.db.notify_change("tasks")
+        return deleted
+    
+    def get_tasks(self, task_ids, require_all=False):
+        """
+        Get several tasks by ID with a few batched queries.
+        
+        Args:
+            task_ids: IDs of the tasks to retrieve
+            require_all: Raise if some of the tasks don't exist
+            
+        Returns:
+            list: Task rows in the order of task_ids (missing ones left out)
+            
+        Raises:
+            ValueError: If require_all is set and a task doesn't exist
+        """
+        ids = list(dict.fromkeys(task_ids))
+        found = {}
+        for batch in _batches(ids):
+            rows = self.db.execute(
+                f"SELECT * FROM tasks WHERE id IN ({', '.join('?' * len(batch))}) AND owner = ?",
+                (*batch, self.owner), fetchall=True
+            )
+            found.update((row['id'], row) for row in rows)
+        
+        missing = [task_id for task_id in ids if task_id not in found]
+        if require_all and missing:
+            raise ValueError(f"Tasks with IDs {missing[:10]} do not exist")
+        return [found[task_id] for task_id in ids if task_id in found]
+    
     def get_task(self, task_id):
         """
-        Get a single task by ID.
+        Get a single task by ID, from the cache when possible.
         
         Args:
             task_id: ID of the task to retrieve
@@ -136,11 +449,56 @@ class TaskController:
         Returns:
             dict: Task data or None if not found
         """
-        return self.db.execute(
-            "SELECT * FROM tasks WHERE id = ?", 
-            (task_id,), 
+        with self._cache_lock:
+            task = self._cache.get(task_id)
+            if task is not None:
+                self.cache_hits += 1
+                self._cache.move_to_end(task_id)
+                return task
+            self.cache_misses += 1
+            generation = self._cache_generation
+        
+        task = self.db.execute(
+            "SELECT * FROM tasks WHERE id = ? AND owner = ?", 
+            (task_id, self.owner), 
             fetchone=True
         )
+        if task is not None and self.cache_size != 0:
+            with self._cache_lock:
+                # Don't cache a row that was changed while we were reading it
+                if generation == self._cache_generation:
+                    self._cache[task_id] = task
+                    if self.cache_size is not None and len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+        return task
+    
+    def invalidate(self, task_id=None):
+        """
+        Drop a task row (or every row when task_id is None) from the cache.
+        
+        Args:
+            task_id: ID of the task to forget, or None
+        """
+        with self._cache_lock:
+            self._cache_generation += 1
+            if task_id is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(task_id, None)
+    
+    def cache_stats(self):
+        """
+        Get cache counters.
+        
+        Returns:
+            dict: hits, misses and current size of the task cache
+        """
+        return {"hits": self.cache_hits, "misses": self.cache_misses, "size": len(self._cache)}
+    
+    def _on_data_change(self, table, row_id):
+        """Database change listener keeping the cache coherent"""
+        if table == "tasks":
+            self.invalidate(row_id)
     
     def get_all_tasks(self, include_completed=True, sort_by='name'):
         """
@@ -153,22 +511,16 @@ class TaskController:
         Returns:
             list: List of task dictionaries
         """
-        query = "SELECT * FROM tasks"
-        params = []
+        query = "SELECT * FROM tasks WHERE owner = ?"
+        params = [self.owner]
         
         # Apply filter for completed tasks
         if not include_completed:
-            query += " WHERE completed = 0"
+            query += " AND completed = 0"
             
         # Add sorting
-        if sort_by == 'name':
-            query += " ORDER BY name"
-        elif sort_by == 'deadline':
-            query += " ORDER BY CASE WHEN deadline IS NULL THEN 1 ELSE 0 END, deadline, name"
-        elif sort_by == 'priority':
-            query += " ORDER BY priority DESC, name"
-        elif sort_by == 'category':
-            query += " ORDER BY category, name"
+        if sort_by in SORT_ORDERS:
+            query += f" ORDER BY {SORT_ORDERS[sort_by]}"
         
         return self.db.execute(query, tuple(params), fetchall=True)
     
@@ -185,8 +537,8 @@ class TaskController:
         Returns:
             list: List of task dictionaries
         """
-        query = "SELECT * FROM tasks WHERE 1=1"
-        params = []
+        query = "SELECT * FROM tasks WHERE owner = ?"
+        params = [self.owner]
         
         # Apply filters
         if completed is not None:
@@ -202,14 +554,114 @@ class TaskController:
             params.append(category)
             
         # Add sorting
-        if sort_by == 'name':
-            query += " ORDER BY name"
-        elif sort_by == 'deadline':
-            query += " ORDER BY CASE WHEN deadline IS NULL THEN 1 ELSE 0 END, deadline, name"
-        elif sort_by == 'priority':
-            query += " ORDER BY priority DESC, name"
-        elif sort_by == 'category':
-            query += " ORDER BY category, name"
+        if sort_by in SORT_ORDERS:
+            query += f" ORDER BY {SORT_ORDERS[sort_by]}"
+        
+        return self.db.execute(query, tuple(params), fetchall=True)
+    
+    def get_tasks_page(self, completed=None, sort_by='name', after=None, before=None, limit=200):
+        """
+        Get one page of tasks using keyset pagination.
+        
+        Pages are addressed by the sort cursor of a neighbouring row (see
+        sort_cursor), so fetching page N costs the same as fetching page 1.
+        
+        Args:
+            completed: Filter by completion status (True/False/None)
+            sort_by: Sorting criterion (name, deadline, priority, category)
+            after: Cursor of the row just before the page (next page)
+            before: Cursor of the row just after the page (previous page)
+            limit: Maximum number of rows to return
+            
+        Returns:
+            list: Task rows in display order
+            
+        Raises:
+            ValueError: If sort_by is unknown or both cursors are given
+        """
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f"Unknown sort criterion: {sort_by}")
+        if after is not None and before is not None:
+            raise ValueError("Pass either 'after' or 'before', not both")
+        
+        # Paging backwards walks the same index in reverse
+        reverse = before is not None
+        keys = tuple((expr, desc != reverse) for expr, desc in SORT_KEYS[sort_by] + (("id", False),))
+        
+        query = "SELECT * FROM tasks WHERE owner = ?"
+        params = [self.owner]
+        
+        if completed is not None:
+            query += " AND completed = ?"
+            params.append(completed)
+        
+        cursor = before if reverse else after
+        if cursor is not None:
+            condition, condition_params = _keyset_condition(keys, tuple(cursor))
+            query += f" AND {condition}"
+            params.extend(condition_params)
+        
+        order = ", ".join(f"{expr} DESC" if desc else expr for expr, desc in keys)
+        query += f" ORDER BY {order} LIMIT ?"
+        params.append(limit)
+        
+        rows = self.db.execute(query, tuple(params), fetchall=True)
+        return rows[::-1] if reverse else rows
+    
+    def sort_cursor(self, task, sort_by='name'):
+        """
+        Get the keyset cursor of a task row for get_tasks_page.
+        
+        Args:
+            task: Task row
+            sort_by: Sorting criterion the cursor is for
+            
+        Returns:
+            tuple: Sort key values followed by the task id
+        """
+        return tuple(_sort_key_value(task, expr) for expr, _ in SORT_KEYS[sort_by]) + (task['id'],)
+    
+    def search(self, text, completed=None, limit=50):
+        """
+        Full-text search over task names, descriptions and notes.
+        
+        Matching uses the FTS5 indexes (see migration 7): each word of
+        `text` matches as a prefix, and results are ranked by bm25 with
+        name hits weighted highest.
+        
+        Args:
+            text: Words to look for
+            completed: Filter by completion status (True/False/None)
+            limit: Maximum number of tasks to return
+            
+        Returns:
+            list: Task rows, best match first
+        """
+        match = _fts_query(text)
+        if match is None:
+            return []
+        
+        query = f"""
+        WITH matches(task_id, score) AS (
+            SELECT rowid, bm25(tasks_fts, {SEARCH_NAME_WEIGHT}, {SEARCH_DESCRIPTION_WEIGHT})
+            FROM tasks_fts WHERE tasks_fts MATCH ?
+            UNION ALL
+            SELECT n.task_id, bm25(notes_fts) * {SEARCH_NOTE_FACTOR}
+            FROM notes_fts JOIN notes n ON n.id = notes_fts.rowid
+            WHERE notes_fts MATCH ?
+        )
+        SELECT t.*
+        FROM matches m JOIN tasks t ON t.id = m.task_id
+        WHERE t.owner = ?
+        """
+        params = [match, match, self.owner]
+        if completed is not None:
+            query += " AND t.completed = ?"
+            params.append(completed)
+        
+        # bm25 scores are negative: the best match of a task is its minimum
+        query += " GROUP BY t.id ORDER BY MIN(m.score), t.name LIMIT ?"
+        params.append(limit)
         
         return self.db.execute(query, tuple(params), fetchall=True)
     
@@ -221,10 +673,11 @@ class TaskController:
             task_id: ID of the task
             
         Returns:
-            list: List of history entries
+            list: List of history entries (empty for other users' tasks)
         """
         return self.db.execute(
-            "SELECT * FROM task_history WHERE task_id = ? ORDER BY change_date DESC",
-            (task_id,),
+            "SELECT h.* FROM task_history h JOIN tasks t ON t.id = h.task_id AND t.owner = ? "
+            "WHERE h.task_id = ? ORDER BY h.change_date DESC",
+            (self.owner, task_id),
             fetchall=True
         )
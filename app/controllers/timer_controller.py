@@ -1,20 +1,84 @@
-import time
 import datetime
+import time
+
+from app.models.database import DEFAULT_OWNER
+
+# Fold a finished time entry into daily_rollups: params (seconds, entry_id)
+ROLLUP_UPSERT = """
+INSERT INTO daily_rollups (task_id, day, category, owner, seconds, entries)
+SELECT te.task_id, date(te.start_time), t.category, t.owner, ?, 1
+FROM time_entries te JOIN tasks t ON t.id = te.task_id
+WHERE te.id = ?
+ON CONFLICT(task_id, day) DO UPDATE SET
+    category = excluded.category,
+    seconds = seconds + excluded.seconds,
+    entries = entries + 1
+"""
+
+# Nanoseconds per second, for converting monotonic durations
+NS_PER_SECOND = 1_000_000_000
+
+# Seconds beyond the checkpoint interval before an open session whose
+# heartbeat stopped is taken to belong to a process that died
+HEARTBEAT_MARGIN = 30
 
 class TimerController:
-    def __init__(self, db_connection):
+    def __init__(self, db_connection, checkpoint_interval=30, owner=DEFAULT_OWNER):
         """
         Initialize the timer controller with database connection.
         
+        This is the single-timer interface used by the GUI: at most one
+        session is active at a time. It is backed by a TimerRegistry,
+        which can run any number of timers.
+        
+        Durations are measured with time.monotonic_ns, so changes to the
+        system clock don't affect them; wall-clock timestamps are only
+        stored for display and reporting.
+        
         Args:
             db_connection: Database instance for storing time entries
+            checkpoint_interval: Seconds between checkpoints of a running session
+            owner: User the sessions are recorded for
         """
         self.db = db_connection
-        self.current_task_id = None
-        self.start_time = None
-        self.is_running = False
-        self.paused_time = 0
-        self.current_entry_id = None
+        self.registry = TimerRegistry(db_connection, checkpoint_interval, owner)
+    
+    @property
+    def checkpoint_interval(self):
+        return self.registry.checkpoint_interval
+    
+    @property
+    def _state(self):
+        """The active session's timer state, or None"""
+        for state in self.registry.states():
+            return state
+        return None
+    
+    @property
+    def current_task_id(self):
+        state = self._state
+        return state.task_id if state is not None else None
+    
+    @property
+    def current_entry_id(self):
+        state = self._state
+        return state.entry_id if state is not None else None
+    
+    @property
+    def is_running(self):
+        state = self._state
+        return state is not None and state.running
+    
+    @property
+    def is_paused(self):
+        """True when a session is open but not running"""
+        state = self._state
+        return state is not None and not state.running
+    
+    @property
+    def paused_time(self):
+        """Seconds tracked by a paused session, 0 when not paused"""
+        return self.get_elapsed_time() if self.is_paused else 0
     
     def start(self, task_id):
         """
@@ -33,26 +97,11 @@ class TimerController:
         if self.is_running:
             raise RuntimeError("Timer is already running")
         
-        # Store the current task and start time
-        self.current_task_id = task_id
-        current_datetime = self.db.get_current_datetime()  # Synchronized with system
-        
-        # If we're resuming from pause, adjust the start time
-        if self.paused_time > 0:
-            self.start_time = time.time() - self.paused_time
-            self.paused_time = 0
-        else:
-            self.start_time = time.time()
-        
-        self.is_running = True
+        # Only the paused task itself can continue its session
+        if self.is_paused and task_id != self.current_task_id:
+            raise RuntimeError("Another task is paused; stop it first")
         
-        # Create a new time entry in the database
-        self.current_entry_id = self.db.execute(
-            "INSERT INTO time_entries (task_id, start_time) VALUES (?, ?)",
-            (task_id, current_datetime)
-        )
-        
-        return self.current_entry_id
+        return self.registry.start(task_id)
     
     def pause(self):
         """
@@ -63,70 +112,88 @@ class TimerController:
         """
         if not self.is_running:
             raise RuntimeError("Timer is not running")
-        
-        # Store how much time has elapsed so far
-        self.paused_time = time.time() - self.start_time
-        self.is_running = False
+        self.registry.pause(self.current_task_id)
     
     def resume(self):
         """
-        Resume a paused timer.
+        Resume a paused timer in a new segment of the same session.
         
         Raises:
             RuntimeError: If timer is not paused
         """
-        if self.is_running or self.paused_time == 0:
+        if not self.is_paused:
             raise RuntimeError("Timer is not paused")
-            
-        # Reset start time based on the pause duration
-        self.start_time = time.time() - self.paused_time
-        self.is_running = True
+        self.registry.resume(self.current_task_id)
     
     def stop(self):
         """
         Stop timing and update the database with the session duration.
         
         Returns:
-            duration: The session duration in seconds
+            duration: The session duration in whole seconds
             
         Raises:
             RuntimeError: If timer is not running or paused
         """
-        if not self.is_running and self.paused_time == 0:
+        if self._state is None:
             raise RuntimeError("Timer is not running or paused")
+        return self.registry.stop(self.current_task_id)
+    
+    def checkpoint(self, force=False):
+        """
+        Save the elapsed time of the active session, if a checkpoint is due.
         
-        # Get current time for the end timestamp
-        current_datetime = self.db.get_current_datetime()
-        
-        # Calculate duration based on whether timer is running or paused
-        duration = int(time.time() - self.start_time) if self.is_running else int(self.paused_time)
+        Args:
+            force: Write even if the interval hasn't elapsed
+            
+        Returns:
+            bool: True if a checkpoint was written
+        """
+        return self.registry.checkpoint(force) > 0
+    
+    def release(self):
+        """
+        Leave the active session to the next process without ending it.
         
-        # Update the time entry in the database
-        self.db.execute(
-            "UPDATE time_entries SET end_time = ?, duration = ? WHERE id = ?",
-            (current_datetime, duration, self.current_entry_id)
-        )
+        See TimerRegistry.release_all(): a running session is paused, and
+        the next recover() restores it even if that comes at once.
         
-        # Update the total time for the task
-        self.db.execute(
-            "UPDATE tasks SET total_time = total_time + ? WHERE id = ?",
-            (duration, self.current_task_id)
-        )
+        Returns:
+            bool: True if a session was released
+        """
+        return self.registry.release_all() > 0
+    
+    def recover(self, resume=False):
+        """
+        Deal with sessions left open by a crash (time entries without end_time).
         
-        # Record in task history
-        self.db.execute(
-            "INSERT INTO task_history (task_id, field_name, old_value, new_value) VALUES (?, ?, ?, ?)",
-            (self.current_task_id, "total_time", "updated", f"+{duration} seconds")
-        )
+        See TimerRegistry.recover(); with resume=True only the most recent
+        session is restored (paused), the others are closed.
         
-        # Reset the timer state
-        self.current_task_id = None
-        self.current_entry_id = None
-        self.start_time = None
-        self.is_running = False
-        self.paused_time = 0
+        Args:
+            resume: Restore the latest open session instead of closing it
+            
+        Returns:
+            list: (entry_id, task_id, seconds) for every session closed
+            
+        Raises:
+            RuntimeError: If a timer is already active in this process
+        """
+        return self.registry.recover(resume=resume, max_resumed=1)
+    
+    def _reset(self):
+        """Forget the current session without writing anything"""
+        self.registry.discard_all()
+    
+    def get_elapsed_ns(self):
+        """
+        Get the elapsed time of the current session in nanoseconds.
         
-        return duration
+        Returns:
+            int: Elapsed monotonic time, or 0 if timer is not active
+        """
+        state = self._state
+        return state.elapsed_at(time.monotonic_ns()) if state is not None else 0
     
     def get_elapsed_time(self):
         """
@@ -135,10 +202,7 @@ class TimerController:
         Returns:
             float: Elapsed time in seconds, or 0 if timer is not active
         """
-        if not self.is_running and self.paused_time == 0:
-            return 0
-            
-        return time.time() - self.start_time if self.is_running else self.paused_time
+        return self.get_elapsed_ns() / NS_PER_SECOND
         
     def format_time(self, seconds):
         """
@@ -155,3 +219,576 @@ class TimerController:
         seconds = int(seconds % 60)
         
         return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+class TimerRegistry:
+    """
+    Any number of concurrent timers, one per task.
+    
+    Timer state lives in memory (one small _TimerState per active task),
+    so reading elapsed times never touches the database. Writes that
+    affect several timers (stop_many, checkpoint) are batched into one
+    transaction.
+    """
+    
+    def __init__(self, db_connection, checkpoint_interval=30, owner=DEFAULT_OWNER):
+        """
+        Initialize the registry with database connection.
+        
+        Sessions are recorded for one user: recover() and stored_sessions()
+        only see that user's open sessions, so processes of different users
+        can time tasks in the same database at once.
+        
+        A process holding timers must checkpoint them at least once per
+        checkpoint_interval (paused ones too, see checkpoint(force=True)):
+        the heartbeat written there is how other processes of the same
+        user tell its sessions from ones left behind by a crash.
+        
+        Args:
+            db_connection: Database instance for storing time entries
+            checkpoint_interval: Seconds between checkpoints of a running timer
+            owner: User the sessions are recorded for
+        """
+        self.db = db_connection
+        self.checkpoint_interval = checkpoint_interval
+        self.owner = owner
+        self._timers = {}  # task_id -> _TimerState, in start order
+    
+    def __len__(self):
+        return len(self._timers)
+    
+    def __contains__(self, task_id):
+        return task_id in self._timers
+    
+    def get(self, task_id):
+        """Return the timer state of a task, or None if it has no active timer"""
+        return self._timers.get(task_id)
+    
+    def states(self):
+        """Timer states of all active (running or paused) timers"""
+        return list(self._timers.values())
+    
+    def active_task_ids(self):
+        """IDs of the tasks with a running or paused timer"""
+        return list(self._timers)
+    
+    def running_task_ids(self):
+        """IDs of the tasks whose timer is running"""
+        return [task_id for task_id, state in self._timers.items() if state.running]
+    
+    def start(self, task_id):
+        """
+        Start timing a task, or resume its timer if it is paused.
+        
+        Args:
+            task_id: ID of the task to time
+            
+        Returns:
+            entry_id: ID of the task's time entry
+            
+        Raises:
+            ValueError: If the task doesn't exist or belongs to another user
+            RuntimeError: If the task's timer is already running, here or
+                          in another process
+        """
+        state = self._timers.get(task_id)
+        if state is not None:
+            if state.running:
+                raise RuntimeError("Timer is already running")
+            self.resume(task_id)
+            return state.entry_id
+        
+        current_datetime = self.db.get_current_datetime()  # Synchronized with system
+        
+        # Create a new time entry and its first segment in the database
+        with self.db.transaction():
+            if not self.db.execute("SELECT 1 FROM tasks WHERE id = ? AND owner = ?",
+                                   (task_id, self.owner), fetchone=True):
+                raise ValueError(f"Task with ID {task_id} does not exist")
+            held = self.db.execute(
+                "SELECT heartbeat, detached_at FROM time_entries "
+                "WHERE task_id = ? AND owner = ? AND end_time IS NULL",
+                (task_id, self.owner), fetchall=True
+            )
+            if any(self._is_held(entry, current_datetime) for entry in held):
+                raise RuntimeError(f"Task {task_id} is being timed by another process")
+            entry_id = self.db.execute(
+                "INSERT INTO time_entries (task_id, owner, start_time, heartbeat, duration, duration_ns) "
+                "VALUES (?, ?, ?, ?, 0, 0)",
+                (task_id, self.owner, current_datetime, current_datetime)
+            )
+            segment_id = self._insert_segment(entry_id, current_datetime)
+        
+        state = _TimerState(task_id, entry_id)
+        state.begin(segment_id)
+        self._timers[task_id] = state
+        return entry_id
+    
+    def pause(self, task_id):
+        """
+        Pause a running timer without ending its session.
+        
+        Args:
+            task_id: ID of the timed task
+            
+        Raises:
+            RuntimeError: If the task's timer is not running
+        """
+        state = self._timers.get(task_id)
+        if state is None or not state.running:
+            raise RuntimeError("Timer is not running")
+        
+        # Close the running segment and persist the paused state, so a
+        # crash while paused loses nothing
+        end_time = self.db.get_current_datetime()
+        now_ns = time.monotonic_ns()
+        with self.db.transaction():
+            self._end_segments([state], end_time, now_ns)
+            self._write_checkpoints([state], end_time, now_ns)
+        state.end(now_ns)
+    
+    def resume(self, task_id):
+        """
+        Resume a paused timer in a new segment of the same session.
+        
+        Args:
+            task_id: ID of the timed task
+            
+        Raises:
+            RuntimeError: If the task's timer is not paused
+        """
+        state = self._timers.get(task_id)
+        if state is None or state.running:
+            raise RuntimeError("Timer is not paused")
+        
+        segment_id = self._insert_segment(state.entry_id, self.db.get_current_datetime())
+        state.begin(segment_id)
+    
+    def stop(self, task_id):
+        """
+        Stop a task's timer and store the session.
+        
+        Args:
+            task_id: ID of the timed task
+            
+        Returns:
+            int: The session duration in whole seconds
+            
+        Raises:
+            RuntimeError: If the task's timer is not running or paused
+        """
+        return self.stop_many([task_id])[task_id]
+    
+    def stop_all(self):
+        """
+        Stop every active timer in one transaction.
+        
+        Returns:
+            dict: Session duration in whole seconds per task ID
+        """
+        return self.stop_many(self.active_task_ids())
+    
+    def stop_many(self, task_ids):
+        """
+        Stop several timers and store their sessions in one transaction.
+        
+        Args:
+            task_ids: IDs of the timed tasks
+            
+        Returns:
+            dict: Session duration in whole seconds per task ID
+            
+        Raises:
+            RuntimeError: If one of the tasks has no running or paused timer
+        """
+        states = []
+        for task_id in task_ids:
+            state = self._timers.get(task_id)
+            if state is None:
+                raise RuntimeError("Timer is not running or paused")
+            states.append(state)
+        if not states:
+            return {}
+        
+        # Get current time for the end timestamps
+        end_time = self.db.get_current_datetime()
+        now_ns = time.monotonic_ns()
+        with self.db.transaction():
+            self._end_segments([state for state in states if state.running], end_time, now_ns)
+            self._close_entries(
+                [(state.entry_id, state.task_id, state.elapsed_at(now_ns)) for state in states],
+                end_time
+            )
+        
+        durations = {}
+        for state in states:
+            durations[state.task_id] = state.elapsed_at(now_ns) // NS_PER_SECOND
+            del self._timers[state.task_id]
+        return durations
+    
+    def discard_all(self):
+        """Forget all timers without writing anything"""
+        self._timers.clear()
+    
+    def detach_all(self):
+        """
+        Hand the active timers over to a later process and forget them here.
+        
+        Running timers are checkpointed and marked detached: their sessions
+        keep counting wall-clock time until recover() picks them up again,
+        in this process or another one. Paused timers are saved without a
+        heartbeat, so they are no longer held and come back paused.
+        
+        Returns:
+            int: Number of running timers detached
+        """
+        running = [state for state in self._timers.values() if state.running]
+        if self._timers:
+            now = self.db.get_current_datetime()
+            now_ns = time.monotonic_ns()
+            with self.db.transaction():
+                self._write_checkpoints(running, now, now_ns)
+                self._write_checkpoints([state for state in self._timers.values() if not state.running],
+                                        None, now_ns)
+                self.db.executemany(
+                    "UPDATE time_entries SET detached_at = ? WHERE id = ?",
+                    [(now, state.entry_id) for state in running]
+                )
+        self._timers.clear()
+        return len(running)
+    
+    def release_all(self):
+        """
+        Stop timing in this process without ending the sessions.
+        
+        Running timers are paused; every session is saved without a
+        heartbeat, so the next recover() (here or in another process)
+        restores it at once instead of waiting for it to go stale.
+        
+        Returns:
+            int: Number of timers released
+        """
+        states = self.states()
+        if states:
+            end_time = self.db.get_current_datetime()
+            now_ns = time.monotonic_ns()
+            with self.db.transaction():
+                self._end_segments([state for state in states if state.running], end_time, now_ns)
+                self._write_checkpoints(states, None, now_ns)
+        self._timers.clear()
+        return len(states)
+    
+    def stored_sessions(self):
+        """
+        List the sessions open in the database without restoring them.
+        
+        Returns:
+            list: Dicts with entry_id, task_id, start_time, seconds,
+                  detached (True when still running in wall-clock time) and
+                  held (True when a live process is timing it)
+        """
+        now = self.db.get_current_datetime()
+        sessions = []
+        for entry in self.db.execute(
+            "SELECT id, task_id, start_time, heartbeat, detached_at, duration, duration_ns FROM time_entries "
+            "WHERE end_time IS NULL AND owner = ? ORDER BY id",
+            (self.owner,), fetchall=True
+        ):
+            elapsed_ns = self._stored_elapsed_ns(entry)
+            if entry['detached_at'] is not None:
+                elapsed_ns += _wall_gap_ns(entry['detached_at'], now)
+            sessions.append({
+                "entry_id": entry['id'],
+                "task_id": entry['task_id'],
+                "start_time": entry['start_time'],
+                "seconds": elapsed_ns // NS_PER_SECOND,
+                "detached": entry['detached_at'] is not None,
+                "held": self._is_held(entry, now),
+            })
+        return sessions
+    
+    def elapsed_time(self, task_id):
+        """
+        Get the elapsed time of a task's session in seconds.
+        
+        Returns:
+            float: Elapsed time in seconds, or 0 if the task has no active timer
+        """
+        state = self._timers.get(task_id)
+        return state.elapsed_at(time.monotonic_ns()) / NS_PER_SECOND if state is not None else 0
+    
+    def elapsed_times(self):
+        """
+        Get the elapsed time of every active timer, without database access.
+        
+        Returns:
+            dict: Elapsed seconds per task ID
+        """
+        now_ns = time.monotonic_ns()
+        return {task_id: state.elapsed_at(now_ns) / NS_PER_SECOND
+                for task_id, state in self._timers.items()}
+    
+    def checkpoint(self, force=False):
+        """
+        Save the elapsed time of the timers whose checkpoint is due.
+        
+        All of them are written with one batched UPDATE: if the app dies,
+        recover() closes the sessions with the time saved here.
+        
+        Args:
+            force: Write every active timer, due or not
+            
+        Returns:
+            int: Number of timers checkpointed
+        """
+        now = time.monotonic()
+        states = [state for state in self._timers.values() if force or self._is_due(state, now)]
+        if states:
+            self._write_checkpoints(states, self.db.get_current_datetime(), time.monotonic_ns())
+        return len(states)
+    
+    def recover(self, resume=False, max_resumed=None, task_ids=None):
+        """
+        Deal with sessions left open by a crash (time entries without end_time).
+        
+        Each one is closed at its last checkpoint with the elapsed time saved
+        there; the segment that was running gets whatever part of that time
+        the finished segments don't account for. With resume=True the most
+        recent sessions (one per task) are instead restored as paused timers,
+        which can be resumed or stopped as usual.
+        
+        Detached sessions (see detach_all) did not crash: they count as
+        running until now, and are restored running in a new segment.
+        
+        Sessions another process is still timing are left alone: only
+        detached or released sessions and those whose heartbeat is older
+        than checkpoint_interval + HEARTBEAT_MARGIN are recovered. Restored
+        sessions get a fresh heartbeat, which claims them for this process.
+        
+        Args:
+            resume: Restore open sessions instead of closing them
+            max_resumed: Restore at most this many sessions (default: all)
+            task_ids: Only recover the sessions of these tasks (default: all)
+            
+        Returns:
+            list: (entry_id, task_id, seconds) for every session closed
+            
+        Raises:
+            RuntimeError: If a timer is already active in this process
+        """
+        if self._timers:
+            raise RuntimeError("Cannot recover while a timer is active")
+        
+        now = self.db.get_current_datetime()
+        open_entries = [entry for entry in self.db.execute(
+            "SELECT id, task_id, start_time, heartbeat, detached_at, duration, duration_ns FROM time_entries "
+            "WHERE end_time IS NULL AND owner = ? ORDER BY id",
+            (self.owner,), fetchall=True
+        ) if not self._is_held(entry, now) and (task_ids is None or entry['task_id'] in task_ids)]
+        
+        # Newest session of each task first, until max_resumed are restored
+        restored = {}
+        if resume:
+            for entry in reversed(open_entries):
+                if max_resumed is not None and len(restored) >= max_resumed:
+                    break
+                restored.setdefault(entry['task_id'], entry['id'])
+        
+        closed = []
+        to_close = []
+        with self.db.transaction():
+            resumed = []
+            reattached = []
+            for entry in open_entries:
+                elapsed_ns = self._stored_elapsed_ns(entry)
+                end_time = entry['heartbeat'] or self._last_segment_end(entry)
+                if entry['detached_at'] is not None:
+                    elapsed_ns += _wall_gap_ns(entry['detached_at'], now)
+                    end_time = now
+                self._close_open_segment(entry, elapsed_ns, end_time)
+                
+                if restored.get(entry['task_id']) == entry['id']:
+                    state = _TimerState(entry['task_id'], entry['id'], elapsed_ns)
+                    if entry['detached_at'] is not None:
+                        state.begin(self._insert_segment(entry['id'], now))
+                        reattached.append(state)
+                    resumed.append(state)
+                    self._timers[entry['task_id']] = state
+                else:
+                    to_close.append((entry['id'], entry['task_id'], elapsed_ns, end_time))
+                    closed.append((entry['id'], entry['task_id'], elapsed_ns // NS_PER_SECOND))
+            
+            for entry_id, task_id, elapsed_ns, end_time in to_close:
+                self._close_entries([(entry_id, task_id, elapsed_ns)], end_time)
+            
+            # Held by this process now; detached ones are running here
+            # again, so a crash from now on is an ordinary crash
+            if resumed:
+                self._write_checkpoints(resumed, now, time.monotonic_ns())
+            if reattached:
+                self.db.executemany(
+                    "UPDATE time_entries SET detached_at = NULL WHERE id = ?",
+                    [(state.entry_id,) for state in reattached]
+                )
+        
+        # Keep the restored timers in the order they were started
+        self._timers = dict(sorted(self._timers.items(), key=lambda item: item[1].entry_id))
+        return closed
+    
+    def _stored_elapsed_ns(self, entry):
+        """Elapsed time saved in an open time entry (older rows only have seconds)"""
+        if entry['duration_ns'] is not None:
+            return entry['duration_ns']
+        return (entry['duration'] or 0) * NS_PER_SECOND
+    
+    def _last_segment_end(self, entry):
+        """End of a session released (or saved) without a heartbeat: its last finished segment"""
+        ended_at = self.db.execute(
+            "SELECT MAX(ended_at) FROM time_segments WHERE entry_id = ?", (entry['id'],), fetchone=True
+        )[0]
+        return ended_at or entry['start_time']
+    
+    def _is_held(self, entry, now):
+        """True when an open time entry's heartbeat shows a live process timing it"""
+        if entry['detached_at'] is not None or entry['heartbeat'] is None:
+            return False
+        stale_after = (self.checkpoint_interval + HEARTBEAT_MARGIN) * NS_PER_SECOND
+        return _wall_gap_ns(entry['heartbeat'], now) <= stale_after
+    
+    def _is_due(self, state, now):
+        """True when a running timer's checkpoint interval has elapsed"""
+        return (state.running and state.last_checkpoint is not None
+                and now - state.last_checkpoint >= self.checkpoint_interval)
+    
+    def _insert_segment(self, entry_id, started_at):
+        """Add an open segment to a time entry and return its ID"""
+        return self.db.execute(
+            "INSERT INTO time_segments (entry_id, started_at) VALUES (?, ?)",
+            (entry_id, started_at)
+        )
+    
+    def _end_segments(self, states, end_time, now_ns):
+        """Store the duration of the running segment of each timer"""
+        if states:
+            self.db.executemany(
+                "UPDATE time_segments SET ended_at = ?, duration_ns = ? WHERE id = ?",
+                [(end_time, now_ns - state.segment_start_ns, state.segment_id) for state in states]
+            )
+    
+    def _write_checkpoints(self, states, heartbeat, now_ns):
+        """Save the elapsed time of the given timers in their time entries"""
+        rows = []
+        for state in states:
+            elapsed_ns = state.elapsed_at(now_ns)
+            rows.append((heartbeat, elapsed_ns // NS_PER_SECOND, elapsed_ns, state.entry_id))
+        self.db.executemany(
+            "UPDATE time_entries SET heartbeat = ?, duration = ?, duration_ns = ? WHERE id = ?",
+            rows
+        )
+        checkpoint_time = time.monotonic()
+        for state in states:
+            state.last_checkpoint = checkpoint_time
+    
+    def _close_open_segment(self, entry, elapsed_ns, end_time):
+        """End the segment a crashed session was running in at its last checkpoint"""
+        finished_ns = self.db.execute(
+            "SELECT COALESCE(SUM(duration_ns), 0) FROM time_segments "
+            "WHERE entry_id = ? AND ended_at IS NOT NULL",
+            (entry['id'],), fetchone=True
+        )[0]
+        remaining_ns = max(elapsed_ns - finished_ns, 0)
+        
+        open_segment = self.db.execute(
+            "SELECT id FROM time_segments WHERE entry_id = ? AND ended_at IS NULL",
+            (entry['id'],), fetchone=True
+        )
+        if open_segment is not None:
+            self.db.execute(
+                "UPDATE time_segments SET ended_at = ?, duration_ns = ? WHERE id = ?",
+                (end_time, remaining_ns, open_segment['id'])
+            )
+        elif remaining_ns:
+            # Sessions started before segments existed have none to close
+            self.db.execute(
+                "INSERT INTO time_segments (entry_id, started_at, ended_at, duration_ns) VALUES (?, ?, ?, ?)",
+                (entry['id'], entry['start_time'], end_time, remaining_ns)
+            )
+    
+    def _close_entries(self, sessions, end_time):
+        """
+        Finish time entries and fold them into task totals, history and rollups.
+        
+        Args:
+            sessions: (entry_id, task_id, duration_ns) tuples
+            end_time: End timestamp stored on every entry
+        """
+        rows = [(entry_id, task_id, duration_ns, duration_ns // NS_PER_SECOND)
+                for entry_id, task_id, duration_ns in sessions]
+        with self.db.transaction():
+            # Update the time entries in the database
+            self.db.executemany(
+                "UPDATE time_entries SET end_time = ?, duration = ?, duration_ns = ?, heartbeat = NULL, "
+                "detached_at = NULL WHERE id = ?",
+                [(end_time, seconds, duration_ns, entry_id) for entry_id, _, duration_ns, seconds in rows]
+            )
+            
+            # Update the total time for the tasks
+            self.db.executemany(
+                "UPDATE tasks SET total_time = total_time + ? WHERE id = ?",
+                [(seconds, task_id) for _, task_id, _, seconds in rows]
+            )
+            
+            # Record in task history
+            self.db.executemany(
+                "INSERT INTO task_history (task_id, user, field_name, delta) VALUES (?, ?, 'total_time', ?)",
+                [(task_id, self.owner, seconds) for _, task_id, _, seconds in rows]
+            )
+            
+            # Add each session to the rollup of the day it started
+            self.db.executemany(ROLLUP_UPSERT, [(seconds, entry_id) for entry_id, _, _, seconds in rows])
+        for entry_id, task_id, _, _ in rows:
+            self.db.notify_change("tasks", task_id)
+            self.db.notify_change("time_entries", entry_id)
+
+
+def _wall_gap_ns(since, now):
+    """Wall-clock nanoseconds from a stored timestamp to now (never negative)"""
+    if not isinstance(since, datetime.datetime):
+        since = datetime.datetime.fromisoformat(str(since))
+    return max(int((now - since).total_seconds() * NS_PER_SECOND), 0)
+
+
+class _TimerState:
+    """In-memory state of one active timer"""
+    
+    __slots__ = ("task_id", "entry_id", "segment_id", "elapsed_ns", "segment_start_ns", "last_checkpoint")
+    
+    def __init__(self, task_id, entry_id, elapsed_ns=0):
+        self.task_id = task_id
+        self.entry_id = entry_id
+        self.segment_id = None          # Running segment, None while paused
+        self.elapsed_ns = elapsed_ns    # Time of the finished segments
+        self.segment_start_ns = None    # monotonic_ns() when the running segment began
+        self.last_checkpoint = None
+    
+    @property
+    def running(self):
+        return self.segment_start_ns is not None
+    
+    def elapsed_at(self, now_ns):
+        """Elapsed nanoseconds of the session at monotonic time now_ns"""
+        if self.segment_start_ns is None:
+            return self.elapsed_ns
+        return self.elapsed_ns + now_ns - self.segment_start_ns
+    
+    def begin(self, segment_id):
+        """Start running in the given segment"""
+        self.segment_id = segment_id
+        self.segment_start_ns = time.monotonic_ns()
+        self.last_checkpoint = time.monotonic()
+    
+    def end(self, now_ns):
+        """Fold the running segment into the elapsed time and stop running"""
+        self.elapsed_ns = self.elapsed_at(now_ns)
+        self.segment_id = None
+        self.segment_start_ns = None
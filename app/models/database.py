@@ -1,111 +1,474 @@
 import sqlite3
 import datetime
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from app.models.instrumentation import SLOW_QUERY_MS, QueryStats
+from app.models.migrations import run_migrations
+
+# Connection profiles: PRAGMA settings applied when the connection is opened.
+# "default" keeps SQLite's own defaults (rollback journal, synchronous=FULL).
+# The WAL profiles let readers (reports, exports) run while the timer writes.
+CONNECTION_PROFILES = {
+    "default": {},
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+    },
+    "performance": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,           # Negative value = size in KiB (64 MB)
+        "mmap_size": 268435456,         # 256 MB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+}
+
+# PRAGMAs a profile is allowed to set
+PROFILE_PRAGMAS = ("journal_mode", "synchronous", "cache_size", "mmap_size", "temp_store", "busy_timeout")
+
+# Owner of rows created without a user (the column default of migration 11)
+DEFAULT_OWNER = "default_user"
+
+# Retries of a statement that failed with "database is locked" once the
+# busy timeout ran out, or that SQLite refused without waiting at all.
+# The delay doubles from BUSY_BACKOFF up to BUSY_BACKOFF_MAX seconds, with
+# jitter so that writers which collided don't collide again.
+BUSY_RETRIES = 6
+BUSY_BACKOFF = 0.005
+BUSY_BACKOFF_MAX = 0.5
+
+# Extended result codes are masked down to these primary codes
+SQLITE_BUSY = 5
+SQLITE_LOCKED = 6
+
+# A BEGIN IMMEDIATE slower than this counts as having waited for the lock
+LOCK_WAIT_NS = 1_000_000
+
+
+def resolve_profile(profile):
+    """
+    Turn a profile name or a dict of overrides into a dict of PRAGMA values.
+    
+    Args:
+        profile: Name from CONNECTION_PROFILES, a dict of PRAGMA values, or None
+        
+    Returns:
+        dict: PRAGMA name -> value
+        
+    Raises:
+        ValueError: If the profile name or a PRAGMA name is unknown
+    """
+    if profile is None:
+        return {}
+    if isinstance(profile, str):
+        if profile not in CONNECTION_PROFILES:
+            raise ValueError(f"Unknown connection profile: {profile}")
+        return dict(CONNECTION_PROFILES[profile])
+    
+    unknown = set(profile) - set(PROFILE_PRAGMAS)
+    if unknown:
+        raise ValueError(f"Unsupported PRAGMA(s) in profile: {', '.join(sorted(unknown))}")
+
+    # Values are interpolated into the PRAGMA statement, so keep them simple
+    for name, value in profile.items():
+        if not str(value).lstrip("-").isalnum():
+            raise ValueError(f"Invalid value for PRAGMA {name}: {value!r}")
+    return dict(profile)
+
+
+def is_busy_error(error):
+    """True if an sqlite3 error means another connection holds a lock"""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    code = getattr(error, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in (SQLITE_BUSY, SQLITE_LOCKED)
+    message = str(error)
+    return "database is locked" in message or "database table is locked" in message
+
 
 class Database:
-    def __init__(self, db_path="time_app.db"):
+    def __init__(self, db_path="time_app.db", profile="default", busy_retries=BUSY_RETRIES,
+                 instrument=False, slow_query_ms=SLOW_QUERY_MS):
         """
         Initialize the database connection with support for:
         - Automated time tracking
         - Deadlines
         - History tracking
+        
+        Args:
+            db_path: Path to the SQLite file (":memory:" for tests)
+            profile: Connection profile name or dict of PRAGMA values
+            busy_retries: Retries of a write that found the database locked
+            instrument: Record statement timings from the start (see stats())
+            slow_query_ms: Threshold of the slow-query log when instrumented
         """
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
+        self.profile = resolve_profile(profile)
+        self.busy_retries = busy_retries
+        self._change_listeners = []
+        
+        # Lock contention counters, shared by the connections of all threads
+        self._contention_lock = threading.Lock()
+        self._contention = dict.fromkeys(("busy", "retries", "failures", "waits", "wait_ns"), 0)
+        
+        # Statement statistics (app/models/instrumentation.py); None when off
+        self.query_stats = None
+        if instrument:
+            self.enable_instrumentation(slow_query_ms)
+        
+        # One connection per thread, so background workers (exports, the DB
+        # executor) never share a connection with the GUI thread. An
+        # in-memory database only exists inside its connection, so it keeps
+        # a single connection for every thread.
+        self._local = threading.local()
+        self._shared_state = _ConnectionState() if db_path == ":memory:" else None
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        
+        self.create_tables()
+
+    def _connect(self):
+        """Open and configure a new connection"""
+        # Autocommit mode: transactions are managed explicitly by transaction().
+        # Each connection is only used by one thread at a time (see _state),
+        # but close() may run on another thread.
+        conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
         
         # Enable foreign keys for data integrity
-        self.conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA foreign_keys = ON")
+        
+        # journal_mode is listed first in PROFILE_PRAGMAS, so WAL is active
+        # before the remaining settings are applied
+        for pragma in PROFILE_PRAGMAS:
+            if pragma in self.profile:
+                conn.execute(f"PRAGMA {pragma} = {self.profile[pragma]}").fetchall()
         
         # This allows accessing columns by name (more readable)
-        self.conn.row_factory = sqlite3.Row
+        conn.row_factory = sqlite3.Row
         
-        self.create_tables()
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    def _state(self):
+        """Return the connection state (connection + transaction depth) of this thread"""
+        state = self._shared_state or getattr(self._local, "state", None)
+        if state is None:
+            state = self._local.state = _ConnectionState()
+        if state.conn is None:
+            state.conn = self._connect()
+        return state
+
+    @property
+    def conn(self):
+        """The sqlite3 connection of the calling thread (opened on first use)"""
+        return self._state().conn
+
+    @property
+    def _transaction_depth(self):
+        return self._state().depth
+
+    @_transaction_depth.setter
+    def _transaction_depth(self, value):
+        self._state().depth = value
+
+    def get_pragma(self, name):
+        """Return the current value of a PRAGMA (used by diagnostics and benchmarks)"""
+        return self.conn.execute(f"PRAGMA {name}").fetchone()[0]
 
     def create_tables(self):
         """
-        Create database tables with support for the new features.
-        Automatically adds the priority column if it doesn't exist.
+        Bring the schema up to date by applying any pending migration.
+        See app/models/migrations.py.
         """
-        cursor = self.conn.cursor()
+        # Reading the schema version can find another process mid-write
+        self._retry_busy(run_migrations, self)
+
+    def explain(self, query, params=()):
+        """
+        Return the EXPLAIN QUERY PLAN details for a query.
+        
+        Returns:
+            list: One detail string per plan step
+        """
+        rows = self.conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+        return [row[3] for row in rows]
+
+    @property
+    def in_transaction(self):
+        """True while inside a transaction() block"""
+        return self._transaction_depth > 0
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group several statements into one atomic unit of work.
+        
+        The outermost block opens an IMMEDIATE transaction and commits once
+        on exit; nested blocks use savepoints, so an exception inside an
+        inner block only rolls back that block's statements.
+        
+        Usage:
+            with db.transaction():
+                db.execute(...)
+                db.execute(...)
+        """
+        depth = self._transaction_depth
+        savepoint = f"sp_{depth}"
+        
+        if depth == 0:
+            # Other processes may hold the write lock: wait for it here,
+            # before any statement of the block has run
+            started = time.perf_counter_ns()
+            self._retry_busy(self.conn.execute, "BEGIN IMMEDIATE")
+            waited = time.perf_counter_ns() - started
+            if waited > LOCK_WAIT_NS:
+                self._count(waits=1, wait_ns=waited)
+        else:
+            self.conn.execute(f"SAVEPOINT {savepoint}")
+        self._transaction_depth += 1
         
-        # Tasks table with deadline support
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS tasks (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            description TEXT,
-            category TEXT,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            deadline DATETIME,                      -- New: deadline date/time
-            completed BOOLEAN DEFAULT 0,
-            priority BOOLEAN DEFAULT 0,             -- Corretta la virgola mancante qui
-            total_time INTEGER DEFAULT 0            -- Tracked time in seconds
-        )
-        """)
         try:
-            cursor.execute("PRAGMA table_info(tasks)")
-            columns = [col[1] for col in cursor.fetchall()]
-            if 'priority' not in columns:
-                cursor.execute("ALTER TABLE tasks ADD COLUMN priority BOOLEAN DEFAULT 0")
-        except:
-            pass  # Column might already exist
-    
+            yield self
+        except BaseException:
+            self._transaction_depth -= 1
+            if depth == 0:
+                self.conn.execute("ROLLBACK")
+            else:
+                self.conn.execute(f"ROLLBACK TO {savepoint}")
+                self.conn.execute(f"RELEASE {savepoint}")
+            raise
         
-        # Time entries for session tracking
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS time_entries (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            task_id INTEGER NOT NULL,
-            start_time DATETIME NOT NULL,           -- Session start timestamp
-            end_time DATETIME,                      -- Session end timestamp
-            duration INTEGER,                       -- Session duration in seconds
-            FOREIGN KEY(task_id) REFERENCES tasks(id) ON DELETE CASCADE
-        )
-        """)
-        
-        # Notes table
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS notes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            task_id INTEGER NOT NULL,
-            content TEXT NOT NULL,
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY(task_id) REFERENCES tasks(id) ON DELETE CASCADE
-        )
-        """)
-        
-        # New: Task history for tracking changes
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS task_history (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            task_id INTEGER NOT NULL,
-            change_date DATETIME DEFAULT CURRENT_TIMESTAMP,
-            user TEXT DEFAULT 'default_user',       -- For future multi-user support
-            field_name TEXT NOT NULL,               -- Which field was changed
-            old_value TEXT,                         -- Previous value (as text)
-            new_value TEXT,                         -- New value (as text)
-            FOREIGN KEY(task_id) REFERENCES tasks(id) ON DELETE CASCADE
-        )
-        """)
-        
-        self.conn.commit()
+        self._transaction_depth -= 1
+        if depth == 0:
+            stats = self.query_stats
+            started = time.perf_counter_ns()
+            try:
+                # A busy COMMIT leaves the transaction open, so it can be retried
+                self._retry_busy(self.conn.execute, "COMMIT")
+                if stats is not None:
+                    stats.record_commit(time.perf_counter_ns() - started)
+            except BaseException:
+                if self.conn.in_transaction:
+                    self.conn.execute("ROLLBACK")
+                raise
+        else:
+            self.conn.execute(f"RELEASE {savepoint}")
 
     def execute(self, query, params=(), fetchone=False, fetchall=False):
         """
         Execute a SQL query with parameters.
         Returns results based on options or last inserted row id.
+        
+        Outside of a transaction() block each write is committed on its own,
+        and retried if the database was locked (see _retry_busy).
         """
+        stats = self.query_stats
+        started = time.perf_counter_ns()
+        in_transaction = self.in_transaction
         cursor = self.conn.cursor()
-        cursor.execute(query, params)
+        if in_transaction:
+            cursor.execute(query, params)
+        else:
+            self._retry_busy(cursor.execute, query, params)
         
         # Return data if requested
         if fetchone:
-            return cursor.fetchone()
+            result = cursor.fetchone()
+            rows = int(result is not None)
         elif fetchall:
-            return cursor.fetchall()
+            result = cursor.fetchall()
+            rows = len(result)
+        else:
+            # For insert operations return the new id
+            result = cursor.lastrowid
+            rows = max(cursor.rowcount, 0)
+            if stats is not None and rows and not in_transaction:
+                stats.record_autocommit()
+        
+        if stats is not None:
+            stats.record(query, time.perf_counter_ns() - started, rows,
+                         lambda: self._explain_quietly(query, params))
+        return result
+
+    def iterate(self, query, params=(), chunk_size=1000):
+        """
+        Stream the rows of a query without loading them all into memory.
+        
+        Args:
+            query: SELECT statement
+            params: Query parameters
+            chunk_size: Rows fetched from SQLite per round-trip
+            
+        Yields:
+            sqlite3.Row: One row at a time
+        """
+        stats = self.query_stats
+        started = time.perf_counter_ns()
+        cursor = self.conn.cursor()
+        cursor.execute(query, params)
+        
+        # Only time spent in SQLite counts, not the caller's work between chunks
+        elapsed = time.perf_counter_ns() - started
+        count = 0
+        try:
+            while True:
+                started = time.perf_counter_ns()
+                rows = cursor.fetchmany(chunk_size)
+                elapsed += time.perf_counter_ns() - started
+                if not rows:
+                    break
+                count += len(rows)
+                yield from rows
+        finally:
+            cursor.close()
+            if stats is not None:
+                stats.record(query, elapsed, count)
+
+    def executemany(self, query, seq_of_params):
+        """
+        Execute the same statement for every parameter tuple in one transaction.
+        
+        Args:
+            query: SQL statement with placeholders
+            seq_of_params: Iterable of parameter tuples
             
-        # For insert operations, commit and return the new id
-        self.conn.commit()
-        return cursor.lastrowid
+        Returns:
+            int: Number of rows affected
+        """
+        with self.transaction():
+            stats = self.query_stats
+            started = time.perf_counter_ns()
+            cursor = self.conn.cursor()
+            cursor.executemany(query, seq_of_params)
+            if stats is not None:
+                stats.record(query, time.perf_counter_ns() - started, max(cursor.rowcount, 0))
+            return cursor.rowcount
+    
+    def _retry_busy(self, operation, *args):
+        """
+        Run operation(*args), retrying with exponential backoff while the
+        database is locked by another connection.
+        
+        SQLite's busy timeout already waits for most locks; this covers the
+        cases where it gives up: the timeout ran out under heavy write load,
+        or SQLite returned SQLITE_BUSY at once to avoid a deadlock. Only
+        call it for statements that are safe to repeat, i.e. ones that
+        failed without changing anything (BEGIN, COMMIT, or an autocommit
+        statement, which SQLite rolls back as a whole).
+        
+        Raises:
+            sqlite3.OperationalError: If the database is still locked after
+                                      busy_retries retries
+        """
+        delay = BUSY_BACKOFF
+        for attempt in range(self.busy_retries + 1):
+            try:
+                return operation(*args)
+            except sqlite3.OperationalError as e:
+                if not is_busy_error(e):
+                    raise
+                if attempt == self.busy_retries:
+                    self._count(busy=1, failures=1)
+                    raise
+                self._count(busy=1, retries=1)
+            time.sleep(delay * random.uniform(0.5, 1.5))
+            delay = min(delay * 2, BUSY_BACKOFF_MAX)
+
+    def _count(self, **increments):
+        """Add to the lock contention counters"""
+        with self._contention_lock:
+            for name, value in increments.items():
+                self._contention[name] += value
+
+    def contention_stats(self):
+        """
+        Get the lock contention counters of this Database instance.
+        
+        Returns:
+            dict: busy (statements that found the database locked), retries,
+                  failures (gave up after busy_retries), waits (transactions
+                  that waited for the write lock) and wait_ns (time spent
+                  waiting in total)
+        """
+        with self._contention_lock:
+            return dict(self._contention)
+
+    def enable_instrumentation(self, slow_query_ms=None):
+        """
+        Start recording statement timings (keeps what was already recorded).
+        
+        Args:
+            slow_query_ms: New slow-query threshold, or None to keep it
+        """
+        if self.query_stats is None:
+            self.query_stats = QueryStats(SLOW_QUERY_MS if slow_query_ms is None else slow_query_ms)
+        elif slow_query_ms is not None:
+            self.query_stats.slow_query_ms = slow_query_ms
+
+    def disable_instrumentation(self):
+        """Stop recording statement timings and drop the statistics"""
+        self.query_stats = None
+
+    def _explain_quietly(self, query, params):
+        """Query plan for the slow-query log, or None for statements without one"""
+        try:
+            return self.explain(query, params) or None
+        except sqlite3.Error:
+            return None
+
+    def stats(self):
+        """
+        Get a snapshot of what this Database has been doing.
+        
+        Only in-memory counters are read, so this is cheap enough to call
+        from the GUI thread.
+        
+        Returns:
+            dict: instrumented, path, profile, connections and contention
+                  (see contention_stats); when instrumented, also the
+                  statement statistics of QueryStats.snapshot (queries,
+                  commits, autocommits, slow_queries, ...)
+        """
+        with self._connections_lock:
+            connections = len(self._connections)
+        snapshot = {
+            "instrumented": self.query_stats is not None,
+            "path": self.db_path,
+            "profile": dict(self.profile),
+            "connections": connections,
+            "contention": self.contention_stats(),
+        }
+        stats = self.query_stats
+        if stats is not None:
+            snapshot.update(stats.snapshot())
+        return snapshot
+
+    def add_change_listener(self, callback):
+        """
+        Register a callback for data changes reported through notify_change.
+        
+        Args:
+            callback: Called as callback(table, row_id)
+        """
+        self._change_listeners.append(callback)
+
+    def notify_change(self, table, row_id=None):
+        """
+        Tell listeners (caches, open reports) that rows of a table changed.
+        
+        Args:
+            table: Name of the changed table
+            row_id: ID of the changed row, or None for "any row"
+        """
+        for callback in self._change_listeners:
+            callback(table, row_id)
     
     def get_current_datetime(self):
         """
@@ -114,7 +477,33 @@ class Database:
         """
         return datetime.datetime.now()
         
+    def close_thread_connection(self):
+        """Close the calling thread's connection (for worker threads that are done)"""
+        if self._shared_state is not None:
+            return
+        state = getattr(self._local, "state", None)
+        if state is not None and state.conn is not None:
+            with self._connections_lock:
+                self._connections.remove(state.conn)
+            state.conn.close()
+            state.conn = None
+        
     def close(self):
-        """Close the database connection properly"""
-        if self.conn:
-            self.conn.close()
+        """Close the database connections of every thread properly"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        if self._shared_state is not None:
+            self._shared_state.conn = None
+        self._local = threading.local()
+
+
+class _ConnectionState:
+    """A connection and its transaction() nesting depth"""
+    
+    __slots__ = ("conn", "depth")
+    
+    def __init__(self):
+        self.conn = None
+        self.depth = 0
@@ -0,0 +1,87 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class DbExecutor:
+    """
+    Runs database work off the GUI thread.
+    
+    Writes go to a single writer thread, so they keep their submission
+    order and never contend with each other for the write lock. Reads go
+    to a small pool of reader threads. Database hands every thread its own
+    connection, so with WAL readers don't block the writer and vice versa.
+    
+    Both submit methods return concurrent.futures.Future objects; the GUI
+    polls them with after() instead of blocking on result().
+    """
+    
+    def __init__(self, db, readers=2):
+        """
+        Args:
+            db: Database instance shared by the controllers
+            readers: Number of reader threads
+        """
+        self.db = db
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        
+        # An in-memory database has a single connection: keep all work on one thread
+        if db.db_path == ":memory:":
+            self._readers = self._writer
+        else:
+            self._readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="db-reader")
+    
+    def submit_write(self, fn, *args, **kwargs):
+        """
+        Queue a call that modifies the database.
+        
+        Returns:
+            Future: Resolves to fn's return value
+        """
+        return self._writer.submit(fn, *args, **kwargs)
+    
+    def submit_steps(self, step):
+        """
+        Run a long maintenance job as a series of short writes.
+        
+        step() is called on the writer thread until it returns False. Each
+        call is queued again only after the previous one finished, so
+        writes submitted in the meantime run in between instead of waiting
+        for the whole job. After shutdown() no further steps are queued.
+        
+        Returns:
+            Future: Resolves to the number of steps run
+        """
+        done = Future()
+        steps = [0]
+        
+        def run_next(previous=None):
+            if previous is not None:
+                if previous.exception() is not None:
+                    done.set_exception(previous.exception())
+                    return
+                steps[0] += 1
+                if not previous.result():
+                    done.set_result(steps[0])
+                    return
+            try:
+                self._writer.submit(step).add_done_callback(run_next)
+            except RuntimeError:
+                # Shut down: leave the rest of the job for the next run
+                done.set_result(steps[0])
+        
+        run_next()
+        return done
+    
+    def submit_read(self, fn, *args, **kwargs):
+        """
+        Queue a read-only call.
+        
+        Returns:
+            Future: Resolves to fn's return value
+        """
+        return self._readers.submit(fn, *args, **kwargs)
+    
+    def shutdown(self, wait=True):
+        """Stop the worker threads once queued work has finished"""
+        self._writer.shutdown(wait=wait)
+        if self._readers is not self._writer:
+            self._readers.shutdown(wait=wait)
@@ -0,0 +1,209 @@
+"""
+Statement timing for Database: what ran, how often, how long it took.
+
+Database.execute (and executemany, iterate, transaction commits) report
+to a QueryStats when instrumentation is on (Database(instrument=True) or
+Database.enable_instrumentation). Statements are grouped by their
+normalized text, so the same query with different parameters or a
+different number of ids in an IN list counts as one entry.
+
+Each entry keeps a count, total/max time, rows and a latency histogram.
+Statements slower than slow_query_ms go to a bounded slow-query log
+together with their EXPLAIN QUERY PLAN (captured once per statement).
+Commit times are tracked separately: a COMMIT is where SQLite syncs the
+journal or WAL to disk, so they are the closest thing to fsync time
+SQLite exposes; with synchronous=NORMAL in WAL mode the sync happens at
+checkpoints, which show up as commit outliers.
+"""
+import re
+import threading
+import time
+from collections import deque
+
+# Upper bounds (ms) of the latency histogram buckets; one more bucket
+# counts everything slower than the last bound
+HISTOGRAM_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+# Statements slower than this (ms) are logged with their query plan
+SLOW_QUERY_MS = 50
+
+# Entries kept in the slow-query log (oldest dropped first)
+SLOW_LOG_SIZE = 100
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+def normalize_sql(query):
+    """
+    Reduce a statement to the form its statistics are grouped by.
+
+    Whitespace is collapsed, literals become "?" and lists of
+    placeholders become "(?, ...)", so batched lookups of any size share
+    one entry.
+
+    Args:
+        query: SQL text
+
+    Returns:
+        str: Normalized SQL
+    """
+    query = _WHITESPACE.sub(" ", query).strip()
+    query = _STRING.sub("?", query)
+    query = _NUMBER.sub("?", query)
+    return _PLACEHOLDER_LIST.sub("(?, ...)", query)
+
+
+def _percentile(buckets, count, fraction):
+    """Upper bound (ms) of the histogram bucket holding the given fraction"""
+    if not count:
+        return 0.0
+    target = fraction * count
+    seen = 0
+    for bound, bucket in zip(HISTOGRAM_BOUNDS_MS, buckets):
+        seen += bucket
+        if seen >= target:
+            return float(bound)
+    return float("inf")
+
+
+class _Entry:
+    """Counters of one normalized statement"""
+
+    __slots__ = ("count", "total_ns", "max_ns", "rows", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.rows = 0
+        self.buckets = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+
+    def add(self, elapsed_ns, rows):
+        self.count += 1
+        self.total_ns += elapsed_ns
+        self.max_ns = max(self.max_ns, elapsed_ns)
+        self.rows += rows
+        elapsed_ms = elapsed_ns / 1e6
+        for i, bound in enumerate(HISTOGRAM_BOUNDS_MS):
+            if elapsed_ms <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "total_ms": self.total_ns / 1e6,
+            "mean_ms": self.total_ns / 1e6 / self.count if self.count else 0.0,
+            "max_ms": self.max_ns / 1e6,
+            "p50_ms": _percentile(self.buckets, self.count, 0.5),
+            "p95_ms": _percentile(self.buckets, self.count, 0.95),
+            "rows": self.rows,
+            "histogram": list(self.buckets),
+        }
+
+
+class QueryStats:
+    """
+    Thread-safe statement statistics and slow-query log.
+
+    Args:
+        slow_query_ms: Statements at least this slow are logged
+        slow_log_size: Most slow-query log entries kept
+    """
+
+    def __init__(self, slow_query_ms=SLOW_QUERY_MS, slow_log_size=SLOW_LOG_SIZE):
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self._entries = {}              # normalized SQL -> _Entry
+        self._commits = _Entry()
+        self._autocommits = 0           # Writes committed on their own
+        self._plans = {}                # normalized SQL -> query plan (slow ones only)
+        self._slow = deque(maxlen=slow_log_size)
+        self._started = time.time()
+
+    def record(self, query, elapsed_ns, rows, explain=None):
+        """
+        Count one execution of a statement.
+
+        Args:
+            query: SQL text as executed
+            elapsed_ns: Time it took
+            rows: Rows returned (reads) or changed (writes)
+            explain: Callable returning the statement's query plan, called
+                     the first time the statement is slow
+        """
+        normalized = normalize_sql(query)
+        with self._lock:
+            entry = self._entries.get(normalized)
+            if entry is None:
+                entry = self._entries[normalized] = _Entry()
+            entry.add(elapsed_ns, rows)
+            slow = elapsed_ns >= self.slow_query_ms * 1_000_000
+            need_plan = slow and explain is not None and normalized not in self._plans
+
+        # EXPLAIN runs outside the lock: it is a query of its own
+        if not slow:
+            return
+        plan = None
+        if need_plan:
+            plan = explain()
+        with self._lock:
+            if need_plan:
+                self._plans[normalized] = plan
+            self._slow.append({
+                "sql": normalized,
+                "ms": elapsed_ns / 1e6,
+                "rows": rows,
+                "at": time.time(),
+                "thread": threading.current_thread().name,
+                "plan": self._plans.get(normalized),
+            })
+
+    def record_commit(self, elapsed_ns):
+        """Count one COMMIT of a transaction() block"""
+        with self._lock:
+            self._commits.add(elapsed_ns, 0)
+
+    def record_autocommit(self):
+        """Count one write committed outside of a transaction() block"""
+        with self._lock:
+            self._autocommits += 1
+
+    def snapshot(self):
+        """
+        Get a copy of the statistics.
+
+        Returns:
+            dict: since (epoch seconds), slow_query_ms, histogram_bounds_ms,
+                  queries (normalized SQL -> counters, slowest total first),
+                  commits (counters of transaction commits), autocommits
+                  and slow_queries (newest last)
+        """
+        with self._lock:
+            queries = {sql: entry.snapshot() for sql, entry in self._entries.items()}
+            commits = self._commits.snapshot()
+            autocommits = self._autocommits
+            slow = [dict(item) for item in self._slow]
+        return {
+            "since": self._started,
+            "slow_query_ms": self.slow_query_ms,
+            "histogram_bounds_ms": list(HISTOGRAM_BOUNDS_MS),
+            "queries": dict(sorted(queries.items(), key=lambda item: item[1]["total_ms"], reverse=True)),
+            "commits": commits,
+            "autocommits": autocommits,
+            "slow_queries": slow,
+        }
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        with self._lock:
+            self._entries.clear()
+            self._commits = _Entry()
+            self._autocommits = 0
+            self._plans.clear()
+            self._slow.clear()
+            self._started = time.time()
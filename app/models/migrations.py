@@ -0,0 +1,457 @@
+"""
+Versioned schema migrations.
+
+Each migration is applied exactly once, in order, and the schema version
+is stored in SQLite's PRAGMA user_version. Migrations are never edited
+once released: to change the schema, append a new one.
+"""
+
+
+def _create_base_tables(conn):
+    """Version 1: the original tables (tolerates databases created before versioning)"""
+    # Tasks table with deadline support
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS tasks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        description TEXT,
+        category TEXT,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        deadline DATETIME,                      -- Deadline date/time
+        completed BOOLEAN DEFAULT 0,
+        priority BOOLEAN DEFAULT 0,
+        total_time INTEGER DEFAULT 0            -- Tracked time in seconds
+    )
+    """)
+    
+    # Unversioned databases from before the priority flag lack the column
+    columns = [col[1] for col in conn.execute("PRAGMA table_info(tasks)")]
+    if 'priority' not in columns:
+        conn.execute("ALTER TABLE tasks ADD COLUMN priority BOOLEAN DEFAULT 0")
+    
+    # Time entries for session tracking
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS time_entries (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_id INTEGER NOT NULL,
+        start_time DATETIME NOT NULL,           -- Session start timestamp
+        end_time DATETIME,                      -- Session end timestamp
+        duration INTEGER,                       -- Session duration in seconds
+        FOREIGN KEY(task_id) REFERENCES tasks(id) ON DELETE CASCADE
+    )
+    """)
+    
+    # Notes table
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS notes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_id INTEGER NOT NULL,
+        content TEXT NOT NULL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY(task_id) REFERENCES tasks(id) ON DELETE CASCADE
+    )
+    """)
+    
+    # Task history for tracking changes
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS task_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_id INTEGER NOT NULL,
+        change_date DATETIME DEFAULT CURRENT_TIMESTAMP,
+        user TEXT DEFAULT 'default_user',       -- For future multi-user support
+        field_name TEXT NOT NULL,               -- Which field was changed
+        old_value TEXT,                         -- Previous value (as text)
+        new_value TEXT,                         -- New value (as text)
+        FOREIGN KEY(task_id) REFERENCES tasks(id) ON DELETE CASCADE
+    )
+    """)
+
+
+def _create_indexes(conn):
+    """
+    Version 2: secondary indexes.
+    
+    The tasks indexes mirror the sort modes in task_controller.SORT_ORDERS,
+    with and without the "completed" filter used by the WIP/Completed views;
+    the task_id indexes keep ON DELETE CASCADE from scanning the child tables.
+    """
+    indexes = {
+        "idx_tasks_name": "tasks(name)",
+        "idx_tasks_deadline": "tasks(deadline IS NULL, deadline, name)",
+        "idx_tasks_priority": "tasks(priority DESC, name)",
+        "idx_tasks_category": "tasks(category, name)",
+        "idx_tasks_completed_name": "tasks(completed, name)",
+        "idx_tasks_completed_deadline": "tasks(completed, deadline IS NULL, deadline, name)",
+        "idx_tasks_completed_priority": "tasks(completed, priority DESC, name)",
+        "idx_tasks_completed_category": "tasks(completed, category, name)",
+        "idx_time_entries_task": "time_entries(task_id)",
+        "idx_notes_task": "notes(task_id, created_at)",
+        "idx_task_history_task": "task_history(task_id, change_date)",
+    }
+    for name, definition in indexes.items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+
+
+def _create_daily_rollups(conn):
+    """
+    Version 3: per-day time rollups.
+    
+    One row per (task, day) holding the tracked seconds, maintained by
+    TimerController.stop; sessions count towards the day they started.
+    Existing time entries are folded in once here.
+    """
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS daily_rollups (
+        task_id INTEGER NOT NULL,
+        day DATE NOT NULL,                      -- Day the sessions started
+        category TEXT,                          -- Task category when tracked
+        seconds INTEGER NOT NULL DEFAULT 0,     -- Tracked time that day
+        entries INTEGER NOT NULL DEFAULT 0,     -- Number of sessions that day
+        PRIMARY KEY (task_id, day),
+        FOREIGN KEY(task_id) REFERENCES tasks(id) ON DELETE CASCADE
+    ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_daily_rollups_day ON daily_rollups(day, task_id, category, seconds)")
+    
+    conn.execute("""
+    INSERT INTO daily_rollups (task_id, day, category, seconds, entries)
+    SELECT te.task_id, date(te.start_time), t.category, SUM(te.duration), COUNT(*)
+    FROM time_entries te JOIN tasks t ON t.id = te.task_id
+    WHERE te.duration IS NOT NULL
+    GROUP BY te.task_id, date(te.start_time)
+    """)
+
+
+def _add_timer_heartbeat(conn):
+    """
+    Version 4: timer checkpoints.
+    
+    Running sessions periodically store their elapsed time in duration and
+    the checkpoint time in heartbeat, so a crash loses at most one interval.
+    The partial index finds sessions left open by a crash without a scan.
+    """
+    conn.execute("ALTER TABLE time_entries ADD COLUMN heartbeat DATETIME")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_time_entries_open ON time_entries(id) WHERE end_time IS NULL")
+
+
+def _add_time_segments(conn):
+    """
+    Version 5: monotonic timing.
+    
+    Durations are measured with a monotonic clock and stored as integer
+    nanoseconds. Every stretch of running time within a session is its own
+    time_segments row; the pauses are the gaps between them. Existing
+    entries get duration_ns from their whole seconds and one segment each.
+    """
+    conn.execute("ALTER TABLE time_entries ADD COLUMN duration_ns INTEGER")
+    conn.execute("UPDATE time_entries SET duration_ns = duration * 1000000000 WHERE duration IS NOT NULL")
+    
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS time_segments (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        entry_id INTEGER NOT NULL,
+        started_at DATETIME NOT NULL,           -- Wall-clock start, for display
+        ended_at DATETIME,                      -- NULL while the segment runs
+        duration_ns INTEGER NOT NULL DEFAULT 0, -- Monotonic running time
+        FOREIGN KEY(entry_id) REFERENCES time_entries(id) ON DELETE CASCADE
+    )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_time_segments_entry ON time_segments(entry_id, started_at)")
+    
+    conn.execute("""
+    INSERT INTO time_segments (entry_id, started_at, ended_at, duration_ns)
+    SELECT id, start_time, end_time, duration_ns
+    FROM time_entries
+    WHERE end_time IS NOT NULL
+    """)
+
+
+def _index_entry_start(conn):
+    """
+    Version 6: look up a task's time entries by start time.
+    
+    Importing history checks (task_id, start_time) for duplicates; the
+    wider index also serves every lookup the task_id index did.
+    """
+    conn.execute("DROP INDEX IF EXISTS idx_time_entries_task")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_time_entries_task_start ON time_entries(task_id, start_time)")
+
+
+def _create_search_index(conn):
+    """
+    Version 7: full-text search.
+    
+    External-content FTS5 tables index task names/descriptions and note
+    contents without storing a second copy of the text; triggers keep
+    them in step with the base tables. Prefix indexes make incremental
+    (search-as-you-type) queries cheap.
+    """
+    conn.execute("""
+    CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+        name, description,
+        content='tasks', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """)
+    conn.execute("""
+    CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+        content,
+        content='notes', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """)
+    
+    # One statement per execute(): executescript() would commit the migration
+    triggers = [
+        """
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts (rowid, name, description) VALUES (new.id, new.name, new.description);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF name, description ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+            INSERT INTO tasks_fts (rowid, name, description) VALUES (new.id, new.name, new.description);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS notes_fts_insert AFTER INSERT ON notes BEGIN
+            INSERT INTO notes_fts (rowid, content) VALUES (new.id, new.content);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS notes_fts_delete AFTER DELETE ON notes BEGIN
+            INSERT INTO notes_fts (notes_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS notes_fts_update AFTER UPDATE OF content ON notes BEGIN
+            INSERT INTO notes_fts (notes_fts, rowid, content) VALUES ('delete', old.id, old.content);
+            INSERT INTO notes_fts (rowid, content) VALUES (new.id, new.content);
+        END
+        """,
+    ]
+    for trigger in triggers:
+        conn.execute(trigger)
+    
+    conn.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+    conn.execute("INSERT INTO notes_fts (notes_fts) VALUES ('rebuild')")
+
+
+def _compact_task_history(conn):
+    """
+    Version 8: typed, compactable task history.
+    
+    Time added by a session is stored as an integer in delta instead of a
+    "+N seconds" string, and flags as "0"/"1" instead of "False"/"True".
+    merged counts the original rows a compacted row stands for (see
+    HistoryController); rows past the retention horizon can be moved to
+    task_history_archive.
+    """
+    conn.execute("ALTER TABLE task_history ADD COLUMN delta INTEGER")
+    conn.execute("ALTER TABLE task_history ADD COLUMN merged INTEGER NOT NULL DEFAULT 1")
+    
+    conn.execute("""
+    UPDATE task_history
+    SET delta = CAST(substr(new_value, 2) AS INTEGER), old_value = NULL, new_value = NULL
+    WHERE field_name = 'total_time' AND new_value LIKE '+% seconds'
+    """)
+    for column in ("old_value", "new_value"):
+        conn.execute(f"""
+        UPDATE task_history
+        SET {column} = CASE {column} WHEN 'True' THEN '1' WHEN 'False' THEN '0' END
+        WHERE field_name IN ('completed', 'priority') AND {column} IN ('True', 'False')
+        """)
+    
+    # No foreign key: archived history outlives the task it belonged to
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS task_history_archive (
+        id INTEGER PRIMARY KEY,                 -- Same id as in task_history
+        task_id INTEGER NOT NULL,
+        change_date DATETIME,
+        user TEXT,
+        field_name TEXT NOT NULL,
+        old_value TEXT,
+        new_value TEXT,
+        delta INTEGER,
+        merged INTEGER NOT NULL DEFAULT 1
+    )
+    """)
+
+
+def _add_completed_at(conn):
+    """
+    Version 9: completion time of tasks, for velocity and deadline reports.
+    
+    Triggers keep the column current for every writer (single and batch
+    updates, imports) unless the statement sets completed_at itself.
+    Existing tasks take the time of their last completion in the history;
+    those completed before the history was kept stay NULL.
+    """
+    conn.execute("ALTER TABLE tasks ADD COLUMN completed_at DATETIME")
+    conn.execute("""
+    UPDATE tasks SET completed_at = (
+        SELECT MAX(h.change_date) FROM task_history h
+        WHERE h.task_id = tasks.id AND h.field_name = 'completed' AND h.new_value = '1'
+    )
+    WHERE completed = 1
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_completed_at ON tasks(completed_at)")
+    
+    conn.execute("""
+    CREATE TRIGGER IF NOT EXISTS tasks_completed_at AFTER UPDATE OF completed ON tasks
+    WHEN NEW.completed IS NOT OLD.completed AND NEW.completed_at IS OLD.completed_at BEGIN
+        UPDATE tasks SET completed_at = CASE WHEN NEW.completed THEN CURRENT_TIMESTAMP END
+        WHERE id = NEW.id;
+    END
+    """)
+    # Tasks imported as completed count as completed when they were created
+    conn.execute("""
+    CREATE TRIGGER IF NOT EXISTS tasks_completed_at_insert AFTER INSERT ON tasks
+    WHEN NEW.completed AND NEW.completed_at IS NULL BEGIN
+        UPDATE tasks SET completed_at = COALESCE(NEW.created_at, CURRENT_TIMESTAMP)
+        WHERE id = NEW.id;
+    END
+    """)
+
+
+def _add_detached_sessions(conn):
+    """
+    Version 10: sessions handed over between processes.
+    
+    A process that exits on purpose while a timer runs (the command line
+    interface) sets detached_at instead of leaving a crashed session
+    behind; the session keeps counting wall-clock time from there until
+    another process recovers or stops it.
+    """
+    conn.execute("ALTER TABLE time_entries ADD COLUMN detached_at DATETIME")
+
+
+def _add_owners(conn):
+    """
+    Version 11: tasks, time entries and rollups belong to a user.
+    
+    Existing rows go to 'default_user', the name task_history.user has
+    always defaulted to. Every task list query filters by owner, so the
+    sort indexes of version 2 get the owner as their leading column, and
+    so do the indexes the reports read (deadlines, completion times and
+    rollups by day). daily_rollups carries the owner of its task, so a
+    user's time reports never join tasks. Open sessions are looked up per
+    owner, so that recovering one user's timers never touches another
+    user's running sessions.
+    """
+    conn.execute("ALTER TABLE tasks ADD COLUMN owner TEXT NOT NULL DEFAULT 'default_user'")
+    conn.execute("ALTER TABLE time_entries ADD COLUMN owner TEXT NOT NULL DEFAULT 'default_user'")
+    
+    conn.execute("ALTER TABLE daily_rollups ADD COLUMN owner TEXT NOT NULL DEFAULT 'default_user'")
+    conn.execute("UPDATE daily_rollups SET owner = (SELECT owner FROM tasks WHERE id = daily_rollups.task_id)")
+    
+    for name in ("name", "deadline", "priority", "category", "completed_name", "completed_deadline",
+                 "completed_priority", "completed_category", "completed_at"):
+        conn.execute(f"DROP INDEX IF EXISTS idx_tasks_{name}")
+    indexes = {
+        "idx_tasks_owner_name": "tasks(owner, name)",
+        "idx_tasks_owner_deadline": "tasks(owner, deadline IS NULL, deadline, name)",
+        "idx_tasks_owner_priority": "tasks(owner, priority DESC, name)",
+        "idx_tasks_owner_category": "tasks(owner, category, name)",
+        "idx_tasks_owner_completed_name": "tasks(owner, completed, name)",
+        "idx_tasks_owner_completed_deadline": "tasks(owner, completed, deadline IS NULL, deadline, name)",
+        "idx_tasks_owner_completed_priority": "tasks(owner, completed, priority DESC, name)",
+        "idx_tasks_owner_completed_category": "tasks(owner, completed, category, name)",
+        "idx_tasks_owner_completed_at": "tasks(owner, completed_at)",
+        "idx_daily_rollups_owner_day": "daily_rollups(owner, day, task_id, category, seconds)",
+    }
+    for name, definition in indexes.items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+    
+    conn.execute("DROP INDEX IF EXISTS idx_daily_rollups_day")
+    conn.execute("DROP INDEX IF EXISTS idx_time_entries_open")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_time_entries_owner_open ON time_entries(owner, id) WHERE end_time IS NULL"
+    )
+
+
+def _sync_rollup_categories(conn):
+    """
+    Version 12: rollups follow their task's category.
+    
+    daily_rollups kept the category a task had when its first session of
+    the day was rolled up, so recategorising a task left its tracked time
+    under the old category. A trigger now carries a category change to
+    every rollup of the task (as rebuild_rollups would), and rows already
+    out of step are corrected here.
+    """
+    conn.execute("""
+    CREATE TRIGGER IF NOT EXISTS tasks_rollup_category AFTER UPDATE OF category ON tasks
+    WHEN NEW.category IS NOT OLD.category BEGIN
+        UPDATE daily_rollups SET category = NEW.category WHERE task_id = NEW.id;
+    END
+    """)
+    conn.execute("""
+    UPDATE daily_rollups SET category = (SELECT category FROM tasks WHERE id = daily_rollups.task_id)
+    WHERE category IS NOT (SELECT category FROM tasks WHERE id = daily_rollups.task_id)
+    """)
+
+
+# Ordered list of migrations; the position + 1 is the schema version
+MIGRATIONS = [
+    _create_base_tables,
+    _create_indexes,
+    _create_daily_rollups,
+    _add_timer_heartbeat,
+    _add_time_segments,
+    _index_entry_start,
+    _create_search_index,
+    _compact_task_history,
+    _add_completed_at,
+    _add_detached_sessions,
+    _add_owners,
+    _sync_rollup_categories,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version(conn):
+    """Return the schema version stored in the database file"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def run_migrations(db):
+    """
+    Apply all pending migrations in a single transaction.
+    
+    When the database is already current this costs one PRAGMA read.
+    
+    Args:
+        db: Database instance
+        
+    Returns:
+        int: Number of migrations applied
+        
+    Raises:
+        RuntimeError: If the database was created by a newer version of the app
+    """
+    current = get_schema_version(db.conn)
+    if current == SCHEMA_VERSION:
+        return 0
+    if current > SCHEMA_VERSION:
+        raise RuntimeError(
+            f"Database schema version {current} is newer than supported version {SCHEMA_VERSION}"
+        )
+    
+    with db.transaction():
+        # Another process may have migrated while we waited for the write lock
+        current = get_schema_version(db.conn)
+        for migration in MIGRATIONS[current:]:
+            migration(db.conn)
+        db.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    
+    return SCHEMA_VERSION - current
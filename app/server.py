@@ -0,0 +1,461 @@
+"""
+Local HTTP/JSON API over the controllers, for editors and status bars.
+
+Usage:
+    python -m app.server [--db PATH] [--host 127.0.0.1] [--port 8765] [--readers 4] [--user NAME]
+    (or: python main.py serve ...)
+
+Endpoints (JSON in and out):
+    GET    /tasks?completed=0|1&sort=name&after=CURSOR&limit=N&q=TEXT
+    POST   /tasks                      {"name": ..., "category": ..., ...}
+    GET    /tasks/ID
+    PATCH  /tasks/ID                   {"completed": true, ...}
+    DELETE /tasks/ID
+    GET    /tasks/ID/notes?after=CURSOR&limit=N
+    POST   /tasks/ID/notes             {"content": ...}
+    GET    /timers
+    POST   /timers/ID/start|pause|resume|stop
+    GET    /reports/KIND?start=&end=&period=   (KIND as in app.cli.REPORTS)
+
+Controller calls never run on the event loop: they go through a
+DbExecutor, whose single writer thread also owns the timers and whose
+reader pool is bounded by --readers. The loop itself only reads PRAGMA
+data_version, which costs no disk access. Identical reads in flight at the
+same time share one database call, and GET responses carry an ETag
+derived from the database's change version, so a client polling with
+If-None-Match gets 304 without any query while nothing changed.
+"""
+import argparse
+import asyncio
+import json
+import re
+import sys
+from urllib.parse import parse_qs, urlsplit
+
+from app.cli import REPORTS
+from app.controllers.note_controller import NoteController
+from app.controllers.report_controller import ReportController
+from app.controllers.task_controller import SORT_KEYS, UPDATABLE_FIELDS, TaskController
+from app.controllers.timer_controller import TimerRegistry
+from app.models.database import DEFAULT_OWNER, Database
+from app.models.executor import DbExecutor
+
+# Largest request body accepted (bytes)
+MAX_BODY = 1024 * 1024
+
+# Most tasks or notes returned by one list request
+MAX_PAGE = 500
+
+REASONS = {200: "OK", 201: "Created", 204: "No Content", 304: "Not Modified", 400: "Bad Request",
+           404: "Not Found", 405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+           500: "Internal Server Error"}
+
+
+class HttpError(Exception):
+    """Ends a request with an error status and message"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _rows(rows):
+    """sqlite3.Row objects -> plain dicts for json"""
+    return [dict(row) for row in rows]
+
+
+def _flag(query, name):
+    """Parse an optional 0/1/true/false query parameter"""
+    value = query.get(name)
+    if value is None:
+        return None
+    if value.lower() in ("1", "true"):
+        return True
+    if value.lower() in ("0", "false"):
+        return False
+    raise HttpError(400, f"Invalid {name}: {value!r}")
+
+
+def _int(value, name, default=None, minimum=None, maximum=None):
+    if value is None:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise HttpError(400, f"Invalid {name}: {value!r}")
+    if minimum is not None and number < minimum:
+        raise HttpError(400, f"Invalid {name}: {number} is less than {minimum}")
+    return min(number, maximum) if maximum is not None else number
+
+
+def _cursor(value, length):
+    """Decode a pagination cursor passed as a JSON array of `length` scalars"""
+    if value is None:
+        return None
+    try:
+        cursor = json.loads(value)
+    except ValueError:
+        cursor = None
+    if not isinstance(cursor, list) or len(cursor) != length or not all(
+            item is None or isinstance(item, (str, int, float)) for item in cursor):
+        raise HttpError(400, "Invalid cursor")
+    return tuple(cursor)
+
+
+def _task_fields(body, keys):
+    """Pick task fields out of a request body, checking their JSON types"""
+    fields = {}
+    for key in keys:
+        if key not in body:
+            continue
+        value = body[key]
+        if key in ("completed", "priority"):
+            valid = isinstance(value, bool)
+        elif key == "name":
+            valid = isinstance(value, str)
+        else:
+            valid = value is None or isinstance(value, str)
+        if not valid:
+            raise HttpError(400, f"Invalid {key}: {value!r}")
+        fields[key] = value
+    return fields
+
+
+class ApiServer:
+    """
+    The HTTP server and its routes.
+
+    Args:
+        db: Database instance
+        executor: DbExecutor running the controller calls
+        checkpoint_interval: Seconds between checkpoints of running timers
+        owner: User whose tasks and timers the API serves
+    """
+
+    def __init__(self, db, executor, checkpoint_interval=30, owner=DEFAULT_OWNER):
+        self.db = db
+        self.executor = executor
+        self.tasks = TaskController(db, owner=owner)
+        self.notes = NoteController(db, owner=owner)
+        self.reports = ReportController(db, owner=owner)
+        self.timers = TimerRegistry(db, checkpoint_interval, owner)
+        self.coalesced = 0              # Reads answered by a call already in flight
+        self.not_modified = 0           # Requests answered with 304
+        self._inflight = {}             # (name, args, version) -> asyncio.Future
+        self._changes = 0               # In-process change counter (see _version)
+        self._data_version = None
+        self._server = None
+        self._checkpointer = None
+        db.add_change_listener(self._on_data_change)
+
+        self.routes = [
+            ("GET", re.compile(r"/tasks"), self.list_tasks),
+            ("POST", re.compile(r"/tasks"), self.create_task),
+            ("GET", re.compile(r"/tasks/(\d+)"), self.get_task),
+            ("PATCH", re.compile(r"/tasks/(\d+)"), self.update_task),
+            ("DELETE", re.compile(r"/tasks/(\d+)"), self.delete_task),
+            ("GET", re.compile(r"/tasks/(\d+)/notes"), self.list_notes),
+            ("POST", re.compile(r"/tasks/(\d+)/notes"), self.add_note),
+            ("GET", re.compile(r"/timers"), self.list_timers),
+            ("POST", re.compile(r"/timers/(\d+)/(start|pause|resume|stop)"), self.timer_action),
+            ("GET", re.compile(r"/reports/(\w+)"), self.report),
+        ]
+
+    # Lifecycle
+
+    async def start(self, host="127.0.0.1", port=8765):
+        """
+        Recover timers, start listening and checkpointing; returns the bound port.
+
+        Only sessions no other process is timing are recovered (see
+        TimerRegistry.recover), so a GUI running alongside keeps its own.
+        """
+        await self._write(self.timers.recover, resume=True)
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        self._checkpointer = asyncio.create_task(self._checkpoint_loop())
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        """Stop listening; running timers stay running (detached) for the next process"""
+        if self._checkpointer is not None:
+            self._checkpointer.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self._write(self.timers.detach_all)
+
+    async def _checkpoint_loop(self):
+        # Every timer, paused ones included, so their heartbeats stay fresh
+        while True:
+            await asyncio.sleep(self.timers.checkpoint_interval)
+            await self._write(self.timers.checkpoint, True)
+
+    # Database access
+
+    def _on_data_change(self, table, row_id):
+        self._changes += 1
+
+    def _version(self):
+        """
+        Change version of the database as seen by this process.
+
+        Writes made here bump the listener counter; PRAGMA data_version on
+        this thread's connection moves with every commit made through any
+        other connection, including the executor's threads and other
+        processes (an in-memory database has no other connections).
+        Commits from other processes don't reach the change listeners, so
+        the controller caches are dropped whenever data_version moves.
+        """
+        if self.db.db_path == ":memory:":
+            return f"{self._changes}"
+        data_version = self.db.get_pragma("data_version")
+        if data_version != self._data_version:
+            self._data_version = data_version
+            self.tasks.invalidate()
+            self.reports.invalidate()
+        return f"{self._changes}.{data_version}"
+
+    async def _read(self, fn, *args, **kwargs):
+        """
+        Run a read on the reader pool; identical concurrent reads share one call.
+
+        The version is part of the key, so a read never joins a call that
+        started before the latest write.
+        """
+        key = (fn.__qualname__, args, tuple(sorted(kwargs.items())), self._version())
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.wrap_future(self.executor.submit_read(fn, *args, **kwargs))
+        self._inflight[key] = future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def _write(self, fn, *args, **kwargs):
+        """Run a write (or timer operation) on the writer thread"""
+        return await asyncio.wrap_future(self.executor.submit_write(fn, *args, **kwargs))
+
+    # Routes; each returns (status, payload)
+
+    async def list_tasks(self, query, body):
+        limit = _int(query.get("limit"), "limit", default=100, minimum=1, maximum=MAX_PAGE)
+        completed = _flag(query, "completed")
+        if query.get("q"):
+            rows = await self._read(self.tasks.search, query["q"], completed=completed, limit=limit)
+            return 200, {"tasks": _rows(rows), "next": None}
+
+        sort_by = query.get("sort", "name")
+        if sort_by not in SORT_KEYS:
+            raise HttpError(400, f"Unknown sort criterion: {sort_by}")
+        rows = await self._read(self.tasks.get_tasks_page, completed=completed, sort_by=sort_by,
+                                after=_cursor(query.get("after"), len(SORT_KEYS[sort_by]) + 1), limit=limit)
+        next_cursor = list(self.tasks.sort_cursor(rows[-1], sort_by)) if len(rows) == limit else None
+        return 200, {"tasks": _rows(rows), "next": next_cursor}
+
+    async def create_task(self, query, body):
+        fields = _task_fields(body, ("name", "description", "category", "deadline", "priority"))
+        task_id = await self._write(self.tasks.create_task, fields.pop("name", None), **fields)
+        return 201, {"id": task_id}
+
+    async def get_task(self, query, body, task_id):
+        task = await self._read(self.tasks.get_task, int(task_id))
+        if task is None:
+            raise HttpError(404, f"Task with ID {task_id} does not exist")
+        return 200, dict(task)
+
+    async def update_task(self, query, body, task_id):
+        fields = _task_fields(body, UPDATABLE_FIELDS)
+        changed = await self._write(self.tasks.update_task, int(task_id), **fields)
+        return 200, {"changed": changed}
+
+    async def delete_task(self, query, body, task_id):
+        await self._write(self.tasks.delete_task, int(task_id))
+        return 204, None
+
+    async def list_notes(self, query, body, task_id):
+        limit = _int(query.get("limit"), "limit", default=50, minimum=1, maximum=MAX_PAGE)
+        rows = await self._read(self.notes.get_notes_page, int(task_id),
+                                after=_cursor(query.get("after"), 2), limit=limit)
+        next_cursor = list(self.notes.note_cursor(rows[-1])) if len(rows) == limit else None
+        return 200, {"notes": _rows(rows), "next": next_cursor}
+
+    async def add_note(self, query, body, task_id):
+        note_id = await self._write(self.notes.add_note, int(task_id), body.get("content"))
+        return 201, {"id": note_id}
+
+    async def list_timers(self, query, body):
+        # Timer state lives in memory on the writer thread; no query is run
+        return 200, {"timers": await self._write(self._timer_states)}
+
+    def _timer_states(self):
+        elapsed = self.timers.elapsed_times()
+        return [{"task_id": state.task_id, "entry_id": state.entry_id, "running": state.running,
+                 "elapsed": elapsed[state.task_id]} for state in self.timers.states()]
+
+    async def timer_action(self, query, body, task_id, action):
+        result = await self._write(getattr(self.timers, action), int(task_id))
+        if action == "stop":
+            return 200, {"task_id": int(task_id), "seconds": result}
+        return 200, {"timers": await self._write(self._timer_states)}
+
+    async def report(self, query, body, kind):
+        if kind not in REPORTS:
+            raise HttpError(404, f"Unknown report: {kind}")
+        method, default_period = REPORTS[kind]
+        rows = await self._read(getattr(self.reports, method), start=query.get("start"),
+                                end=query.get("end"), period=query.get("period", default_period))
+        return 200, {"rows": _rows(rows)}
+
+    # HTTP
+
+    async def _handle_connection(self, reader, writer):
+        """Serve requests on one connection (HTTP/1.1 keep-alive)"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                keep_alive = await self._handle_request(head, reader, writer)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def _handle_request(self, head, reader, writer):
+        """Parse one request, dispatch it and write the response; returns keep-alive"""
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ")
+        except ValueError:
+            self._respond(writer, 400, {"error": "Malformed request line"}, keep_alive=False)
+            return False
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        keep_alive = (headers.get("connection", "").lower() != "close"
+                      and (version == "HTTP/1.1" or headers.get("connection", "").lower() == "keep-alive"))
+
+        length = headers.get("content-length") or "0"
+        if not (length.isascii() and length.isdigit()):
+            self._respond(writer, 400, {"error": f"Invalid Content-Length: {length!r}"}, keep_alive=False)
+            return False
+        length = int(length)
+        if length > MAX_BODY:
+            self._respond(writer, 413, {"error": "Request body too large"}, keep_alive=False)
+            return False
+        try:
+            raw_body = await reader.readexactly(length) if length else b""
+        except (asyncio.IncompleteReadError, ConnectionError):
+            return False
+
+        url = urlsplit(target)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        status, payload, etag = await self._dispatch(method, url.path.rstrip("/") or "/", query,
+                                                     raw_body, headers.get("if-none-match"))
+        self._respond(writer, status, payload, etag=etag, keep_alive=keep_alive)
+        return keep_alive
+
+    async def _dispatch(self, method, path, query, raw_body, if_none_match):
+        """Route a request; returns (status, payload, etag)"""
+        allowed = False
+        for route_method, pattern, handler in self.routes:
+            match = pattern.fullmatch(path)
+            if not match:
+                continue
+            allowed = True
+            if route_method != method:
+                continue
+
+            # Reads are tagged with the change version they were computed
+            # at; an unchanged version means an unchanged response
+            etag = None
+            if method == "GET" and handler != self.list_timers:
+                etag = f'"{self._version()}"'
+                if if_none_match == etag:
+                    self.not_modified += 1
+                    return 304, None, etag
+
+            try:
+                body = json.loads(raw_body) if raw_body else {}
+                if not isinstance(body, dict):
+                    raise HttpError(400, "Request body must be a JSON object")
+                status, payload = await handler(query, body, *match.groups())
+            except HttpError as e:
+                return e.status, {"error": str(e)}, None
+            except json.JSONDecodeError as e:
+                return 400, {"error": f"Invalid JSON: {e}"}, None
+            except RuntimeError as e:
+                return 409, {"error": str(e)}, None
+            except ValueError as e:
+                status = 404 if "does not exist" in str(e) else 400
+                return status, {"error": str(e)}, None
+            except Exception as e:
+                return 500, {"error": str(e)}, None
+            return status, payload, etag
+
+        if allowed:
+            return 405, {"error": f"{method} not allowed on {path}"}, None
+        return 404, {"error": f"No such endpoint: {path}"}, None
+
+    def _respond(self, writer, status, payload, etag=None, keep_alive=True):
+        body = b"" if payload is None else json.dumps(payload, default=str).encode("utf-8")
+        headers = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                   f"Content-Length: {len(body)}",
+                   f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if body:
+            headers.append("Content-Type: application/json")
+        if etag is not None:
+            headers.append(f"ETag: {etag}")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body)
+
+
+async def serve(db, host="127.0.0.1", port=8765, readers=4, owner=DEFAULT_OWNER):
+    """Run the API server on an open Database until cancelled (Ctrl+C)"""
+    executor = DbExecutor(db, readers=readers)
+    server = ApiServer(db, executor, owner=owner)
+    try:
+        port = await server.start(host, port)
+        print(f"Serving on http://{host}:{port}", flush=True)
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+        executor.shutdown()
+
+
+def run(db, host="127.0.0.1", port=8765, readers=4, owner=DEFAULT_OWNER):
+    """Blocking wrapper around serve(); returns once interrupted"""
+    try:
+        asyncio.run(serve(db, host, port, readers, owner))
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="My Time Tamer HTTP/JSON API")
+    parser.add_argument("--db", default="time_app.db", help="Path to the SQLite database file")
+    parser.add_argument("--db-profile", default="wal", help="SQLite connection profile (default: wal)")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: localhost only)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--readers", type=int, default=4, help="Reader threads for database queries")
+    parser.add_argument("--user", default=DEFAULT_OWNER, help=f"User to serve (default: {DEFAULT_OWNER})")
+    args = parser.parse_args(argv)
+
+    db = Database(args.db, profile=args.db_profile)
+    try:
+        run(db, args.host, args.port, args.readers, args.user)
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
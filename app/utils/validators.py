@@ -0,0 +1,212 @@
+import datetime
+
+# Longest task name accepted
+MAX_NAME_LENGTH = 200
+
+# Spellings accepted for boolean fields (compared lower-case)
+TRUE_VALUES = {"1", "true", "yes", "y", "x"}
+FALSE_VALUES = {"0", "false", "no", "n", ""}
+
+
+class ValidationError(ValueError):
+    """A field value that cannot be stored"""
+
+
+def _blank(value):
+    """True for None and empty/whitespace strings (empty CSV cells)"""
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def validate_name(name):
+    """
+    Check a task name.
+
+    Args:
+        name: Task name
+
+    Returns:
+        str: The name without surrounding whitespace
+
+    Raises:
+        ValidationError: If the name is missing or too long
+    """
+    if _blank(name):
+        raise ValidationError("Task name is required")
+    name = str(name).strip()
+    if len(name) > MAX_NAME_LENGTH:
+        raise ValidationError(f"Task name is longer than {MAX_NAME_LENGTH} characters")
+    return name
+
+
+def validate_note_content(content):
+    """
+    Check the text of a note.
+
+    Returns:
+        str: The content without trailing whitespace
+
+    Raises:
+        ValidationError: If the note is empty
+    """
+    if _blank(content):
+        raise ValidationError("Note content is required")
+    return str(content).rstrip()
+
+
+def parse_optional_text(value):
+    """Strip a text field, turning blanks into None"""
+    return None if _blank(value) else str(value).strip()
+
+
+def parse_bool(value, field="value"):
+    """
+    Parse a boolean field (true/false, yes/no, 1/0; blank is False).
+
+    Raises:
+        ValidationError: If the value isn't a recognised boolean
+    """
+    if value is None or isinstance(value, bool):
+        return bool(value)
+    if isinstance(value, int):
+        return value != 0
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValidationError(f"Invalid {field}: {value!r} is not a boolean")
+
+
+def parse_int(value, field="value", minimum=None):
+    """
+    Parse an optional integer field.
+
+    Returns:
+        int: The value, or None when blank
+
+    Raises:
+        ValidationError: If the value isn't an integer or is below minimum
+    """
+    if _blank(value):
+        return None
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ValidationError(f"Invalid {field}: {value!r} is not an integer")
+    if minimum is not None and number < minimum:
+        raise ValidationError(f"Invalid {field}: {number} is less than {minimum}")
+    return number
+
+
+def parse_datetime(value, field="value"):
+    """
+    Parse an optional timestamp ("YYYY-MM-DD HH:MM[:SS[.ffffff]]", ISO 8601 or a date).
+
+    Timestamps with a UTC offset are converted to local time, so that
+    they compare with (and are stored like) the naive ones.
+
+    Returns:
+        datetime.datetime: The timestamp (naive, local time), or None when blank
+
+    Raises:
+        ValidationError: If the value isn't a timestamp
+    """
+    if _blank(value):
+        return None
+    if isinstance(value, datetime.datetime):
+        timestamp = value
+    elif isinstance(value, datetime.date):
+        return datetime.datetime.combine(value, datetime.time())
+    else:
+        try:
+            timestamp = datetime.datetime.fromisoformat(str(value).strip())
+        except ValueError:
+            raise ValidationError(f"Invalid {field}: {value!r} is not a date/time")
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone().replace(tzinfo=None)
+    return timestamp
+
+
+def parse_date(value, field="value"):
+    """
+    Parse an optional date ("YYYY-MM-DD"; a time part is dropped).
+
+    Returns:
+        datetime.date: The date, or None when blank
+
+    Raises:
+        ValidationError: If the value isn't a date
+    """
+    timestamp = parse_datetime(value, field)
+    return timestamp.date() if timestamp is not None else None
+
+
+def validate_task(row):
+    """
+    Validate and normalise a task record.
+
+    Args:
+        row: Mapping with name and optionally description, category,
+             deadline, priority, completed, created_at
+
+    Returns:
+        dict: Cleaned values ready for the tasks table
+
+    Raises:
+        ValidationError: On the first invalid field
+    """
+    return {
+        "name": validate_name(row.get("name")),
+        "description": parse_optional_text(row.get("description")),
+        "category": parse_optional_text(row.get("category")),
+        "deadline": parse_date(row.get("deadline"), "deadline"),
+        "priority": parse_bool(row.get("priority"), "priority"),
+        "completed": parse_bool(row.get("completed"), "completed"),
+        "created_at": parse_datetime(row.get("created_at"), "created_at"),
+    }
+
+
+def validate_time_entry(row):
+    """
+    Validate and normalise a finished time entry.
+
+    The task is given either as task_id or by task name. Of start_time,
+    end_time and duration (seconds) at least start_time and one of the
+    other two are needed; the missing one is derived.
+
+    Args:
+        row: Mapping with task_id or task, start_time, end_time and/or duration
+
+    Returns:
+        dict: task_id, task (name), start_time, end_time, duration
+
+    Raises:
+        ValidationError: On the first invalid or inconsistent field
+    """
+    task_id = parse_int(row.get("task_id"), "task_id", minimum=1)
+    task_name = parse_optional_text(row.get("task"))
+    if task_id is None and task_name is None:
+        raise ValidationError("Time entry needs a task_id or task name")
+
+    start_time = parse_datetime(row.get("start_time"), "start_time")
+    if start_time is None:
+        raise ValidationError("Time entry needs a start_time")
+    end_time = parse_datetime(row.get("end_time"), "end_time")
+    duration = parse_int(row.get("duration"), "duration", minimum=0)
+
+    if end_time is None and duration is None:
+        raise ValidationError("Time entry needs an end_time or a duration")
+    if end_time is None:
+        end_time = start_time + datetime.timedelta(seconds=duration)
+    elif end_time < start_time:
+        raise ValidationError("Time entry ends before it starts")
+    elif duration is None:
+        duration = int((end_time - start_time).total_seconds())
+
+    return {
+        "task_id": task_id,
+        "task": task_name,
+        "start_time": start_time,
+        "end_time": end_time,
+        "duration": duration,
+    }
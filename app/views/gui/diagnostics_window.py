@@ -0,0 +1,202 @@
+import datetime
+import json
+import tkinter as tk
+from tkinter import ttk
+
+from app.models.instrumentation import SLOW_QUERY_MS
+
+# Most statements listed on the Queries tab (slowest total time first)
+MAX_QUERIES = 200
+
+
+def summarize(stats):
+    """
+    Turn a Database.stats() snapshot into the lines of the Summary tab.
+
+    Args:
+        stats: Result of Database.stats()
+
+    Returns:
+        list: Lines of text
+    """
+    contention = stats["contention"]
+    lines = [
+        f"Database: {stats['path']}",
+        f"Profile: {', '.join(f'{k}={v}' for k, v in stats['profile'].items()) or 'SQLite defaults'}",
+        f"Open connections: {stats['connections']}",
+        f"Lock contention: {contention['busy']} busy, {contention['retries']} retries, "
+        f"{contention['failures']} failed, {contention['waits']} waits "
+        f"({contention['wait_ns'] / 1e6:.1f} ms waiting)",
+    ]
+    if not stats["instrumented"]:
+        lines.append("Query recording is off.")
+        return lines
+
+    queries = stats["queries"].values()
+    commits = stats["commits"]
+    since = datetime.datetime.fromtimestamp(stats["since"]).strftime("%Y-%m-%d %H:%M:%S")
+    lines += [
+        f"Recording since: {since}",
+        f"Statements: {sum(q['count'] for q in queries)} executions of {len(stats['queries'])} distinct, "
+        f"{sum(q['total_ms'] for q in queries):.1f} ms in total",
+        f"Commits: {commits['count']} (mean {commits['mean_ms']:.2f} ms, p95 <= {commits['p95_ms']:g} ms, "
+        f"max {commits['max_ms']:.2f} ms); {stats['autocommits']} single-statement writes",
+        f"Slow queries (>= {stats['slow_query_ms']} ms): {len(stats['slow_queries'])} logged",
+    ]
+    return lines
+
+
+def query_rows(stats, limit=MAX_QUERIES):
+    """
+    Rows of the Queries tab: (count, total, mean, p95, max, rows, SQL).
+
+    Returns:
+        list: Tuples of display strings, slowest total time first
+    """
+    rows = []
+    for sql, q in list(stats.get("queries", {}).items())[:limit]:
+        rows.append((q["count"], f"{q['total_ms']:.1f}", f"{q['mean_ms']:.3f}", f"{q['p95_ms']:g}",
+                     f"{q['max_ms']:.2f}", q["rows"], sql))
+    return rows
+
+
+class DiagnosticsWindow(tk.Toplevel):
+    """
+    What the database has been doing: statement timings, commits, lock
+    contention and the slow-query log with query plans.
+
+    Everything shown comes from Database.stats(), which only reads
+    in-memory counters, so the window refreshes on the GUI thread without
+    going through the executor. "Copy report" puts the whole snapshot on
+    the clipboard as JSON, for attaching to a bug report.
+    """
+
+    # How often (ms) the open window refreshes
+    REFRESH_INTERVAL = 2000
+
+    def __init__(self, master, db):
+        super().__init__(master)
+        self.db = db
+        self._slow = []
+
+        self.title("Diagnostics")
+        self.geometry("1000x600")
+        self.configure(bg="#2c3e50")
+
+        controls = ttk.Frame(self)
+        controls.pack(fill=tk.X, padx=10, pady=10)
+
+        self.recording_var = tk.BooleanVar(value=db.query_stats is not None)
+        ttk.Checkbutton(controls, text="Record queries", variable=self.recording_var,
+                        command=self._toggle_recording).pack(side=tk.LEFT, padx=5)
+        ttk.Label(controls, text="Slow query ms:").pack(side=tk.LEFT, padx=5)
+        self.slow_var = tk.StringVar(value=str(db.query_stats.slow_query_ms if db.query_stats else SLOW_QUERY_MS))
+        slow_box = ttk.Spinbox(controls, from_=1, to=10000, increment=10, width=7, textvariable=self.slow_var,
+                               command=self._apply_threshold)
+        slow_box.pack(side=tk.LEFT, padx=5)
+        slow_box.bind("<Return>", lambda e: self._apply_threshold())
+        ttk.Button(controls, text="Reset", command=self._reset).pack(side=tk.LEFT, padx=5)
+        ttk.Button(controls, text="Copy report", command=self._copy_report).pack(side=tk.RIGHT, padx=5)
+
+        notebook = ttk.Notebook(self)
+        notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+
+        self.summary_text = tk.Text(notebook, height=10, wrap=tk.WORD)
+        notebook.add(self.summary_text, text="Summary")
+
+        columns = ("count", "total", "mean", "p95", "max", "rows", "sql")
+        self.query_tree = self._tree(notebook, columns, "Queries",
+                                     (("Count", 60), ("Total ms", 80), ("Mean ms", 70), ("p95 ms", 60),
+                                      ("Max ms", 70), ("Rows", 70), ("Statement", 560)))
+
+        slow_frame = ttk.Frame(notebook)
+        notebook.add(slow_frame, text="Slow queries")
+        self.slow_tree = self._tree(slow_frame, ("at", "ms", "rows", "thread", "sql"), None,
+                                    (("Time", 80), ("ms", 70), ("Rows", 60), ("Thread", 120),
+                                     ("Statement", 640)))
+        self.slow_tree.bind("<<TreeviewSelect>>", lambda e: self._show_plan())
+        self.plan_text = tk.Text(slow_frame, height=8, wrap=tk.WORD)
+        self.plan_text.pack(fill=tk.X)
+
+        self._refresh_periodically()
+
+    def _tree(self, parent, columns, tab, headings):
+        """Create a Treeview with headings, on its own tab when tab is given"""
+        tree = ttk.Treeview(parent, columns=columns, show="headings")
+        for column, (heading, width) in zip(columns, headings):
+            tree.heading(column, text=heading)
+            tree.column(column, width=width, stretch=column == "sql", anchor="w" if column == "sql" else "e")
+        if tab is not None:
+            parent.add(tree, text=tab)
+        else:
+            tree.pack(fill=tk.BOTH, expand=True)
+        return tree
+
+    def _refresh_periodically(self):
+        if not self.winfo_exists():
+            return
+        self.refresh()
+        self.after(self.REFRESH_INTERVAL, self._refresh_periodically)
+
+    def refresh(self):
+        """Redraw every tab from a fresh snapshot"""
+        stats = self.db.stats()
+
+        self.summary_text.delete("1.0", tk.END)
+        self.summary_text.insert(tk.END, "\n".join(summarize(stats)))
+
+        self.query_tree.delete(*self.query_tree.get_children())
+        for row in query_rows(stats):
+            self.query_tree.insert("", tk.END, values=row)
+
+        # The slow-query list is only rebuilt when the log changed, so a
+        # selected entry (and its plan) stays put between refreshes
+        slow = list(reversed(stats.get("slow_queries", [])))
+        if [item["at"] for item in slow] != [item["at"] for item in self._slow]:
+            self._slow = slow
+            self.slow_tree.delete(*self.slow_tree.get_children())
+            self.plan_text.delete("1.0", tk.END)
+            for index, item in enumerate(slow):
+                at = datetime.datetime.fromtimestamp(item["at"]).strftime("%H:%M:%S")
+                self.slow_tree.insert("", tk.END, iid=str(index),
+                                      values=(at, f"{item['ms']:.1f}", item["rows"], item["thread"], item["sql"]))
+
+    def _show_plan(self):
+        """Show the query plan and full text of the selected slow query"""
+        selection = self.slow_tree.selection()
+        self.plan_text.delete("1.0", tk.END)
+        if not selection:
+            return
+        item = self._slow[int(selection[0])]
+        plan = "\n".join(item["plan"]) if item["plan"] else "(no query plan)"
+        self.plan_text.insert(tk.END, f"{item['sql']}\n\n{plan}")
+
+    def _threshold(self):
+        """The slow-query threshold entered, or None if it isn't a number"""
+        try:
+            return max(float(self.slow_var.get()), 0)
+        except ValueError:
+            return None
+
+    def _toggle_recording(self):
+        if self.recording_var.get():
+            self.db.enable_instrumentation(self._threshold())
+        else:
+            self.db.disable_instrumentation()
+        self.refresh()
+
+    def _apply_threshold(self):
+        threshold = self._threshold()
+        if threshold is not None and self.db.query_stats is not None:
+            self.db.enable_instrumentation(threshold)
+            self.refresh()
+
+    def _reset(self):
+        if self.db.query_stats is not None:
+            self.db.query_stats.reset()
+        self.refresh()
+
+    def _copy_report(self):
+        """Put the full snapshot on the clipboard as JSON"""
+        self.clipboard_clear()
+        self.clipboard_append(json.dumps(self.db.stats(), indent=2, default=str))
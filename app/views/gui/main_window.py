@@ -1,16 +1,81 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog, filedialog
-from tkcalendar import DateEntry
 import datetime
 from datetime import timedelta
 
+from app.views.gui.ticker import TickScheduler
+
+def _toggle_tasks_flag(task_controller, task_ids, field):
+    """
+    Flip a 0/1 field on the selected tasks; runs on the database writer thread.
+    
+    When the tasks disagree the flag is set on all of them, so a mixed
+    selection becomes uniformly completed (or priority) first.
+    """
+    tasks = task_controller.get_tasks(task_ids, require_all=True)
+    new_value = not all(task[field] for task in tasks)
+    task_controller.update_tasks(task_ids, **{field: new_value})
+    return new_value
+
+def diff_rows(shown, order, rows):
+    """
+    Work out the Treeview calls that turn the rows shown into `rows`.
+    
+    Args:
+        shown: Dict iid -> values of the rows shown now
+        order: iids in their current display order
+        rows: Ordered list of (iid, values) tuples to show
+        
+    Returns:
+        tuple: (iids to delete, (iid, values) to insert at the end,
+                (iid, values) whose values changed, the new order for a
+                single set_children call or None if the order is right)
+    """
+    wanted = dict(rows)
+    removed = [iid for iid in shown if iid not in wanted]
+    inserted = [(iid, values) for iid, values in rows if iid not in shown]
+    changed = [(iid, values) for iid, values in rows if iid in shown and shown[iid] != values]
+    
+    # Order after the deletes and the inserts at the end
+    resulting = tuple(iid for iid in order if iid in wanted) + tuple(iid for iid, _ in inserted)
+    target = tuple(iid for iid, _ in rows)
+    return removed, inserted, changed, target if resulting != target else None
+
 class TimeApp(tk.Tk):
-    def __init__(self, task_controller, timer_controller):
+    # How often (ms) pending database work is checked for completion
+    POLL_INTERVAL = 20
+    
+    # The task list shows a sliding window over the tasks table: rows are
+    # fetched in pages of PAGE_SIZE and at most WINDOW_PAGES pages stay in
+    # the Treeview, whatever the size of the table.
+    PAGE_SIZE = 100
+    WINDOW_PAGES = 3
+    
+    # The search box queries once typing pauses for SEARCH_DELAY ms and
+    # shows the best SEARCH_LIMIT matches
+    SEARCH_DELAY = 250
+    SEARCH_LIMIT = 200
+    
+    # Notes of the selected task are listed NOTES_PAGE at a time; a note's
+    # full text streams into the viewer NOTE_CHUNK characters at a time
+    NOTES_PAGE = 50
+    NOTE_CHUNK = 4096
+    
+    def __init__(self, task_controller, timer_controller, export_controller, note_controller,
+                 report_controller, executor):
         super().__init__()
         
-        # Store controllers for later use
+        # Store controllers for later use; every database call goes through
+        # the executor so the window never waits on disk
         self.task_controller = task_controller
         self.timer_controller = timer_controller
+        self.export_controller = export_controller
+        self.note_controller = note_controller
+        self.report_controller = report_controller
+        self.executor = executor
+        self.report_window = None
+        self.diagnostics_window = None
+        self._select_seq = 0
         self.active_task_id = None
         
         # Configure window
@@ -51,6 +116,14 @@ class TimeApp(tk.Tk):
         sort_frame = ttk.Frame(filter_button_frame)
         sort_frame.pack(side=tk.RIGHT)
         
+        # Full-text search box, queried as the user types
+        ttk.Label(sort_frame, text="Search:").pack(side=tk.LEFT, padx=5)
+        self.search_var = tk.StringVar()
+        self._search_after = None
+        search_entry = ttk.Entry(sort_frame, textvariable=self.search_var, width=20)
+        search_entry.pack(side=tk.LEFT, padx=5)
+        self.search_var.trace_add("write", self._on_search_changed)
+        
         ttk.Label(sort_frame, text="Sort by:").pack(side=tk.LEFT, padx=5)
         self.sort_var = tk.StringVar(value="name")
         sort_options = ttk.Combobox(sort_frame, 
@@ -107,8 +180,13 @@ class TimeApp(tk.Tk):
         self.current_filter = "all"  # Default filter
         self.refresh_tasks()
         
-        # Start the timer update loop
-        self._update_timer_display()
+        # Keep the timer label current; the scheduler sleeps while no timer runs
+        self.ticker = TickScheduler(self)
+        self.ticker.add("timer", self.timer_display,
+                        self.timer_controller.get_elapsed_time,
+                        lambda: self.timer_controller.is_running,
+                        self.timer_controller.format_time)
+        self.after(int(self.timer_controller.checkpoint_interval * 1000), self._keep_alive)
     
     def _setup_styles(self):
         """Setup custom styles for a modern look"""
@@ -239,6 +317,7 @@ class TimeApp(tk.Tk):
         self.task_tree = ttk.Treeview(tree_frame, 
                                     columns=("Name", "Category", "Deadline", "Total Time", "Status"),
                                     show='headings', 
+                                    selectmode='extended',
                                     height=12)
         
         # Configure columns
@@ -256,10 +335,23 @@ class TimeApp(tk.Tk):
         
         # Bind selection event
         self.task_tree.bind('<<TreeviewSelect>>', self.on_task_select)
+        
+        # Values currently shown per row iid, used to refresh only what changed
+        self._tree_rows = {}
     
-        # Add scrollbar
+        # Add scrollbar; scrolling near either end slides the task window
         scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.task_tree.yview)
-        self.task_tree.configure(yscrollcommand=scrollbar.set)
+        self.task_scrollbar = scrollbar
+        self.task_tree.configure(yscrollcommand=self._on_tree_scroll)
+        
+        # Loaded window: list of (iid, values, sort cursor), the cursor of the
+        # row just above it (None at the top) and whether rows follow below
+        self._window = []
+        self._window_key = None
+        self._window_before = None
+        self._more_below = False
+        self._window_pending = False
+        self._window_seq = 0
         
         self.task_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
@@ -309,6 +401,59 @@ class TimeApp(tk.Tk):
                                       wrap=tk.WORD,
                                       state=tk.DISABLED)
         self.description_text.pack(fill=tk.BOTH, expand=True)
+        
+        self._create_notes_section(details_frame)
+    
+    def _create_notes_section(self, parent):
+        """Create the notes list, note viewer and note buttons"""
+        ttk.Label(parent, 
+                 text="Notes:", 
+                 style="Details.TLabel").pack(anchor='w', pady=(15, 5))
+        
+        # Previews of the loaded notes, newest first
+        list_frame = ttk.Frame(parent)
+        list_frame.pack(fill=tk.BOTH, expand=True)
+        self.notes_list = tk.Listbox(list_frame, 
+                                   height=6, 
+                                   bg="#34495e", 
+                                   fg="white",
+                                   activestyle='none',
+                                   exportselection=False)
+        notes_scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=self.notes_list.yview)
+        self.notes_list.configure(yscrollcommand=notes_scrollbar.set)
+        self.notes_list.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        notes_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.notes_list.bind('<<ListboxSelect>>', self._on_note_select)
+        
+        # Full text of the selected note
+        self.note_text = tk.Text(parent, 
+                               height=6, 
+                               width=30, 
+                               bg="#34495e", 
+                               fg="white",
+                               font=("Helvetica", 11),
+                               wrap=tk.WORD,
+                               state=tk.DISABLED)
+        self.note_text.pack(fill=tk.BOTH, expand=True, pady=(5, 0))
+        
+        note_buttons = ttk.Frame(parent)
+        note_buttons.pack(fill=tk.X, pady=5)
+        self.add_note_button = ttk.Button(note_buttons, text="Add Note", command=self.add_note)
+        self.add_note_button.pack(side=tk.LEFT, padx=2)
+        self.delete_note_button = ttk.Button(note_buttons, text="Delete Note", command=self.delete_note)
+        self.delete_note_button.pack(side=tk.LEFT, padx=2)
+        self.more_notes_button = ttk.Button(note_buttons, text="Load More",
+                                          command=lambda: self._load_notes(more=True))
+        self.more_notes_button.pack(side=tk.LEFT, padx=2)
+        
+        # Nothing is loaded until a task is selected
+        self._notes_task_id = None
+        self._notes_cursor = None
+        self._note_ids = []
+        self._notes_seq = 0
+        self._note_seq = 0
+        self._notes_more = False
+        self._set_notes_state(False)
     
     def _create_timer_section(self, parent_frame):
         """Create timer display and controls direttamente nel frame passato"""
@@ -349,6 +494,11 @@ class TimeApp(tk.Tk):
         # Initial button states
         self.pause_button.config(state='disabled')
         self.stop_button.config(state='disabled')
+        
+        # A session recovered after a crash comes back paused
+        if self.timer_controller.is_paused:
+            self.start_button.config(text="▶ Resume")
+            self.stop_button.config(state='normal')
 
     
     def _create_footer(self):
@@ -367,52 +517,278 @@ class TimeApp(tk.Tk):
                                   text="Export Data",
                                   command=self.export_data)
         export_button.pack(side=tk.RIGHT)
+        
+        reports_button = ttk.Button(footer_frame,
+                                   text="Reports",
+                                   command=self.open_reports)
+        reports_button.pack(side=tk.RIGHT, padx=10)
+        
+        diagnostics_button = ttk.Button(footer_frame,
+                                       text="Diagnostics",
+                                       command=self.open_diagnostics)
+        diagnostics_button.pack(side=tk.RIGHT)
     
-    def refresh_tasks(self):
-        """Load and display tasks from the database with applied filters"""
-        # Clear current items
-        for item in self.task_tree.get_children():
-            self.task_tree.delete(item)
+    def _run_async(self, future, on_success=None):
+        """
+        Call on_success(result) on the Tk thread once a database future is done.
+        
+        The future is polled with after(), so the event loop keeps running
+        while the work happens on the executor threads. Errors are shown in
+        a message box.
+        """
+        def poll():
+            if not future.done():
+                self.after(self.POLL_INTERVAL, poll)
+                return
+            try:
+                result = future.result()
+            except Exception as e:
+                messagebox.showerror("Error", str(e))
+                return
+            if on_success:
+                on_success(result)
+        
+        self.after(self.POLL_INTERVAL, poll)
+    
+    def refresh_tasks(self, on_done=None):
+        """
+        Load and display tasks from the database with applied filters.
+        
+        Args:
+            on_done: Optional callback run once the new rows are shown
+        """
+        # A search replaces the paged list with its ranked results
+        search_text = self.search_var.get().strip()
+        if search_text:
+            self._show_search_results(search_text, on_done)
+            return
         
         # Get filter values
-        current_filter = self.filter_var.get()
+        completed = self._completed_filter()
         sort_by = self.sort_var.get()
         
-        # Get tasks with filters
-        tasks = []
-        if current_filter == "all":
-            tasks = self.task_controller.get_all_tasks(sort_by=sort_by)
-        elif current_filter == "wip":
-            tasks = self.task_controller.get_all_tasks(include_completed=False, sort_by=sort_by)
-        elif current_filter == "completed":
-            tasks = self.task_controller.get_filtered_tasks(completed=True, sort_by=sort_by)
-        
-        # Insert tasks into tree
-        for task in tasks:
-            # Format the deadline if it exists
-            deadline = "-"
-            if task['deadline']:
-                if isinstance(task['deadline'], str):
-                    deadline = task['deadline']
-                else:
-                    deadline = task['deadline'].strftime("%Y-%m-%d")
+        # A new filter or sort order starts again from the top
+        window_key = (completed, sort_by)
+        if window_key != self._window_key:
+            self._window_key = window_key
+            self._window_before = None
+            self._window = []
+            self.task_tree.yview_moveto(0)
+        
+        # Reload the rows currently in the window (first page plus prefetch
+        # margin at least), one extra row tells whether more follow
+        limit = max(self.PAGE_SIZE * 2, len(self._window))
+        window_before = self._window_before
+        
+        # Only the most recent window request gets applied
+        self._window_seq += 1
+        seq = self._window_seq
+        self._window_pending = True
+        
+        def apply(tasks):
+            if seq != self._window_seq:
+                return
+            self._window_pending = False
+            if not tasks and window_before is not None:
+                # Everything below the window start is gone: restart from the top
+                self._window_key = None
+                self.refresh_tasks(on_done)
+                return
+            
+            self._more_below = len(tasks) > limit
+            self._window = [self._window_row(task, sort_by) for task in tasks[:limit]]
+            self._show_window()
+            if on_done:
+                on_done()
+        
+        future = self.executor.submit_read(
+            self.task_controller.get_tasks_page,
+            completed=completed, sort_by=sort_by, after=window_before, limit=limit + 1
+        )
+        self._run_async(future, apply)
+    
+    def _on_search_changed(self, *args):
+        """Restart the search delay on every keystroke"""
+        if self._search_after is not None:
+            self.after_cancel(self._search_after)
+        self._search_after = self.after(self.SEARCH_DELAY, self._run_search)
+    
+    def _run_search(self):
+        """Query with the search text once typing has paused"""
+        self._search_after = None
+        self.refresh_tasks()
+    
+    def _show_search_results(self, text, on_done=None):
+        """Show the tasks matching a search, best match first"""
+        completed = self._completed_filter()
+        window_key = ("search", text, completed)
+        if window_key != self._window_key:
+            self._window_key = window_key
+            self.task_tree.yview_moveto(0)
+        
+        # Results come in one piece: nothing to slide in either direction
+        self._window_before = None
+        self._more_below = False
+        
+        self._window_seq += 1
+        seq = self._window_seq
+        self._window_pending = True
+        
+        def apply(tasks):
+            if seq != self._window_seq:
+                return
+            self._window_pending = False
+            self._window = [(str(task['id']), self._task_row_values(task), None) for task in tasks]
+            self._show_window()
+            self.status_label.config(text=f"{len(tasks)} matching tasks")
+            if on_done:
+                on_done()
+        
+        future = self.executor.submit_read(
+            self.task_controller.search, text, completed=completed, limit=self.SEARCH_LIMIT
+        )
+        self._run_async(future, apply)
+    
+    def _completed_filter(self):
+        """Map the filter radio buttons to the 'completed' query filter"""
+        return {"all": None, "wip": False, "completed": True}.get(self.filter_var.get())
+    
+    def _window_row(self, task, sort_by):
+        """Build a (iid, values, cursor) window entry for a task row"""
+        return (str(task['id']),
+                self._task_row_values(task),
+                self.task_controller.sort_cursor(task, sort_by))
+    
+    def _show_window(self):
+        """Push the loaded window into the Treeview"""
+        self._sync_task_rows([(iid, values) for iid, values, _ in self._window])
+    
+    def _on_tree_scroll(self, first, last):
+        """Update the scrollbar and slide the window when nearing either end"""
+        self.task_scrollbar.set(first, last)
+        if self._window_pending or not self._window:
+            return
+        
+        if float(last) > 0.9 and self._more_below:
+            self._window_pending = True
+            self.after_idle(self._slide_window_down)
+        elif float(first) < 0.1 and self._window_before is not None:
+            self._window_pending = True
+            self.after_idle(self._slide_window_up)
+    
+    def _slide_window_down(self):
+        """Append the next page and drop rows that scrolled far above"""
+        if not self._window:
+            self._window_pending = False
+            return
+        completed, sort_by = self._window_key
+        self._window_seq += 1
+        seq = self._window_seq
+        
+        def apply(tasks):
+            if seq != self._window_seq:
+                return
+            self._window_pending = False
+            self._more_below = len(tasks) > self.PAGE_SIZE
+            self._window.extend(self._window_row(task, sort_by) for task in tasks[:self.PAGE_SIZE])
             
-            # Format the total time
-            total_time = self._format_duration(task['total_time'])
+            overflow = len(self._window) - self.PAGE_SIZE * self.WINDOW_PAGES
+            if overflow > 0:
+                self._window_before = self._window[overflow - 1][2]
+                del self._window[:overflow]
+            self._show_window()
             
-            # Task status
-            status = "✓ Done" if task['completed'] else "In Progress"
+            # Rows removed above the view would make the content jump
+            if overflow > 0:
+                self.task_tree.yview_scroll(-overflow, 'units')
+        
+        future = self.executor.submit_read(
+            self.task_controller.get_tasks_page,
+            completed=completed, sort_by=sort_by, after=self._window[-1][2], limit=self.PAGE_SIZE + 1
+        )
+        self._run_async(future, apply)
+    
+    def _slide_window_up(self):
+        """Prepend the previous page and drop rows that scrolled far below"""
+        if not self._window:
+            self._window_pending = False
+            return
+        completed, sort_by = self._window_key
+        self._window_seq += 1
+        seq = self._window_seq
+        
+        def apply(tasks):
+            if seq != self._window_seq:
+                return
+            self._window_pending = False
+            if len(tasks) > self.PAGE_SIZE:
+                # The extra row is the new boundary above the window
+                self._window_before = self.task_controller.sort_cursor(tasks[0], sort_by)
+                tasks = tasks[1:]
+            else:
+                self._window_before = None
+            self._window[:0] = [self._window_row(task, sort_by) for task in tasks]
             
-            # Priority indicator
-            name_display = "❗ " + task['name'] if task['priority'] else task['name']
+            overflow = len(self._window) - self.PAGE_SIZE * self.WINDOW_PAGES
+            if overflow > 0:
+                del self._window[-overflow:]
+                self._more_below = True
+            self._show_window()
             
-            self.task_tree.insert("", tk.END, 
-                                 iid=task['id'], 
-                                 values=(name_display, 
-                                        task['category'] or "-", 
-                                        deadline, 
-                                        total_time,
-                                        status))
+            # Keep the rows the user was looking at in place
+            if tasks:
+                self.task_tree.yview_scroll(len(tasks), 'units')
+        
+        future = self.executor.submit_read(
+            self.task_controller.get_tasks_page,
+            completed=completed, sort_by=sort_by, before=self._window[0][2], limit=self.PAGE_SIZE + 1
+        )
+        self._run_async(future, apply)
+    
+    def _task_row_values(self, task):
+        """Build the Treeview column values for a task row"""
+        # Format the deadline if it exists
+        deadline = "-"
+        if task['deadline']:
+            if isinstance(task['deadline'], str):
+                deadline = task['deadline']
+            else:
+                deadline = task['deadline'].strftime("%Y-%m-%d")
+        
+        # Format the total time
+        total_time = self._format_duration(task['total_time'])
+        
+        # Task status
+        status = "✓ Done" if task['completed'] else "In Progress"
+        
+        # Priority indicator
+        name_display = "❗ " + task['name'] if task['priority'] else task['name']
+        
+        return (name_display, task['category'] or "-", deadline, total_time, status)
+    
+    def _sync_task_rows(self, rows):
+        """
+        Bring the Treeview in line with `rows` touching only what changed.
+        
+        Args:
+            rows: Ordered list of (iid, values) tuples
+        """
+        removed, inserted, changed, order = diff_rows(self._tree_rows, self.task_tree.get_children(), rows)
+        
+        if removed:
+            self.task_tree.delete(*removed)
+            for iid in removed:
+                del self._tree_rows[iid]
+        for iid, values in inserted:
+            self.task_tree.insert("", tk.END, iid=iid, values=values)
+            self._tree_rows[iid] = values
+        for iid, values in changed:
+            self.task_tree.item(iid, values=values)
+            self._tree_rows[iid] = values
+        
+        # Reorder in a single call, only when the order actually differs
+        if order is not None:
+            self.task_tree.set_children("", *order)
     
     def _format_duration(self, seconds):
         """Format seconds into human-readable time"""
@@ -425,66 +801,214 @@ class TimeApp(tk.Tk):
     
     def on_task_select(self, event):
         """Handle task selection from the tree"""
+        self._select_seq += 1
+        seq = self._select_seq
+        
         selected_items = self.task_tree.selection()
-        if selected_items:
-            self.active_task_id = int(selected_items[0])
-            task = self.task_controller.get_task(self.active_task_id)
-            
-            # Update current task label
-            self.current_task_label.config(text=f"Selected: {task['name']}")
-            
-            # Enable start button
-            self.start_button.config(state='normal')
-            
-            # Update task details panel
-            self.detail_labels["Name:"].config(text=task['name'])
-            self.detail_labels["Category:"].config(text=task['category'] or "-")
-            self.detail_labels["Created:"].config(text=task['created_at'])
-            
-            deadline_text = "-"
-            if task['deadline']:
-                if isinstance(task['deadline'], str):
-                    deadline_text = task['deadline']
-                else:
-                    deadline_text = task['deadline'].strftime("%Y-%m-%d")
-            self.detail_labels["Deadline:"].config(text=deadline_text)
-            
-            # Corretto: usa parentesi quadre invece di get()
-            status_text = "Completed" if task['completed'] else "In Progress"
-            priority_text = " (Priority)" if task['priority'] else ""
-            self.detail_labels["Status:"].config(text=f"{status_text}{priority_text}")
-            
-            # Update description text
-            self.description_text.config(state=tk.NORMAL)
-            self.description_text.delete("1.0", tk.END)
-            if task['description']:
-                self.description_text.insert("1.0", task['description'])
+        if not selected_items:
+            self._clear_task_details()
+            return
+        
+        self.active_task_id = int(selected_items[0])
+        
+        # Ignore answers for a selection that has since changed
+        def show(task):
+            if seq == self._select_seq and task:
+                self._show_task_details(task)
+        
+        future = self.executor.submit_read(self.task_controller.get_task, self.active_task_id)
+        self._run_async(future, show)
+    
+    def _selected_task_ids(self):
+        """IDs of all tasks selected in the tree"""
+        return [int(item) for item in self.task_tree.selection()]
+    
+    def _show_task_details(self, task):
+        """Fill the details panel and timer label for the selected task"""
+        # Update current task label
+        self.current_task_label.config(text=f"Selected: {task['name']}")
+        
+        # Enable start button
+        self.start_button.config(state='normal')
+        
+        # Update task details panel
+        self.detail_labels["Name:"].config(text=task['name'])
+        self.detail_labels["Category:"].config(text=task['category'] or "-")
+        self.detail_labels["Created:"].config(text=task['created_at'])
+        
+        deadline_text = "-"
+        if task['deadline']:
+            if isinstance(task['deadline'], str):
+                deadline_text = task['deadline']
             else:
-                self.description_text.insert("1.0", "No description available.")
-            self.description_text.config(state=tk.DISABLED)
+                deadline_text = task['deadline'].strftime("%Y-%m-%d")
+        self.detail_labels["Deadline:"].config(text=deadline_text)
+        
+        # Corretto: usa parentesi quadre invece di get()
+        status_text = "Completed" if task['completed'] else "In Progress"
+        priority_text = " (Priority)" if task['priority'] else ""
+        self.detail_labels["Status:"].config(text=f"{status_text}{priority_text}")
+        
+        # Update description text
+        self.description_text.config(state=tk.NORMAL)
+        self.description_text.delete("1.0", tk.END)
+        if task['description']:
+            self.description_text.insert("1.0", task['description'])
         else:
-            self.active_task_id = None
-            self.current_task_label.config(text="No Task Selected")
-            self.start_button.config(state='disabled')
-            
-            # Clear details panel
-            for label in self.detail_labels.values():
-                label.config(text="-")
-            
-            self.description_text.config(state=tk.NORMAL)
-            self.description_text.delete("1.0", tk.END)
-            self.description_text.insert("1.0", "Select a task to view details.")
-            self.description_text.config(state=tk.DISABLED)
+            self.description_text.insert("1.0", "No description available.")
+        self.description_text.config(state=tk.DISABLED)
+        
+        # Notes are only fetched for the task being looked at
+        if task['id'] != self._notes_task_id:
+            self._notes_task_id = task['id']
+            self._load_notes()
+    
+    def _set_notes_state(self, enabled, more=False):
+        """Enable the note buttons for a selected task"""
+        self._notes_more = more
+        self.add_note_button.config(state='normal' if enabled else 'disabled')
+        self.delete_note_button.config(state='normal' if enabled and self.notes_list.curselection() else 'disabled')
+        self.more_notes_button.config(state='normal' if enabled and more else 'disabled')
+    
+    def _load_notes(self, more=False):
+        """
+        Load a page of the selected task's notes into the list.
+        
+        Args:
+            more: Append the next page instead of starting over
+        """
+        task_id = self._notes_task_id
+        if not more:
+            self._notes_cursor = None
+            self._note_ids = []
+            self.notes_list.delete(0, tk.END)
+            self._show_note_text("")
+        
+        self._notes_seq += 1
+        seq = self._notes_seq
+        
+        def apply(notes):
+            if seq != self._notes_seq:
+                return
+            has_more = len(notes) > self.NOTES_PAGE
+            notes = notes[:self.NOTES_PAGE]
+            for note in notes:
+                preview = note['preview'].split("\n", 1)[0]
+                self.notes_list.insert(tk.END, f"{note['created_at']}  {preview}")
+                self._note_ids.append(note['id'])
+            if notes:
+                self._notes_cursor = self.note_controller.note_cursor(notes[-1])
+            self._set_notes_state(True, has_more)
+        
+        future = self.executor.submit_read(
+            self.note_controller.get_notes_page, task_id,
+            after=self._notes_cursor, limit=self.NOTES_PAGE + 1
+        )
+        self._run_async(future, apply)
+    
+    def _on_note_select(self, event):
+        """Stream the selected note's text into the viewer chunk by chunk"""
+        selection = self.notes_list.curselection()
+        self._set_notes_state(self._notes_task_id is not None, self._notes_more)
+        if not selection:
+            return
+        note_id = self._note_ids[selection[0]]
+        
+        # A newer selection stops the stream of the previous note
+        self._note_seq += 1
+        seq = self._note_seq
+        self._show_note_text("")
+        
+        def append(chunk, offset=0):
+            if seq != self._note_seq or not chunk:
+                return
+            self.note_text.config(state=tk.NORMAL)
+            self.note_text.insert(tk.END, chunk)
+            self.note_text.config(state=tk.DISABLED)
+            if len(chunk) == self.NOTE_CHUNK:
+                read_next(offset + len(chunk))
+        
+        def read_next(offset):
+            future = self.executor.submit_read(self.note_controller.read_content,
+                                               note_id, offset, self.NOTE_CHUNK)
+            self._run_async(future, lambda chunk: append(chunk, offset))
+        
+        read_next(0)
     
-    def _update_timer_display(self):
-        """Update timer display every second"""
-        if self.timer_controller.is_running:
-            elapsed = self.timer_controller.get_elapsed_time()
-            display_time = self._format_duration(elapsed)
-            self.timer_display.config(text=display_time)
+    def _show_note_text(self, text):
+        """Replace the contents of the note viewer"""
+        self.note_text.config(state=tk.NORMAL)
+        self.note_text.delete("1.0", tk.END)
+        self.note_text.insert("1.0", text)
+        self.note_text.config(state=tk.DISABLED)
+    
+    def add_note(self):
+        """Ask for a note and add it to the selected task"""
+        task_id = self._notes_task_id
+        if task_id is None:
+            return
+        content = simpledialog.askstring("New Note", "Note:", parent=self)
+        if not content:
+            return
         
-        # Schedule next update
-        self.after(1000, self._update_timer_display)
+        def added(note_id):
+            self.status_label.config(text="Note added")
+            if task_id == self._notes_task_id:
+                self._load_notes()
+        
+        future = self.executor.submit_write(self.note_controller.add_note, task_id, content)
+        self._run_async(future, added)
+    
+    def delete_note(self):
+        """Delete the selected note"""
+        selection = self.notes_list.curselection()
+        if not selection:
+            return
+        note_id = self._note_ids[selection[0]]
+        if not messagebox.askyesno("Confirm", "Are you sure you want to delete this note?"):
+            return
+        
+        def deleted(result):
+            self.status_label.config(text="Note deleted")
+            if self._notes_task_id is not None:
+                self._load_notes()
+        
+        future = self.executor.submit_write(self.note_controller.delete_note, note_id)
+        self._run_async(future, deleted)
+    
+    def _clear_task_details(self):
+        """Reset the details panel when no task is selected"""
+        self.active_task_id = None
+        self.current_task_label.config(text="No Task Selected")
+        self.start_button.config(state='disabled')
+        
+        # Clear details panel
+        for label in self.detail_labels.values():
+            label.config(text="-")
+        
+        self.description_text.config(state=tk.NORMAL)
+        self.description_text.delete("1.0", tk.END)
+        self.description_text.insert("1.0", "Select a task to view details.")
+        self.description_text.config(state=tk.DISABLED)
+        
+        # Forget the notes of the previous task
+        self._notes_task_id = None
+        self._notes_seq += 1
+        self._note_seq += 1
+        self._note_ids = []
+        self.notes_list.delete(0, tk.END)
+        self._show_note_text("")
+        self._set_notes_state(False)
+    
+    def _keep_alive(self):
+        """
+        Checkpoint the open session once per checkpoint interval, paused or
+        not: the heartbeat tells other processes (command line, API server)
+        that this session is still being timed, and bounds what a crash loses.
+        """
+        if self.timer_controller.is_running or self.timer_controller.is_paused:
+            self.executor.submit_write(self.timer_controller.checkpoint, True)
+        self.after(int(self.timer_controller.checkpoint_interval * 1000), self._keep_alive)
     
     def start_timer(self):
         """Start timing the selected task"""
@@ -492,33 +1016,35 @@ class TimeApp(tk.Tk):
             messagebox.showerror("Error", "Please select a task first")
             return
         
-        try:
-            self.timer_controller.start(self.active_task_id)
+        def started(entry_id):
             # Update UI
             self.start_button.config(state='disabled')
             self.pause_button.config(state='normal')
             self.stop_button.config(state='normal')
             self.status_label.config(text="Timer running...")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
+            self.ticker.wake()
+        
+        future = self.executor.submit_write(self.timer_controller.start, self.active_task_id)
+        self._run_async(future, started)
     
     def pause_timer(self):
         """Pause the current timer"""
-        try:
-            self.timer_controller.pause()
+        def paused(result):
             # Update UI
             self.start_button.config(state='normal', text="▶ Resume")
             self.pause_button.config(state='disabled')
             self.status_label.config(text="Timer paused")
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
+            self.ticker.wake()
+        
+        # Timer state is only ever changed on the writer thread
+        future = self.executor.submit_write(self.timer_controller.pause)
+        self._run_async(future, paused)
     
     def stop_timer(self):
         """Stop and save the current timing session"""
-        try:
-            duration = self.timer_controller.stop()
+        def stopped(duration):
             # Update UI
-            self.timer_display.config(text="00:00:00")
+            self.ticker.wake()
             self.start_button.config(state='normal', text="▶ Start")
             self.pause_button.config(state='disabled')
             self.stop_button.config(state='disabled')
@@ -529,8 +1055,9 @@ class TimeApp(tk.Tk):
             # Update task details if the same task is still selected
             if self.active_task_id:
                 self.on_task_select(None)
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
+        
+        future = self.executor.submit_write(self.timer_controller.stop)
+        self._run_async(future, stopped)
     
     def add_task(self):
         """Open dialog to add a new task with all fields"""
@@ -552,7 +1079,9 @@ class TimeApp(tk.Tk):
         category_entry = ttk.Entry(dialog, width=30)
         category_entry.grid(row=1, column=1, padx=10, pady=10)
         
-        # Deadline with DateEntry widget
+        # Deadline with DateEntry widget; tkcalendar (and babel behind it)
+        # is only loaded once a task dialog opens
+        from tkcalendar import DateEntry
         ttk.Label(dialog, text="Deadline:").grid(row=2, column=0, padx=10, pady=10, sticky='w')
         deadline_frame = ttk.Frame(dialog)
         deadline_frame.grid(row=2, column=1, padx=10, pady=10, sticky='w')
@@ -583,32 +1112,35 @@ class TimeApp(tk.Tk):
                 messagebox.showerror("Error", "Task name is required")
                 return
                 
-            try:
-                category = category_entry.get() if category_entry.get() else None
-                description = description_text.get("1.0", tk.END).strip() or None
-                
-                # Get date from DateEntry widget - convert to datetime object
-                selected_date = cal.get_date()
-                
-                # Create task
-                task_id = self.task_controller.create_task(
-                    name=name, 
-                    description=description, 
-                    category=category, 
-                    deadline=selected_date,
-                    priority=priority_var.get()
-                )
-                
-                self.refresh_tasks()
+            category = category_entry.get() if category_entry.get() else None
+            description = description_text.get("1.0", tk.END).strip() or None
+            
+            # Get date from DateEntry widget - convert to datetime object
+            selected_date = cal.get_date()
+            
+            def created(task_id):
                 self.status_label.config(text=f"Task '{name}' created")
                 dialog.destroy()
                 
-                # Select the new task
-                self.task_tree.selection_set(task_id)
-                self.task_tree.focus(task_id)
-                self.on_task_select(None)
-            except Exception as e:
-                messagebox.showerror("Error", str(e))
+                # Select the new task if it falls inside the loaded window
+                def select_new_task():
+                    if self.task_tree.exists(task_id):
+                        self.task_tree.selection_set(task_id)
+                        self.task_tree.focus(task_id)
+                        self.task_tree.see(task_id)
+                    self.on_task_select(None)
+                self.refresh_tasks(on_done=select_new_task)
+            
+            # Create task
+            future = self.executor.submit_write(
+                self.task_controller.create_task,
+                name=name, 
+                description=description, 
+                category=category, 
+                deadline=selected_date,
+                priority=priority_var.get()
+            )
+            self._run_async(future, created)
         
         ttk.Button(button_frame, text="Save", command=save_task).pack(side=tk.LEFT, padx=10)
         ttk.Button(button_frame, text="Cancel", command=dialog.destroy).pack(side=tk.LEFT, padx=10)
@@ -622,11 +1154,19 @@ class TimeApp(tk.Tk):
             messagebox.showerror("Error", "Please select a task first")
             return
             
-        # Get the selected task
-        task = self.task_controller.get_task(self.active_task_id)
-        if not task:
-            messagebox.showerror("Error", "Could not load task data")
-            return
+        # Load the selected task, then open the dialog
+        def loaded(task):
+            if not task:
+                messagebox.showerror("Error", "Could not load task data")
+                return
+            self._open_edit_dialog(task)
+        
+        future = self.executor.submit_read(self.task_controller.get_task, self.active_task_id)
+        self._run_async(future, loaded)
+    
+    def _open_edit_dialog(self, task):
+        """Show the edit dialog filled in with a task's current values"""
+        task_id = task['id']
         
         # Create a dialog window
         dialog = tk.Toplevel(self)
@@ -649,7 +1189,9 @@ class TimeApp(tk.Tk):
         if task['category']:
             category_entry.insert(0, task['category'])
         
-        # Deadline with DateEntry widget
+        # Deadline with DateEntry widget; tkcalendar (and babel behind it)
+        # is only loaded once a task dialog opens
+        from tkcalendar import DateEntry
         ttk.Label(dialog, text="Deadline:").grid(row=2, column=0, padx=10, pady=10, sticky='w')
         deadline_frame = ttk.Frame(dialog)
         deadline_frame.grid(row=2, column=1, padx=10, pady=10, sticky='w')
@@ -697,33 +1239,35 @@ class TimeApp(tk.Tk):
                 messagebox.showerror("Error", "Task name is required")
                 return
                 
-            try:
-                category = category_entry.get() if category_entry.get() else None
-                description = description_text.get("1.0", tk.END).strip() or None
-                
-                # Get date from DateEntry widget
-                selected_date = cal.get_date()
-                
-                # Update task
-                self.task_controller.update_task(
-                    self.active_task_id,
-                    name=name, 
-                    description=description, 
-                    category=category, 
-                    deadline=selected_date,
-                    priority=priority_var.get()
-                )
-                
-                self.refresh_tasks()
+            category = category_entry.get() if category_entry.get() else None
+            description = description_text.get("1.0", tk.END).strip() or None
+            
+            # Get date from DateEntry widget
+            selected_date = cal.get_date()
+            
+            def updated(result):
                 self.status_label.config(text=f"Task '{name}' updated")
                 dialog.destroy()
                 
                 # Re-select the task to update details view
-                self.task_tree.selection_set(self.active_task_id)
-                self.task_tree.focus(self.active_task_id)
-                self.on_task_select(None)
-            except Exception as e:
-                messagebox.showerror("Error", str(e))
+                def reselect_task():
+                    if self.task_tree.exists(task_id):
+                        self.task_tree.selection_set(task_id)
+                        self.task_tree.focus(task_id)
+                    self.on_task_select(None)
+                self.refresh_tasks(on_done=reselect_task)
+            
+            # Update task
+            future = self.executor.submit_write(
+                self.task_controller.update_task,
+                task_id,
+                name=name, 
+                description=description, 
+                category=category, 
+                deadline=selected_date,
+                priority=priority_var.get()
+            )
+            self._run_async(future, updated)
         
         ttk.Button(button_frame, text="Save", command=save_edited_task).pack(side=tk.LEFT, padx=10)
         ttk.Button(button_frame, text="Cancel", command=dialog.destroy).pack(side=tk.LEFT, padx=10)
@@ -733,82 +1277,107 @@ class TimeApp(tk.Tk):
 
     
     def delete_task(self):
-        """Delete the selected task"""
-        if not self.active_task_id:
+        """Delete the selected tasks"""
+        task_ids = self._selected_task_ids()
+        if not task_ids:
             messagebox.showerror("Error", "Please select a task first")
             return
-            
-        if messagebox.askyesno("Confirm", "Are you sure you want to delete this task?"):
-            try:
-                self.task_controller.delete_task(self.active_task_id)
-                self.refresh_tasks()
+        
+        question = ("Are you sure you want to delete this task?" if len(task_ids) == 1
+                    else f"Are you sure you want to delete these {len(task_ids)} tasks?")
+        if messagebox.askyesno("Confirm", question):
+            def deleted(count):
                 self.active_task_id = None
                 self.current_task_label.config(text="No Task Selected")
-                self.status_label.config(text="Task deleted")
+                self.status_label.config(text="Task deleted" if count == 1 else f"{count} tasks deleted")
                 
-                # Clear details
+                # Refresh and clear details
+                self.refresh_tasks()
                 self.on_task_select(None)
-            except Exception as e:
-                messagebox.showerror("Error", str(e))
+            
+            future = self.executor.submit_write(self.task_controller.delete_tasks, task_ids)
+            self._run_async(future, deleted)
     
     def toggle_complete(self):
-        """Toggle the completion status of the selected task"""
-        if not self.active_task_id:
+        """Toggle the completion status of the selected tasks"""
+        task_ids = self._selected_task_ids()
+        if not task_ids:
             messagebox.showerror("Error", "Please select a task first")
             return
-            
-        try:
-            task = self.task_controller.get_task(self.active_task_id)
-            new_status = not task['completed']
-            
-            self.task_controller.update_task(
-                self.active_task_id, 
-                completed=new_status
-            )
-            
+        
+        def toggled(new_status):
             status_text = "completed" if new_status else "reopened"
-            self.status_label.config(text=f"Task {status_text}")
+            subject = "Task" if len(task_ids) == 1 else f"{len(task_ids)} tasks"
+            self.status_label.config(text=f"{subject} {status_text}")
             
             # Refresh the UI
             self.refresh_tasks()
             self.on_task_select(None)
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
+        
+        future = self.executor.submit_write(_toggle_tasks_flag, self.task_controller,
+                                            task_ids, 'completed')
+        self._run_async(future, toggled)
     
     def toggle_priority(self):
-        """Toggle the priority status of the selected task"""
-        if not self.active_task_id:
+        """Toggle the priority status of the selected tasks"""
+        task_ids = self._selected_task_ids()
+        if not task_ids:
             messagebox.showerror("Error", "Please select a task first")
             return
-            
-        try:
-            task = self.task_controller.get_task(self.active_task_id)
-            new_status = not task['priority']
-            
-            self.task_controller.update_task(
-                self.active_task_id, 
-                priority=new_status
-            )
-            
+        
+        def toggled(new_status):
             status_text = "marked as priority" if new_status else "unmarked as priority"
-            self.status_label.config(text=f"Task {status_text}")
+            subject = "Task" if len(task_ids) == 1 else f"{len(task_ids)} tasks"
+            self.status_label.config(text=f"{subject} {status_text}")
             
             # Refresh the UI
             self.refresh_tasks()
             self.on_task_select(None)
-        except Exception as e:
-            messagebox.showerror("Error", str(e))
+        
+        future = self.executor.submit_write(_toggle_tasks_flag, self.task_controller,
+                                            task_ids, 'priority')
+        self._run_async(future, toggled)
+    
+    def open_reports(self):
+        """Open the reports window, or bring the open one to the front"""
+        if self.report_window is not None and self.report_window.winfo_exists():
+            self.report_window.lift()
+            return
+        from app.views.gui.report_window import ReportWindow
+        self.report_window = ReportWindow(self, self.report_controller, self.executor)
+    
+    def open_diagnostics(self):
+        """Open the database diagnostics window, or bring the open one to the front"""
+        if self.diagnostics_window is not None and self.diagnostics_window.winfo_exists():
+            self.diagnostics_window.lift()
+            return
+        from app.views.gui.diagnostics_window import DiagnosticsWindow
+        self.diagnostics_window = DiagnosticsWindow(self, self.task_controller.db)
     
     def export_data(self):
-        """Export task data to CSV"""
+        """Export all tables to CSV or JSON Lines files in the background"""
         filename = filedialog.asksaveasfilename(
             defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+            filetypes=[("CSV files", "*.csv"),
+                       ("JSON Lines", "*.jsonl"),
+                       ("Compressed CSV", "*.csv.gz"),
+                       ("All files", "*.*")]
         )
         if filename:
             try:
-                # Call export controller here
-                # For now we'll just show a message
-                self.status_label.config(text=f"Data exported to {filename}")
+                job = self.export_controller.export_in_background(filename)
+                self.status_label.config(text="Exporting...")
+                self.after(200, self._poll_export, job, filename)
             except Exception as e:
                 messagebox.showerror("Error", str(e))
+    
+    def _poll_export(self, job, filename):
+        """Report export progress until the background job finishes"""
+        if not job.done:
+            self.status_label.config(text=f"Exporting... {job.total_rows} rows")
+            self.after(200, self._poll_export, job, filename)
+        elif job.error:
+            self.status_label.config(text="Export failed")
+            messagebox.showerror("Error", str(job.error))
+        else:
+            self.status_label.config(text=f"Data exported to {filename} ({job.total_rows} rows)")
@@ -0,0 +1,241 @@
+import datetime
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+# Report name -> (ReportController method, label column, series).
+# A label column of None means the rows are grouped by period; each
+# series is (value column, legend, colour) and several series stack.
+REPORTS = {
+    "Time per period": ("time_per_period", None, (("seconds", "Tracked", "#3498db"),)),
+    "Time per task": ("time_per_task", "name", (("seconds", "Tracked", "#3498db"),)),
+    "Time per category": ("time_per_category", "category", (("seconds", "Tracked", "#16a085"),)),
+    "Completion velocity": ("completion_velocity", None, (("completed", "Completed", "#8e44ad"),)),
+    "Deadline adherence": ("deadline_adherence", None, (
+        ("on_time", "On time", "#27ae60"),
+        ("late", "Late", "#e67e22"),
+        ("overdue", "Overdue", "#c0392b"),
+        ("pending", "Pending", "#7f8c8d"),
+    )),
+}
+
+# Range name -> number of days back from today (None = everything)
+RANGES = {
+    "Last 7 days": 7,
+    "Last 30 days": 30,
+    "Last 12 months": 365,
+    "Last 5 years": 5 * 365,
+    "All time": None,
+}
+
+# Reports by task or category show the largest MAX_BARS entries
+MAX_BARS = 20
+
+
+def build_chart(report, rows):
+    """
+    Turn report rows into the data of a bar chart.
+
+    The rows are already aggregated by SQL; this only picks the label and
+    value columns (and the largest entries for per-task/category reports).
+
+    Args:
+        report: Name from REPORTS
+        rows: Rows returned by the report's ReportController method
+
+    Returns:
+        dict: labels, series [(legend, colour, values)] and whether values are seconds
+    """
+    _, label_column, series = REPORTS[report]
+    if label_column is not None:
+        rows = sorted(rows, key=lambda row: row['seconds'] or 0, reverse=True)[:MAX_BARS]
+        labels = [row[label_column] or "(none)" for row in rows]
+    else:
+        labels = [row['period'] for row in rows]
+
+    return {
+        "labels": labels,
+        "series": [(legend, colour, [row[column] or 0 for row in rows])
+                   for column, legend, colour in series],
+        "seconds": series[0][0] == "seconds",
+    }
+
+
+def _format_value(value, seconds):
+    """Axis/bar label: hours for time, plain numbers for counts"""
+    if not seconds:
+        return str(int(value))
+    hours = value / 3600
+    return f"{hours:.1f}h" if hours < 100 else f"{hours:.0f}h"
+
+
+class ReportWindow(tk.Toplevel):
+    """
+    Charts of tracked time, completion velocity and deadline adherence.
+
+    Reports run on the executor's reader threads. ReportController caches
+    the query results; the window additionally keeps the chart data per
+    (report, range, grouping) and drops it when the controller's cache
+    generation changes, i.e. when new time entries or task changes land.
+    Resizing redraws from the cached chart without touching the database.
+    """
+
+    # How often (ms) a pending report is checked for completion
+    POLL_INTERVAL = 20
+
+    # How often (ms) the open window checks whether its data went stale
+    REFRESH_INTERVAL = 2000
+
+    def __init__(self, master, report_controller, executor):
+        super().__init__(master)
+        self.report_controller = report_controller
+        self.executor = executor
+        self._charts = {}
+        self._generation = report_controller.cache_generation
+        self._chart = None
+        self._request_seq = 0
+
+        self.title("Reports")
+        self.geometry("900x550")
+        self.configure(bg="#2c3e50")
+
+        controls = ttk.Frame(self)
+        controls.pack(fill=tk.X, padx=10, pady=10)
+
+        self.report_var = tk.StringVar(value="Time per period")
+        self.range_var = tk.StringVar(value="Last 30 days")
+        self.period_var = tk.StringVar(value="day")
+        for label, var, values in (("Report:", self.report_var, list(REPORTS)),
+                                   ("Range:", self.range_var, list(RANGES)),
+                                   ("Group by:", self.period_var, ["day", "week", "month", "year"])):
+            ttk.Label(controls, text=label).pack(side=tk.LEFT, padx=5)
+            box = ttk.Combobox(controls, textvariable=var, values=values,
+                               width=max(len(v) for v in values) + 2, state="readonly")
+            box.pack(side=tk.LEFT, padx=5)
+            box.bind("<<ComboboxSelected>>", lambda e: self.refresh())
+
+        self.status_label = ttk.Label(controls, text="")
+        self.status_label.pack(side=tk.RIGHT, padx=5)
+
+        self.canvas = tk.Canvas(self, bg="#34495e", highlightthickness=0)
+        self.canvas.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+        self.canvas.bind("<Configure>", lambda e: self._draw())
+
+        self.refresh()
+        self.after(self.REFRESH_INTERVAL, self._check_stale)
+
+    def _selection(self):
+        """Return (report, start day, period) for the current controls"""
+        report = self.report_var.get()
+        days = RANGES[self.range_var.get()]
+        start = None
+        if days is not None:
+            start = (datetime.date.today() - datetime.timedelta(days=days - 1)).isoformat()
+        period = self.period_var.get() if REPORTS[report][1] is None else "all"
+        return report, start, period
+
+    def refresh(self):
+        """Show the selected report, from the chart cache when it is current"""
+        key = self._selection()
+        if key in self._charts:
+            self._show(self._charts[key])
+            return
+
+        report, start, period = key
+        method = getattr(self.report_controller, REPORTS[report][0])
+        self._request_seq += 1
+        seq = self._request_seq
+        generation = self.report_controller.cache_generation
+        self.status_label.config(text="Loading...")
+        future = self.executor.submit_read(method, start=start, period=period)
+
+        def poll():
+            if not self.winfo_exists():
+                return
+            if not future.done():
+                self.after(self.POLL_INTERVAL, poll)
+                return
+            try:
+                rows = future.result()
+            except Exception as e:
+                self.status_label.config(text="")
+                messagebox.showerror("Error", str(e), parent=self)
+                return
+            chart = build_chart(report, rows)
+            # Only cache charts built from data that is still current
+            if generation == self.report_controller.cache_generation:
+                self._charts[key] = chart
+            # Ignore results of a selection the user already moved away from
+            if seq == self._request_seq:
+                self._show(chart)
+
+        self.after(self.POLL_INTERVAL, poll)
+
+    def _check_stale(self):
+        """Drop cached charts and reload once the underlying data changed"""
+        if not self.winfo_exists():
+            return
+        generation = self.report_controller.cache_generation
+        if generation != self._generation:
+            self._generation = generation
+            self._charts.clear()
+            self.refresh()
+        self.after(self.REFRESH_INTERVAL, self._check_stale)
+
+    def _show(self, chart):
+        self._chart = chart
+        self.status_label.config(text=f"{len(chart['labels'])} bars")
+        self._draw()
+
+    def _draw(self):
+        """Draw the current chart as (stacked) bars scaled to the canvas"""
+        canvas = self.canvas
+        canvas.delete("all")
+        chart = self._chart
+        if chart is None:
+            return
+
+        width = canvas.winfo_width()
+        height = canvas.winfo_height()
+        if not chart['labels']:
+            canvas.create_text(width // 2, height // 2, text="No data for this range", fill="white")
+            return
+
+        left, right, top, bottom = 60, 20, 30, 60
+        plot_width = max(width - left - right, 1)
+        plot_height = max(height - top - bottom, 1)
+        count = len(chart['labels'])
+        totals = [sum(values) for values in zip(*(values for _, _, values in chart['series']))]
+        scale = plot_height / (max(totals) or 1)
+
+        # Gridlines with axis values
+        for step in range(5):
+            value = max(totals) * step / 4
+            y = top + plot_height - value * scale
+            canvas.create_line(left, y, left + plot_width, y, fill="#4a6278")
+            canvas.create_text(left - 5, y, text=_format_value(value, chart['seconds']),
+                               anchor="e", fill="white", font=("Helvetica", 9))
+
+        # Bars; with many periods they shrink to thin lines, and only
+        # every n-th label is drawn so they don't overlap
+        slot = plot_width / count
+        bar = max(slot * 0.8, 1)
+        label_every = max(1, int(70 / slot))
+        for index, label in enumerate(chart['labels']):
+            x = left + index * slot + (slot - bar) / 2
+            y = top + plot_height
+            for _, colour, values in chart['series']:
+                if values[index]:
+                    y_top = y - values[index] * scale
+                    canvas.create_rectangle(x, y_top, x + bar, y, fill=colour, width=0)
+                    y = y_top
+            if index % label_every == 0:
+                canvas.create_text(x + bar / 2, top + plot_height + 5, text=str(label)[:12],
+                                   anchor="ne", angle=30, fill="white", font=("Helvetica", 9))
+
+        # Legend for stacked charts
+        if len(chart['series']) > 1:
+            x = left
+            for legend, colour, _ in chart['series']:
+                canvas.create_rectangle(x, 8, x + 12, 20, fill=colour, width=0)
+                canvas.create_text(x + 16, 14, text=legend, anchor="w", fill="white")
+                x += 100
@@ -0,0 +1,96 @@
+class TickScheduler:
+    """
+    Drive any number of elapsed-time labels from a single after() callback.
+
+    Each tick renders every registered label and schedules the next tick
+    for the moment a running source crosses its next whole second. Labels
+    whose boundaries fall within `slack` seconds of each other share one
+    wakeup, so a window showing hundreds of sessions still wakes up at
+    most 1/slack times per second. With nothing running no tick is
+    scheduled at all until wake() is called.
+    """
+
+    def __init__(self, widget, slack=0.25):
+        """
+        Initialize the scheduler.
+
+        Args:
+            widget: Tk widget used for after()/after_cancel()
+            slack: Seconds a label may lag its boundary to share a wakeup
+        """
+        self.widget = widget
+        self.slack = slack
+        self._labels = {}           # key -> _TickLabel
+        self._after_id = None
+        self.wakeups = 0            # Ticks run so far
+        self.updates = 0            # Widget reconfigurations so far
+
+    def add(self, key, label, source, active, formatter):
+        """
+        Register a label to keep up to date.
+
+        Args:
+            key: Identifier used by remove()
+            label: Widget with a "text" option
+            source: Callable returning the elapsed seconds to show
+            active: Callable returning True while the source is counting
+            formatter: Callable turning seconds into the label text
+        """
+        self._labels[key] = _TickLabel(label, source, active, formatter)
+        self.wake()
+
+    def remove(self, key):
+        """Stop updating a label"""
+        self._labels.pop(key, None)
+
+    def wake(self):
+        """Render now and resume ticking; call after a timer starts, pauses or stops"""
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+        self._tick()
+
+    def _tick(self):
+        """Render all labels and schedule the next tick, if anything is running"""
+        self._after_id = None
+        self.wakeups += 1
+
+        boundaries = []
+        for entry in self._labels.values():
+            seconds = entry.source()
+            text = entry.formatter(seconds)
+
+            # Only touch the widget when what it shows changes
+            if text != entry.text:
+                entry.label.config(text=text)
+                entry.text = text
+                self.updates += 1
+
+            if entry.active():
+                boundaries.append(1 - seconds % 1)
+
+        if not boundaries:
+            return  # Idle until wake()
+
+        # Wait for the last boundary within slack of the earliest one
+        first = min(boundaries)
+        delay = max(b for b in boundaries if b <= first + self.slack)
+        self._after_id = self.widget.after(int(delay * 1000) + 1, self._tick)
+
+    @property
+    def idle(self):
+        """True when no tick is scheduled"""
+        return self._after_id is None
+
+
+class _TickLabel:
+    """A label driven by the scheduler and the text it currently shows"""
+
+    __slots__ = ("label", "source", "active", "formatter", "text")
+
+    def __init__(self, label, source, active, formatter):
+        self.label = label
+        self.source = source
+        self.active = active
+        self.formatter = formatter
+        self.text = None
@@ -0,0 +1,78 @@
+"""
+Measure what timer checkpoints cost in latency and disk writes.
+
+Usage:
+    python -m benchmarks.bench_checkpoint [--checkpoints 500] [--interval 30]
+
+A running session is checkpointed repeatedly on a fresh database file for
+every connection profile. The report shows the latency of one checkpoint
+and the bytes it adds to the database/WAL files, extrapolated to one hour
+of tracking at the given checkpoint interval.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from app.controllers.task_controller import TaskController
+from app.controllers.timer_controller import TimerController
+from app.models.database import Database, CONNECTION_PROFILES
+
+
+def disk_usage(db_path):
+    """Total size of the database file and its journal/WAL companions"""
+    total = 0
+    for suffix in ("", "-wal", "-journal"):
+        path = db_path + suffix
+        if os.path.exists(path):
+            total += os.path.getsize(path)
+    return total
+
+
+def bench_profile(profile, checkpoints):
+    """Return (median latency ms, bytes written per checkpoint) for a profile"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        db = Database(db_path, profile=profile)
+        task_id = TaskController(db).create_task("Benchmark task")
+        timer = TimerController(db)
+        timer.start(task_id)
+
+        # WAL files grow until checkpointed by SQLite, so measure growth
+        # after one warm-up write has allocated the first frames
+        timer.checkpoint(force=True)
+        size_before = disk_usage(db_path)
+
+        latencies = []
+        for _ in range(checkpoints):
+            started = time.perf_counter()
+            timer.checkpoint(force=True)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        growth = max(disk_usage(db_path) - size_before, 0)
+        timer.stop()
+        db.close()
+
+    # A rollback journal rewrites pages in place: count the page touched per write
+    page_writes = growth / checkpoints if growth else 4096
+    return statistics.median(latencies), page_writes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--checkpoints", type=int, default=500, help="Checkpoints per profile")
+    parser.add_argument("--interval", type=int, default=30, help="Checkpoint interval in seconds")
+    args = parser.parse_args(argv)
+
+    per_hour = 3600 / args.interval
+    print(f"{args.interval}s interval = {per_hour:.0f} checkpoints per hour of tracking")
+    print(f"{'profile':<12} {'latency p50':>12} {'bytes/ckpt':>11} {'KiB/hour':>9} {'busy %':>7}")
+    for profile in CONNECTION_PROFILES:
+        latency, written = bench_profile(profile, args.checkpoints)
+        busy = latency / 1000 * per_hour / 3600 * 100
+        print(f"{profile:<12} {latency:>10.3f}ms {written:>11.0f} {written * per_hour / 1024:>9.1f} {busy:>6.4f}%")
+
+
+if __name__ == "__main__":
+    main()
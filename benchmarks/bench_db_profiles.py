@@ -0,0 +1,112 @@
+"""
+Compare write latency and reader/writer concurrency per connection profile.
+
+Usage:
+    python -m benchmarks.bench_db_profiles [--writes 200] [--read-hold 0.2]
+
+For every profile in CONNECTION_PROFILES this runs timer start/stop cycles
+(one commit each) on a fresh database file, first alone and then while a
+second connection keeps long read transactions open, like a report or an
+export would.
+"""
+import argparse
+import os
+import statistics
+import sqlite3
+import tempfile
+import threading
+import time
+
+from app.controllers.task_controller import TaskController
+from app.controllers.timer_controller import TimerController
+from app.models.database import Database, CONNECTION_PROFILES
+
+
+def percentile(values, pct):
+    """Return the pct-th percentile of a list of numbers"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_writes(timer, task_id, count):
+    """Run start/stop cycles and return (latencies_ms, failures)"""
+    latencies = []
+    failures = 0
+    for _ in range(count):
+        started = time.perf_counter()
+        try:
+            timer.start(task_id)
+            timer.stop()
+        except sqlite3.OperationalError:
+            failures += 1
+            # Drop the half-started session so the next cycle can begin
+            timer._reset()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies, failures
+
+
+def hold_reads(db_path, profile, hold, stop_event):
+    """Keep read transactions open for `hold` seconds until stopped"""
+    reader = Database(db_path, profile=profile)
+    try:
+        while not stop_event.is_set():
+            reader.conn.execute("BEGIN")
+            reader.conn.execute("SELECT COUNT(*) FROM time_entries").fetchone()
+            time.sleep(hold)
+            reader.conn.execute("COMMIT")
+    finally:
+        reader.close()
+
+
+def bench_profile(profile, writes, read_hold):
+    """Benchmark one profile and return a result dict"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        db = Database(db_path, profile=profile)
+        task_id = TaskController(db).create_task("Benchmark task")
+        timer = TimerController(db)
+
+        solo, _ = run_writes(timer, task_id, writes)
+
+        stop_event = threading.Event()
+        reader = threading.Thread(target=hold_reads, args=(db_path, profile, read_hold, stop_event))
+        reader.start()
+        time.sleep(0.05)  # Let the reader open its first transaction
+        try:
+            contended, failures = run_writes(timer, task_id, writes)
+        finally:
+            stop_event.set()
+            reader.join()
+
+        journal_mode = db.get_pragma("journal_mode")
+        db.close()
+
+    return {
+        "profile": profile,
+        "journal_mode": journal_mode,
+        "solo_p50": statistics.median(solo),
+        "solo_p99": percentile(solo, 99),
+        "contended_p50": statistics.median(contended),
+        "contended_max": max(contended),
+        "failures": failures,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--writes", type=int, default=200, help="Start/stop cycles per phase")
+    parser.add_argument("--read-hold", type=float, default=0.2,
+                        help="Seconds each reader transaction stays open")
+    args = parser.parse_args(argv)
+
+    print(f"{'profile':<12} {'journal':<8} {'solo p50':>9} {'solo p99':>9} "
+          f"{'read p50':>9} {'read max':>9} {'failed':>7}")
+    for profile in CONNECTION_PROFILES:
+        r = bench_profile(profile, args.writes, args.read_hold)
+        print(f"{r['profile']:<12} {r['journal_mode']:<8} {r['solo_p50']:>7.2f}ms {r['solo_p99']:>7.2f}ms "
+              f"{r['contended_p50']:>7.2f}ms {r['contended_max']:>7.2f}ms {r['failures']:>7}")
+
+
+if __name__ == "__main__":
+    main()
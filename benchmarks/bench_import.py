@@ -0,0 +1,82 @@
+"""
+Measure bulk import throughput in rows per second.
+
+Usage:
+    python -m benchmarks.bench_import [--tasks 10000] [--entries 200000] [--chunk-size 1000]
+
+Generates a task file and a time entry file (several years of sessions
+spread over the tasks, referenced by name like an export from another
+tool would), imports both into a fresh database file and reports the
+rate of each phase. A second import of the same files measures the
+duplicate-detection path.
+"""
+import argparse
+import csv
+import datetime
+import os
+import random
+import tempfile
+import time
+
+from app.controllers.import_controller import ImportController
+from app.models.database import Database
+
+
+def write_tasks(path, count):
+    """Write `count` tasks to a CSV file"""
+    with open(path, "w", encoding="utf-8", newline="") as out:
+        writer = csv.writer(out)
+        writer.writerow(["name", "category", "deadline", "priority", "completed"])
+        for i in range(count):
+            writer.writerow([f"Task {i}", f"Category {i % 20}", "", i % 7 == 0, i % 3 == 0])
+
+
+def write_entries(path, count, tasks, years=5):
+    """Write `count` finished sessions over the last `years` years to a CSV file"""
+    rng = random.Random(42)
+    start = datetime.datetime(2020, 1, 1, 8, 0)
+    span = years * 365 * 24 * 3600
+    with open(path, "w", encoding="utf-8", newline="") as out:
+        writer = csv.writer(out)
+        writer.writerow(["task", "start_time", "duration"])
+        for _ in range(count):
+            begin = start + datetime.timedelta(seconds=rng.randrange(span))
+            writer.writerow([f"Task {rng.randrange(tasks)}", begin.isoformat(" "), rng.randrange(60, 7200)])
+
+
+def timed(func, *args):
+    """Return (result, seconds) for one call"""
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=10000, help="Tasks to import")
+    parser.add_argument("--entries", type=int, default=200000, help="Time entries to import")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Rows per transaction")
+    parser.add_argument("--profile", default="wal", help="Connection profile")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tasks_path = os.path.join(tmp, "tasks.csv")
+        entries_path = os.path.join(tmp, "entries.csv")
+        write_tasks(tasks_path, args.tasks)
+        write_entries(entries_path, args.entries, args.tasks)
+
+        db = Database(os.path.join(tmp, "bench.db"), profile=args.profile)
+        importer = ImportController(db, chunk_size=args.chunk_size)
+
+        print(f"{'phase':<20} {'rows':>9} {'inserted':>9} {'seconds':>8} {'rows/s':>9}")
+        for label, func, path in (("tasks", importer.import_tasks, tasks_path),
+                                  ("time entries", importer.import_time_entries, entries_path),
+                                  ("tasks again", importer.import_tasks, tasks_path),
+                                  ("time entries again", importer.import_time_entries, entries_path)):
+            report, seconds = timed(func, path)
+            print(f"{label:<20} {report.rows:>9} {report.inserted:>9} {seconds:>8.2f} {report.rows / seconds:>9.0f}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Load test: many users starting and stopping timers in one database file.
+
+Usage:
+    python -m benchmarks.bench_multiuser [--users 8] [--cycles 100] [--think 0.002] [--retries 6]
+                                         [--busy-timeout MS]
+
+Every simulated user is its own process with its own Database, tasks and
+TimerRegistry (as separate GUI or command line instances would be). All
+users start together and run start/stop cycles; the report shows the
+p50/p99 latency of start and stop per connection profile, the throughput,
+and the lock contention counted by Database.contention_stats: statements
+that found the database locked, retries, failures after the last retry,
+and transactions that had to wait for the write lock. A short
+--busy-timeout makes SQLite give up early, which shows what the retries
+with backoff absorb.
+"""
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from app.controllers.task_controller import TaskController
+from app.controllers.timer_controller import TimerRegistry
+from app.models.database import BUSY_RETRIES, CONNECTION_PROFILES, Database
+from benchmarks.bench_db_profiles import percentile
+
+
+def run_user(db_path, profile, retries, user, cycles, think, barrier, results):
+    """Worker process: one user's start/stop cycles"""
+    latencies = {"start": [], "stop": []}
+    failures = 0
+    stats = {}
+    started_at = time.perf_counter()
+
+    # Every user sends a result, even one that failed, or the report would wait forever
+    barrier.wait()
+    try:
+        db = Database(db_path, profile=profile, busy_retries=retries)
+        try:
+            task_id = TaskController(db, owner=user).create_task(f"{user}'s task")
+            registry = TimerRegistry(db, owner=user)
+            for _ in range(cycles):
+                for action in ("start", "stop"):
+                    started = time.perf_counter()
+                    try:
+                        getattr(registry, action)(task_id)
+                    except sqlite3.OperationalError:
+                        failures += 1
+                        # Forget the half-finished session so the next cycle can begin
+                        registry._timers.clear()
+                        break
+                    latencies[action].append((time.perf_counter() - started) * 1000)
+                    if think:
+                        time.sleep(think)
+        finally:
+            stats = db.contention_stats()
+            db.close()
+    except sqlite3.OperationalError:
+        failures += 1
+    finally:
+        results.put((latencies, failures, time.perf_counter() - started_at, stats))
+
+
+def bench_profile(name, users, cycles, think, retries, busy_timeout=None):
+    """Run every user against a fresh database file; return a result dict"""
+    profile = dict(CONNECTION_PROFILES[name])
+    if busy_timeout is not None:
+        profile["busy_timeout"] = busy_timeout
+
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        # Create the schema up front, so the users don't race to migrate
+        Database(db_path, profile=profile).close()
+
+        barrier = ctx.Barrier(users)
+        results = ctx.Queue()
+        workers = [ctx.Process(target=run_user,
+                               args=(db_path, profile, retries, f"user{i}", cycles, think, barrier, results))
+                   for i in range(users)]
+        for worker in workers:
+            worker.start()
+        outcomes = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+
+    latencies = {"start": [], "stop": []}
+    contention = {}
+    for user_latencies, failures, _, stats in outcomes:
+        for action, values in user_latencies.items():
+            latencies[action].extend(values)
+        stats["user failures"] = failures
+        for counter, value in stats.items():
+            contention[counter] = contention.get(counter, 0) + value
+
+    operations = sum(len(values) for values in latencies.values())
+    elapsed = max(elapsed for _, _, elapsed, _ in outcomes)
+    result = {"profile": name, "ops_per_s": operations / elapsed if elapsed else 0.0}
+    for action, values in latencies.items():
+        result[f"{action}_p50"] = statistics.median(values) if values else float("nan")
+        result[f"{action}_p99"] = percentile(values, 99) if values else float("nan")
+    result.update(contention)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=8, help="Concurrent user processes")
+    parser.add_argument("--cycles", type=int, default=100, help="Start/stop cycles per user")
+    parser.add_argument("--think", type=float, default=0.002, help="Seconds between a user's actions")
+    parser.add_argument("--retries", type=int, default=BUSY_RETRIES, help="Database busy_retries")
+    parser.add_argument("--busy-timeout", type=int, help="Override the profiles' busy_timeout (ms)")
+    parser.add_argument("--profile", action="append", choices=sorted(CONNECTION_PROFILES),
+                        help="Connection profile to test (repeatable; default: default and wal)")
+    args = parser.parse_args(argv)
+
+    print(f"{args.users} users x {args.cycles} start/stop cycles, {args.retries} retries")
+    print(f"{'profile':<12} {'ops/s':>7} {'start p50':>10} {'start p99':>10} {'stop p50':>9} "
+          f"{'stop p99':>9} {'busy':>5} {'retries':>8} {'failed':>7} {'waits':>6} {'wait ms':>8}")
+    for profile in args.profile or ["default", "wal"]:
+        r = bench_profile(profile, args.users, args.cycles, args.think, args.retries, args.busy_timeout)
+        print(f"{r['profile']:<12} {r['ops_per_s']:>7.0f} {r['start_p50']:>8.2f}ms {r['start_p99']:>8.2f}ms "
+              f"{r['stop_p50']:>7.2f}ms {r['stop_p99']:>7.2f}ms {r['busy']:>5} {r['retries']:>8} "
+              f"{r['user failures']:>7} {r['waits']:>6} {r['wait_ns'] / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
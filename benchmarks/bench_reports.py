@@ -0,0 +1,63 @@
+"""
+Measure how long the report window's queries take over years of data.
+
+Usage:
+    python -m benchmarks.bench_reports [--tasks 2000] [--entries 200000] [--years 5]
+
+Fills a fresh database file with tasks (some with deadlines and
+completion times) and time entries spread over the given number of years
+(see benchmarks/datagen.py), builds the daily rollups, then times every report of the report window
+for each range and grouping: once cold and once from the cache. The goal
+is well under a second for a cold report over the full range.
+"""
+import argparse
+import datetime
+import os
+import tempfile
+import time
+
+from app.controllers.report_controller import ReportController
+from app.models.database import Database
+from app.views.gui.report_window import REPORTS
+from benchmarks.datagen import generate
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=2000, help="Tasks to create")
+    parser.add_argument("--entries", type=int, default=200000, help="Time entries to create")
+    parser.add_argument("--years", type=int, default=5, help="Years of history")
+    parser.add_argument("--profile", default="wal", help="Connection profile")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "bench.db"), profile=args.profile)
+        generate(db, args.tasks, args.entries, args.years, notes=0, history=0, rollups=False)
+        reports = ReportController(db)
+
+        started = time.perf_counter()
+        reports.rebuild_rollups()
+        print(f"rollup rebuild: {time.perf_counter() - started:.2f}s\n")
+
+        first_day = (datetime.date.today() - datetime.timedelta(days=args.years * 365)).isoformat()
+        print(f"{'report':<22} {'range':<10} {'group':<6} {'rows':>6} {'cold ms':>9} {'cached ms':>10}")
+        for name, (method_name, label_column, _) in REPORTS.items():
+            method = getattr(reports, method_name)
+            periods = ("all",) if label_column is not None else ("day", "week", "month", "year")
+            for range_name, start in (("30 days", (datetime.date.today() - datetime.timedelta(days=29)).isoformat()),
+                                      (f"{args.years} years", first_day)):
+                for period in periods:
+                    reports.invalidate()
+                    started = time.perf_counter()
+                    rows = method(start=start, period=period)
+                    cold = time.perf_counter() - started
+                    started = time.perf_counter()
+                    method(start=start, period=period)
+                    cached = time.perf_counter() - started
+                    print(f"{name:<22} {range_name:<10} {period:<6} {len(rows):>6} "
+                          f"{cold * 1000:>9.1f} {cached * 1000:>10.3f}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
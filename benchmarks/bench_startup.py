@@ -0,0 +1,98 @@
+"""
+Measure the cold start cost of scripted and GUI invocations.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 10]
+
+Each scenario runs in fresh interpreters under `python -X importtime`.
+The report shows the median wall time of a whole call, the total import
+time and the heaviest top-level imports. "cli list" is what a cron job
+or shell hook pays; "gui imports" is the window's import path, and
+"eager (old main.py)" is everything main.py used to import before the
+command line entry point existed. Scenarios whose modules are not
+installed (tkcalendar, a display-less tkinter) are reported as n/a.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Scenario name -> interpreter arguments; {db} is a scratch database path
+SCENARIOS = {
+    "cli list": ["-m", "app.cli", "list", "--db", "{db}"],
+    "cli status": ["-m", "app.cli", "status", "--db", "{db}"],
+    "main.py list": ["main.py", "list", "--db", "{db}"],
+    "gui imports": ["-c", "import app.views.gui.main_window, app.controllers.export_controller, "
+                          "app.controllers.import_controller, app.models.executor"],
+    "eager (old main.py)": ["-c", "import tkcalendar, app.views.gui.main_window, "
+                                  "app.controllers.export_controller, app.controllers.import_controller, "
+                                  "app.controllers.history_controller, app.controllers.report_controller, "
+                                  "app.models.executor"],
+}
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def run_once(args):
+    """Run one interpreter; return (seconds, stderr) or None if it failed"""
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        return None
+    return elapsed, result.stderr
+
+
+def parse_importtime(stderr):
+    """Return (total import µs, [(cumulative µs, module)] of top-level imports)"""
+    total = 0
+    top_level = []
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        total += int(self_us)
+        if len(indent) == 1:
+            top_level.append((int(cumulative_us), module))
+    return total, sorted(top_level, reverse=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="Interpreter runs per scenario")
+    parser.add_argument("--top", type=int, default=5, help="Heaviest imports listed per scenario")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        # Create the schema once so the runs measure startup, not migrations
+        subprocess.run([sys.executable, "-m", "app.cli", "add", "Benchmark task", "--db", db_path],
+                       cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+
+        print(f"{'scenario':<22} {'wall ms':>8} {'imports ms':>11}  heaviest imports")
+        for name, scenario in SCENARIOS.items():
+            scenario = [arg.format(db=db_path) for arg in scenario]
+            runs = [run_once(scenario) for _ in range(args.runs)]
+            if any(run is None for run in runs):
+                print(f"{name:<22} {'n/a':>8} {'n/a':>11}  (failed to run here)")
+                continue
+            wall = statistics.median(seconds for seconds, _ in runs)
+            totals = []
+            heaviest = []
+            for _, stderr in runs:
+                total, heaviest = parse_importtime(stderr)
+                totals.append(total)
+            listed = ", ".join(f"{module} {us / 1000:.1f}" for us, module in heaviest[:args.top])
+            print(f"{name:<22} {wall * 1000:>8.1f} {statistics.median(totals) / 1000:>11.1f}  {listed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Seeded synthetic data for benchmarks: tasks, years of time entries,
+task history and notes.
+
+Usage:
+    python -m benchmarks.datagen PATH [--scale small] [--seed 42] [--users 1]
+                                      [--tasks N] [--entries N] [--years N] [--notes N] [--history N]
+
+The same seed, scale and `today` always produce the same rows, so
+timings taken on different days or machines compare like with like.
+Rows are written with bulk statements the way ImportController writes
+them (one run segment per session, a "total_time" history row per
+session, task totals and daily rollups to match), so the controllers
+see a database indistinguishable from one built up by hand.
+"""
+import argparse
+import datetime
+import random
+import time
+
+from app.controllers.report_controller import ReportController
+from app.models.database import DEFAULT_OWNER, Database
+
+# Named data sizes; explicit options override single values
+SCALES = {
+    "tiny": {"tasks": 50, "entries": 1000, "years": 1, "notes": 1, "history": 1},
+    "small": {"tasks": 500, "entries": 20000, "years": 2, "notes": 2, "history": 2},
+    "medium": {"tasks": 2000, "entries": 200000, "years": 5, "notes": 3, "history": 3},
+    "large": {"tasks": 20000, "entries": 2000000, "years": 10, "notes": 5, "history": 5},
+}
+
+CATEGORIES = 20
+
+WORDS = ("plan review draft meeting budget client report release fix design test deploy invoice "
+         "research call email backlog sprint docs refactor outline summary schedule feedback").split()
+
+
+def _text(rng, words):
+    """A few random words, for names, descriptions and notes"""
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _stamp(moment):
+    """Format a datetime the way sqlite3 stores them"""
+    return moment.isoformat(" ", "seconds")
+
+
+def generate(db, tasks, entries, years, notes=2, history=2, users=1, seed=42, today=None, rollups=True):
+    """
+    Fill a database with synthetic data.
+
+    Args:
+        db: Database instance (normally a fresh file)
+        tasks: Number of tasks
+        entries: Number of finished time entries, spread over the tasks
+        years: Years of history the entries cover, ending at `today`
+        notes: Notes per task
+        history: Field changes (priority, category, description) per task
+        users: Owners the tasks are spread over ("user0", ...; 1 = default owner)
+        seed: Random seed
+        today: Last day of the data (default: today)
+        rollups: Also rebuild daily_rollups
+
+    Returns:
+        dict: Row counts per table, plus "task_ids" (in creation order)
+    """
+    rng = random.Random(seed)
+    today = today or datetime.date.today()
+    first_day = datetime.datetime.combine(today - datetime.timedelta(days=years * 365), datetime.time())
+    span = years * 365 * 24 * 3600
+    owners = [DEFAULT_OWNER] if users <= 1 else [f"user{i}" for i in range(users)]
+
+    def moment(seconds=None):
+        return first_day + datetime.timedelta(seconds=rng.randrange(span) if seconds is None else seconds)
+
+    # Tasks; a third end up completed, half have a deadline
+    task_rows = []
+    for i in range(tasks):
+        created = first_day - datetime.timedelta(minutes=rng.randrange(30 * 24 * 60))
+        deadline = (first_day + datetime.timedelta(days=rng.randrange(years * 365 + 60))).date()
+        completed_at = _stamp(moment()) if i % 3 == 0 else None
+        task_rows.append((f"{_text(rng, 3).capitalize()} {i}", _text(rng, 8), f"Category {i % CATEGORIES}",
+                          _stamp(created), deadline.isoformat() if i % 2 else None,
+                          completed_at is not None, completed_at, rng.random() < 0.2, owners[i % len(owners)]))
+    with db.transaction():
+        db.executemany(
+            "INSERT INTO tasks (name, description, category, created_at, deadline, completed, completed_at, "
+            "priority, owner) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            task_rows
+        )
+        # AUTOINCREMENT ids of one write transaction are consecutive
+        last_id = db.execute("SELECT last_insert_rowid()", fetchone=True)[0]
+        task_ids = list(range(last_id - tasks + 1, last_id + 1))
+        db.execute(
+            "INSERT INTO task_history (task_id, change_date, user, field_name, old_value, new_value) "
+            "SELECT id, created_at, owner, 'creation', NULL, 'Task created: ' || name FROM tasks "
+            "WHERE id BETWEEN ? AND ?",
+            (task_ids[0], task_ids[-1])
+        )
+
+    # Finished sessions in start order, as the timer would have written them
+    sessions = []
+    for _ in range(entries):
+        index = rng.randrange(tasks)
+        begin = moment()
+        duration = rng.randrange(60, 7200)
+        sessions.append((begin, duration, index))
+    sessions.sort()
+    with db.transaction():
+        db.executemany(
+            "INSERT INTO time_entries (task_id, owner, start_time, end_time, duration, duration_ns) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            ((task_ids[index], task_rows[index][-1], _stamp(begin),
+              _stamp(begin + datetime.timedelta(seconds=duration)), duration, duration * 1_000_000_000)
+             for begin, duration, index in sessions)
+        )
+        last_entry = db.execute("SELECT last_insert_rowid()", fetchone=True)[0]
+        first_entry = last_entry - entries + 1
+        db.execute(
+            "INSERT INTO time_segments (entry_id, started_at, ended_at, duration_ns) "
+            "SELECT id, start_time, end_time, duration_ns FROM time_entries WHERE id BETWEEN ? AND ?",
+            (first_entry, last_entry)
+        )
+        db.execute(
+            "INSERT INTO task_history (task_id, change_date, user, field_name, delta) "
+            "SELECT task_id, end_time, owner, 'total_time', duration FROM time_entries WHERE id BETWEEN ? AND ?",
+            (first_entry, last_entry)
+        )
+        db.execute(
+            "UPDATE tasks SET total_time = (SELECT IFNULL(SUM(duration), 0) FROM time_entries "
+            "WHERE task_id = tasks.id) WHERE id BETWEEN ? AND ?",
+            (task_ids[0], task_ids[-1])
+        )
+
+    # Field changes and notes at random times
+    changes = []
+    note_rows = []
+    for index, task_id in enumerate(task_ids):
+        owner = task_rows[index][-1]
+        for _ in range(history):
+            field = rng.choice(("priority", "category", "description"))
+            if field == "priority":
+                old, new = ("0", "1") if rng.random() < 0.5 else ("1", "0")
+            elif field == "category":
+                old, new = f"Category {rng.randrange(CATEGORIES)}", task_rows[index][2]
+            else:
+                old, new = _text(rng, 8), task_rows[index][1]
+            changes.append((task_id, _stamp(moment()), owner, field, old, new))
+        for _ in range(notes):
+            note_rows.append((task_id, _text(rng, rng.randrange(5, 40)), _stamp(moment())))
+    with db.transaction():
+        db.executemany(
+            "INSERT INTO task_history (task_id, change_date, user, field_name, old_value, new_value) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            changes
+        )
+        db.executemany("INSERT INTO notes (task_id, content, created_at) VALUES (?, ?, ?)", note_rows)
+
+    if rollups:
+        ReportController(db, cache_size=0).rebuild_rollups()
+    db.notify_change("tasks")
+
+    return {
+        "tasks": tasks,
+        "time_entries": entries,
+        "task_history": tasks + entries + len(changes),
+        "notes": len(note_rows),
+        "task_ids": task_ids,
+    }
+
+
+def scale_options(scale, **overrides):
+    """
+    The generate() arguments of a named scale with some values replaced.
+
+    Raises:
+        ValueError: If the scale is unknown
+    """
+    if scale not in SCALES:
+        raise ValueError(f"Unknown scale: {scale}")
+    options = dict(SCALES[scale])
+    options.update((name, value) for name, value in overrides.items() if value is not None)
+    return options
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", help="Database file to fill (created if missing)")
+    parser.add_argument("--scale", default="small", choices=list(SCALES))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--users", type=int, default=1, help="Owners the tasks are spread over")
+    for name in ("tasks", "entries", "years", "notes", "history"):
+        parser.add_argument(f"--{name}", type=int, help=f"Override the scale's {name}")
+    args = parser.parse_args(argv)
+
+    options = scale_options(args.scale, tasks=args.tasks, entries=args.entries, years=args.years,
+                            notes=args.notes, history=args.history)
+    db = Database(args.path, profile="wal")
+    try:
+        started = time.perf_counter()
+        counts = generate(db, users=args.users, seed=args.seed, **options)
+        elapsed = time.perf_counter() - started
+    finally:
+        db.close()
+    counts.pop("task_ids")
+    print(", ".join(f"{count} {table}" for table, count in counts.items()) + f" in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
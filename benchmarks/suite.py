@@ -0,0 +1,237 @@
+"""
+Benchmark suite for the controllers, checked against a stored baseline.
+
+Usage:
+    python -m benchmarks.suite [--scale small] [--rounds 50] [--case PATTERN ...]
+                               [--threshold 0.25] [--baseline PATH] [--save]
+
+A database file is filled by benchmarks.datagen (same seed every run),
+then every case is timed for --rounds rounds after a few warm-up rounds,
+each round on its own task where the operation changes data. The report
+shows min/median/mean/stddev per case and the change of the median
+against the baseline of the same scale; a case is a regression when its
+median is more than --threshold slower (and slower by more than
+MIN_DELTA_MS, so sub-millisecond noise doesn't count). The exit status is
+1 if any case regressed.
+
+--save stores the results as the new baseline of the scale. Baselines
+depend on the machine: save one before a change, then compare after it.
+"""
+import argparse
+import datetime
+import fnmatch
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+from app.controllers.task_controller import SORT_ORDERS, TaskController
+from app.controllers.timer_controller import TimerController
+from app.models.database import Database
+from benchmarks.datagen import SCALES, generate, scale_options
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# Rounds run before timing starts (connection caches, page cache)
+WARMUP_ROUNDS = 3
+
+# Slowdowns smaller than this are never reported as regressions
+MIN_DELTA_MS = 0.05
+
+
+def build_cases(db, task_ids, rounds, seed=42):
+    """
+    Create the benchmark cases over a generated database.
+
+    Args:
+        db: Database filled by datagen.generate
+        task_ids: IDs of the generated tasks
+        rounds: Rounds per case, including warm-up rounds
+        seed: Seed for picking the tasks each case works on
+
+    Returns:
+        list: (name, setup, run) per case; setup(i) (or None) prepares round
+              i untimed, run(i) is the timed operation
+
+    Raises:
+        ValueError: If there are too few tasks for the number of rounds
+    """
+    if len(task_ids) < 3 * rounds:
+        raise ValueError(f"{len(task_ids)} tasks are too few for {rounds} rounds")
+    tasks = TaskController(db)
+    timer = TimerController(db)
+
+    # Cases that change tasks get their own, so none sees another's changes
+    pool = list(task_ids)
+    random.Random(seed).shuffle(pool)
+    deleted, stopped, updated = pool[:rounds], pool[rounds:2 * rounds], pool[2 * rounds:3 * rounds]
+    looked_up = pool[3 * rounds:] or pool
+
+    cases = [
+        ("create_task", None, lambda i: tasks.create_task(f"Benchmark task {i}", category="Benchmark")),
+        ("update_task", None, lambda i: tasks.update_task(updated[i], description=f"Updated {i}")),
+    ]
+    for sort_by in SORT_ORDERS:
+        cases.append((f"get_all_tasks[{sort_by}]", None,
+                      lambda i, sort_by=sort_by: tasks.get_all_tasks(sort_by=sort_by)))
+    cases += [
+        ("get_all_tasks[open]", None, lambda i: tasks.get_all_tasks(include_completed=False)),
+        ("get_filtered_tasks[completed]", None,
+         lambda i: tasks.get_filtered_tasks(completed=True, sort_by='deadline')),
+        ("get_filtered_tasks[priority]", None, lambda i: tasks.get_filtered_tasks(priority=True)),
+        ("get_filtered_tasks[category]", None, lambda i: tasks.get_filtered_tasks(category="Category 3")),
+        ("get_task_history", None, lambda i: tasks.get_task_history(looked_up[i % len(looked_up)])),
+        ("timer_stop", lambda i: timer.start(stopped[i]), lambda i: timer.stop()),
+        ("delete_task", None, lambda i: tasks.delete_task(deleted[i])),
+    ]
+    return cases
+
+
+def measure(setup, run, rounds, warmup=WARMUP_ROUNDS):
+    """
+    Time one case.
+
+    Returns:
+        dict: min_ms, median_ms, mean_ms, stddev_ms, max_ms and rounds
+    """
+    timings = []
+    for i in range(warmup + rounds):
+        if setup is not None:
+            setup(i)
+        started = time.perf_counter_ns()
+        run(i)
+        elapsed = time.perf_counter_ns() - started
+        if i >= warmup:
+            timings.append(elapsed / 1e6)
+    return {
+        "min_ms": min(timings),
+        "median_ms": statistics.median(timings),
+        "mean_ms": statistics.fmean(timings),
+        "stddev_ms": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "max_ms": max(timings),
+        "rounds": rounds,
+    }
+
+
+def run_suite(scale="small", rounds=50, patterns=None, seed=42):
+    """
+    Generate the data of a scale and time the selected cases.
+
+    Args:
+        scale: Name from datagen.SCALES
+        rounds: Timed rounds per case
+        patterns: fnmatch patterns selecting cases by name (default: all)
+        seed: Data and task selection seed
+
+    Returns:
+        dict: Case name -> measure() result, in suite order
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "suite.db"), profile="wal")
+        try:
+            data = generate(db, seed=seed, today=datetime.date(2025, 1, 1), **scale_options(scale))
+            results = {}
+            for name, setup, run in build_cases(db, data["task_ids"], WARMUP_ROUNDS + rounds, seed):
+                if patterns and not any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns):
+                    continue
+                results[name] = measure(setup, run, rounds)
+        finally:
+            db.close()
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare medians with a baseline.
+
+    Args:
+        results: run_suite() results
+        baseline: Case name -> stored result (may lack cases)
+        threshold: Allowed slowdown as a fraction (0.25 = 25 % slower)
+
+    Returns:
+        list: (name, median_ms, baseline median_ms or None, change or None,
+               regressed) per case
+    """
+    rows = []
+    for name, result in results.items():
+        stored = baseline.get(name)
+        if stored is None:
+            rows.append((name, result["median_ms"], None, None, False))
+            continue
+        median, base = result["median_ms"], stored["median_ms"]
+        change = median / base - 1 if base else None
+        regressed = change is not None and change > threshold and median - base > MIN_DELTA_MS
+        rows.append((name, median, base, change, regressed))
+    return rows
+
+
+def load_baselines(path):
+    """Read the baseline file (scale -> entry); empty if it doesn't exist"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(path, scale, rounds, results):
+    """Store results as the baseline of a scale, keeping the other scales"""
+    baselines = load_baselines(path)
+    baselines[scale] = {
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "machine": f"{platform.system()} {platform.machine()}",
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "rounds": rounds,
+        "cases": {name: {stat: round(value, 4) for stat, value in result.items()}
+                  for name, result in results.items()},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", default="small", choices=list(SCALES))
+    parser.add_argument("--rounds", type=int, default=50, help="Timed rounds per case")
+    parser.add_argument("--case", action="append", help="Only cases matching this pattern (repeatable)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed median slowdown before a case fails (default: 0.25 = 25%%)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file")
+    parser.add_argument("--save", action="store_true", help="Store the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.scale, args.rounds, args.case, args.seed)
+    baseline = load_baselines(args.baseline).get(args.scale, {}).get("cases", {})
+
+    print(f"scale {args.scale}, {args.rounds} rounds, threshold {args.threshold:.0%}")
+    print(f"{'case':<32} {'min ms':>8} {'median':>8} {'mean':>8} {'stddev':>8} {'baseline':>9} {'change':>8}")
+    regressions = []
+    for name, median, base, change, regressed in compare(results, baseline, args.threshold):
+        r = results[name]
+        base_text = f"{base:.3f}" if base is not None else "-"
+        change_text = f"{change:+.0%}" if change is not None else "-"
+        print(f"{name:<32} {r['min_ms']:>8.3f} {median:>8.3f} {r['mean_ms']:>8.3f} {r['stddev_ms']:>8.3f} "
+              f"{base_text:>9} {change_text:>8}{'  REGRESSION' if regressed else ''}")
+        if regressed:
+            regressions.append(name)
+
+    if args.save:
+        save_baseline(args.baseline, args.scale, args.rounds, results)
+        print(f"\nBaseline saved to {args.baseline}")
+    elif regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,26 +1,93 @@
 # main.py - Entry point for the Time Management application
+#
+# Only the database layer is imported up front. The GUI (tkinter,
+# tkcalendar) and the controllers are imported when the window is
+# actually opened; command line use ("python main.py list", see
+# app/cli.py) never loads them.
+import argparse
+import sys
 
-# Import controllers and database
-from app.controllers.task_controller import TaskController
-from app.controllers.timer_controller import TimerController
-from app.models.database import Database
+from app.cli import COMMANDS
+from app.models.database import Database, CONNECTION_PROFILES, DEFAULT_OWNER
+from app.models.instrumentation import SLOW_QUERY_MS
 
-# Import the UI
-from app.views.gui.main_window import TimeApp
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="My Time Tamer",
+                                     epilog=f"Commands without the GUI: {', '.join(COMMANDS)} "
+                                            "(see python -m app.cli --help)")
+    parser.add_argument("--db", default="time_app.db", help="Path to the SQLite database file")
+    parser.add_argument("--db-profile",
+                        default="wal",
+                        choices=sorted(CONNECTION_PROFILES),
+                        help="SQLite connection profile (default: wal)")
+    parser.add_argument("--user",
+                        default=DEFAULT_OWNER,
+                        help=f"User whose tasks and timers are shown (default: {DEFAULT_OWNER})")
+    parser.add_argument("--instrument",
+                        action="store_true",
+                        help="Record query timings from startup (see Diagnostics)")
+    parser.add_argument("--slow-query-ms",
+                        type=float,
+                        default=SLOW_QUERY_MS,
+                        help=f"Slow-query log threshold when recording (default: {SLOW_QUERY_MS})")
+    parser.add_argument("--history-days",
+                        type=int,
+                        default=None,
+                        help="Archive task history older than this many days (default: keep everything)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Initialize and start the application, or run a command line command"""
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] in COMMANDS:
+        from app import cli
+        return cli.main(argv)
+
+    args = parse_args(argv)
+
+    # Import controllers and the UI
+    from app.controllers.export_controller import ExportController
+    from app.controllers.history_controller import HistoryController
+    from app.controllers.note_controller import NoteController
+    from app.controllers.report_controller import ReportController
+    from app.controllers.task_controller import TaskController
+    from app.controllers.timer_controller import TimerController
+    from app.models.executor import DbExecutor
+    from app.views.gui.main_window import TimeApp
 
-def main():
-    """Initialize and start the application"""
     # Setup database and controllers
-    db = Database()
-    task_controller = TaskController(db)
-    timer_controller = TimerController(db)
-    
+    db = Database(args.db, profile=args.db_profile, instrument=args.instrument,
+                  slow_query_ms=args.slow_query_ms)
+    task_controller = TaskController(db, owner=args.user)
+    timer_controller = TimerController(db, owner=args.user)
+    export_controller = ExportController(db, owner=args.user)
+    note_controller = NoteController(db, owner=args.user)
+    report_controller = ReportController(db, owner=args.user)
+    executor = DbExecutor(db)
+
+    # Close sessions left open by a crash; the latest one comes back paused
+    # (a timer left running by the command line comes back running)
+    timer_controller.recover(resume=True)
+
+    # Compact the task history in the background (and archive old rows
+    # when --history-days is given), one small transaction at a time so
+    # it never holds up the UI's writes
+    history_controller = HistoryController(db, retention_days=args.history_days)
+    executor.submit_steps(history_controller.run_step)
+
     # Start UI
-    app = TimeApp(task_controller, timer_controller)
+    app = TimeApp(task_controller, timer_controller, export_controller, note_controller,
+                  report_controller, executor)
     app.mainloop()
-    
-    # Cleanup when app closes
+
+    # Cleanup when app closes: release an active session (it comes back
+    # paused next time) and finish queued writes before closing connections
+    executor.submit_write(timer_controller.release)
+    executor.shutdown()
     db.close()
+    return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,68 @@
+import datetime
+import unittest
+
+from app.controllers.report_controller import ReportController
+from app.models.database import Database
+from benchmarks import suite
+from benchmarks.datagen import generate, scale_options
+
+TODAY = datetime.date(2025, 1, 1)
+
+
+class DataGeneratorTest(unittest.TestCase):
+    def generate(self, seed=7, **options):
+        db = Database(":memory:")
+        self.addCleanup(db.close)
+        counts = generate(db, seed=seed, today=TODAY, **dict(scale_options("tiny"), **options))
+        return db, counts
+
+    def test_same_seed_same_rows(self):
+        dumps = []
+        for _ in range(2):
+            db, _ = self.generate()
+            dumps.append([tuple(row) for table in ("tasks", "time_entries", "notes", "task_history")
+                          for row in db.execute(f"SELECT * FROM {table} ORDER BY id", fetchall=True)])
+        self.assertEqual(dumps[0], dumps[1])
+        self.assertNotEqual(dumps[0], [tuple(row) for row in self.generate(seed=8)[0].execute(
+            "SELECT * FROM tasks ORDER BY id", fetchall=True)])
+
+    def test_rows_are_consistent(self):
+        db, counts = self.generate(users=3)
+        for table in ("tasks", "time_entries", "notes", "task_history"):
+            self.assertEqual(db.execute(f"SELECT COUNT(*) FROM {table}", fetchone=True)[0], counts[table])
+
+        # Totals, segments and rollups agree with the entries
+        tracked = db.execute("SELECT SUM(duration) FROM time_entries", fetchone=True)[0]
+        self.assertEqual(db.execute("SELECT SUM(total_time) FROM tasks", fetchone=True)[0], tracked)
+        self.assertEqual(db.execute("SELECT SUM(duration_ns) FROM time_segments", fetchone=True)[0],
+                         tracked * 1_000_000_000)
+        self.assertEqual(sum(ReportController(db, owner=f"user{i}").time_per_period(period="all")[0]["seconds"]
+                             for i in range(3)), tracked)
+
+        mismatched = db.execute("SELECT COUNT(*) FROM time_entries te JOIN tasks t ON t.id = te.task_id "
+                                "WHERE te.owner != t.owner", fetchone=True)[0]
+        self.assertEqual(mismatched, 0)
+        self.assertEqual(len(db.execute("SELECT DISTINCT owner FROM tasks", fetchall=True)), 3)
+
+
+class SuiteTest(unittest.TestCase):
+    def test_every_case_runs(self):
+        db = Database(":memory:")
+        self.addCleanup(db.close)
+        data = generate(db, seed=1, today=TODAY, **scale_options("tiny"))
+        for name, setup, run in suite.build_cases(db, data["task_ids"], rounds=4):
+            result = suite.measure(setup, run, rounds=2, warmup=2)
+            self.assertEqual(result["rounds"], 2, name)
+        self.assertEqual(db.execute("SELECT COUNT(*) FROM time_entries WHERE end_time IS NULL",
+                                    fetchone=True)[0], 0)
+
+    def test_regressions_need_threshold_and_minimum_delta(self):
+        baseline = {"slow": {"median_ms": 1.0}, "noisy": {"median_ms": 0.01}, "fast": {"median_ms": 2.0}}
+        results = {"slow": {"median_ms": 1.5}, "noisy": {"median_ms": 0.02},
+                   "fast": {"median_ms": 1.0}, "new": {"median_ms": 3.0}}
+        regressed = {name: flag for name, _, _, _, flag in suite.compare(results, baseline, 0.25)}
+        self.assertEqual(regressed, {"slow": True, "noisy": False, "fast": False, "new": False})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from app import cli
+from app.controllers.timer_controller import NS_PER_SECOND, TimerRegistry
+from app.models.database import Database
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class CliTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cli.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_cli(self, *args):
+        """Run a command; return (exit status, stdout lines)"""
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(io.StringIO()):
+            status = cli.main([*args, "--db", self.path])
+        return status, out.getvalue().splitlines()
+
+    def test_add_and_list(self):
+        self.assertEqual(self.run_cli("add", "Write docs", "--category", "Work"), (0, ["1"]))
+        self.run_cli("add", "Water plants")
+
+        status, lines = self.run_cli("list", "--sort", "category")
+        self.assertEqual(status, 0)
+        self.assertEqual([line.split("\t")[1] for line in lines[1:]], ["Water plants", "Write docs"])
+
+        status, lines = self.run_cli("list", "--search", "wat")
+        self.assertEqual([line.split("\t")[1] for line in lines[1:]], ["Water plants"])
+
+    def test_timer_survives_between_calls(self):
+        self.run_cli("add", "Tracked")
+        self.assertEqual(self.run_cli("start", "1"), (0, ["1"]))
+
+        # Pretend the session was started a minute ago
+        db = Database(self.path)
+        db.execute("UPDATE time_entries SET detached_at = datetime(detached_at, '-60 seconds')")
+        db.close()
+
+        status, lines = self.run_cli("status")
+        self.assertTrue(lines[1].endswith("\trunning"))
+        self.assertEqual(self.run_cli("start", "1")[0], 1)
+
+        status, lines = self.run_cli("stop")
+        self.assertEqual(status, 0)
+        task_id, seconds = lines[0].split("\t")
+        self.assertEqual(task_id, "1")
+        self.assertGreaterEqual(int(seconds), 60)
+        self.assertEqual(self.run_cli("status")[1], ["task_id\tentry_id\tstart_time\tseconds\tstate"])
+        self.assertEqual(self.run_cli("stop", "1")[0], 1)
+
+    def test_stop_leaves_sessions_of_running_processes(self):
+        self.run_cli("add", "Tracked")
+        db = Database(self.path)
+        self.addCleanup(db.close)
+        gui = TimerRegistry(db)
+        gui.start(1)
+        gui.get(1).segment_start_ns -= 2 * NS_PER_SECOND
+        gui.checkpoint(force=True)
+
+        self.assertEqual(self.run_cli("stop"), (0, []))
+        self.assertEqual(self.run_cli("stop", "1")[0], 1)
+        self.assertEqual(self.run_cli("start", "1")[0], 1)
+        self.assertTrue(self.run_cli("status")[1][1].endswith("\theld"))
+
+        self.assertEqual(gui.stop(1), 2)
+        self.assertEqual(db.execute("SELECT total_time FROM tasks WHERE id = 1", fetchone=True)[0], 2)
+        self.assertEqual(db.execute("SELECT COUNT(*) FROM task_history WHERE field_name = 'total_time'",
+                                    fetchone=True)[0], 1)
+        self.assertEqual(db.execute("SELECT entries FROM daily_rollups", fetchall=True)[0][0], 1)
+
+    def test_start_claims_only_its_own_task(self):
+        self.run_cli("add", "Crashed")
+        self.run_cli("add", "Started")
+        db = Database(self.path)
+        self.addCleanup(db.close)
+        gui = TimerRegistry(db)
+        gui.start(1)
+        gui.get(1).segment_start_ns -= 5 * NS_PER_SECOND
+        gui.checkpoint(force=True)
+        gui.discard_all()  # The GUI crashes
+        db.execute("UPDATE time_entries SET heartbeat = datetime(heartbeat, '-1 hour')")
+
+        self.assertEqual(self.run_cli("start", "2")[0], 0)
+        states = {line.split("\t")[0]: line.split("\t")[-1] for line in self.run_cli("status")[1][1:]}
+        self.assertEqual(states, {"1": "paused", "2": "running"})
+
+        status, lines = self.run_cli("stop", "1")
+        self.assertEqual(status, 0)
+        self.assertEqual(lines, ["1\t5"])
+
+        # A paused timer released by the CLI can be stopped by the next call at once
+        self.assertEqual(self.run_cli("start", "1")[0], 0)
+        registry = TimerRegistry(db)
+        registry.recover(resume=True, task_ids=[1])
+        registry.pause(1)
+        registry.detach_all()
+        self.assertEqual(self.run_cli("stop", "1")[0], 0)
+        self.assertEqual([line.split("\t")[0] for line in self.run_cli("status")[1][1:]], ["2"])
+
+    def test_report(self):
+        self.run_cli("add", "Reported", "--category", "Work")
+        status, lines = self.run_cli("report", "category")
+        self.assertEqual((status, lines), (0, ["period"]))
+
+    def test_no_gui_modules_loaded(self):
+        code = ("import sys; from app import cli; cli.main(['list', '--db', sys.argv[1]]); "
+                "loaded = [m for m in ('tkinter', 'tkcalendar', 'app.views.gui.main_window') if m in sys.modules]; "
+                "sys.exit(','.join(loaded) or None)")
+        result = subprocess.run([sys.executable, "-c", code, self.path], cwd=ROOT,
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+
+class DetachedTimerTest(unittest.TestCase):
+    def setUp(self):
+        self.db = Database(":memory:")
+        self.task_id = self.db.execute("INSERT INTO tasks (name) VALUES ('Detached')")
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_detached_timer_resumes_running(self):
+        registry = TimerRegistry(self.db)
+        entry_id = registry.start(self.task_id)
+        self.assertEqual(registry.detach_all(), 1)
+        self.assertEqual(len(registry), 0)
+        self.db.execute("UPDATE time_entries SET detached_at = datetime(detached_at, '-30 seconds')")
+
+        other = TimerRegistry(self.db)
+        self.assertEqual(other.recover(resume=True), [])
+        state = other.get(self.task_id)
+        self.assertEqual(state.entry_id, entry_id)
+        self.assertTrue(state.running)
+        self.assertGreaterEqual(other.elapsed_time(self.task_id), 30)
+
+        seconds = other.stop(self.task_id)
+        segments = self.db.execute("SELECT SUM(duration_ns) FROM time_segments WHERE entry_id = ?",
+                                   (entry_id,), fetchone=True)[0]
+        self.assertEqual(segments // NS_PER_SECOND, seconds)
+
+    def test_detached_timer_closed_at_now(self):
+        registry = TimerRegistry(self.db)
+        registry.start(self.task_id)
+        registry.detach_all()
+        self.db.execute("UPDATE time_entries SET detached_at = datetime(detached_at, '-45 seconds')")
+
+        closed = TimerRegistry(self.db).recover()
+        self.assertGreaterEqual(closed[0][2], 45)
+        entry = self.db.execute("SELECT detached_at, end_time FROM time_entries", fetchone=True)
+        self.assertIsNone(entry['detached_at'])
+        self.assertIsNotNone(entry['end_time'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from app.controllers.task_controller import TaskController
+from app.models.database import Database, resolve_profile
+
+
+class TransactionTest(unittest.TestCase):
+    def setUp(self):
+        self.db = Database(":memory:")
+
+    def tearDown(self):
+        self.db.close()
+
+    def count_tasks(self):
+        return self.db.execute("SELECT COUNT(*) FROM tasks", fetchone=True)[0]
+
+    def test_rollback_on_error(self):
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction():
+                self.db.execute("INSERT INTO tasks (name) VALUES (?)", ("a",))
+                raise RuntimeError("boom")
+
+        self.assertEqual(self.count_tasks(), 0)
+        self.assertFalse(self.db.in_transaction)
+
+    def test_nested_block_rolls_back_to_savepoint(self):
+        with self.db.transaction():
+            self.db.execute("INSERT INTO tasks (name) VALUES (?)", ("outer",))
+            with self.assertRaises(RuntimeError):
+                with self.db.transaction():
+                    self.db.execute("INSERT INTO tasks (name) VALUES (?)", ("inner",))
+                    raise RuntimeError("boom")
+
+        names = [r['name'] for r in self.db.execute("SELECT name FROM tasks", fetchall=True)]
+        self.assertEqual(names, ["outer"])
+
+    def test_executemany(self):
+        count = self.db.executemany(
+            "INSERT INTO tasks (name) VALUES (?)",
+            [(f"task {i}",) for i in range(50)]
+        )
+
+        self.assertEqual(count, 50)
+        self.assertEqual(self.count_tasks(), 50)
+
+
+class ConnectionProfileTest(unittest.TestCase):
+    def test_profile_pragmas_applied(self):
+        db = Database(":memory:", profile={"cache_size": -2000, "temp_store": "MEMORY"})
+        try:
+            self.assertEqual(db.get_pragma("cache_size"), -2000)
+            self.assertEqual(db.get_pragma("temp_store"), 2)
+        finally:
+            db.close()
+
+    def test_unknown_profile_rejected(self):
+        with self.assertRaises(ValueError):
+            resolve_profile("turbo")
+        with self.assertRaises(ValueError):
+            resolve_profile({"journal_mode": "WAL; DROP TABLE tasks"})
+
+
+class BusyRetryTest(unittest.TestCase):
+    """Writes that find the database locked by another process"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp.name, "shared.db")
+        # busy_timeout 0: SQLite reports the lock at once, so only the retries wait
+        self.profile = {"journal_mode": "WAL", "busy_timeout": 0}
+        Database(path, profile=self.profile).close()
+        self.path = path
+        self.other = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+
+    def tearDown(self):
+        if self.other.in_transaction:
+            self.other.execute("ROLLBACK")
+        self.other.close()
+        self.tmp.cleanup()
+
+    def test_locked_write_retried(self):
+        db = Database(self.path, profile=self.profile)
+        self.other.execute("BEGIN IMMEDIATE")
+        release = threading.Timer(0.05, self.other.execute, ("COMMIT",))
+        release.start()
+        try:
+            task_id = TaskController(db).create_task("Written after the lock")
+            self.assertIsNotNone(TaskController(db).get_task(task_id))
+            stats = db.contention_stats()
+            self.assertGreaterEqual(stats["retries"], 1)
+            self.assertEqual(stats["failures"], 0)
+            self.assertEqual(stats["waits"], 1)
+        finally:
+            release.join()
+            db.close()
+
+    def test_gives_up_after_retries(self):
+        db = Database(self.path, profile=self.profile, busy_retries=2)
+        self.other.execute("BEGIN IMMEDIATE")
+        try:
+            with self.assertRaises(sqlite3.OperationalError):
+                db.execute("INSERT INTO tasks (name) VALUES ('Never written')")
+            with self.assertRaises(sqlite3.OperationalError):
+                with db.transaction():
+                    db.execute("INSERT INTO tasks (name) VALUES ('Never written')")
+            self.assertFalse(db.in_transaction)
+            self.assertEqual(db.contention_stats()["failures"], 2)
+            self.assertEqual(db.contention_stats()["retries"], 4)
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+
+from app.controllers.task_controller import TaskController
+from app.models.database import Database
+from app.models.executor import DbExecutor
+
+
+class DbExecutorTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.tmp.name, "app.db"), profile="wal")
+        self.tasks = TaskController(self.db)
+        self.executor = DbExecutor(self.db)
+
+    def tearDown(self):
+        self.executor.shutdown()
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_reads_see_committed_writes(self):
+        task_id = self.executor.submit_write(self.tasks.create_task, "Background").result()
+        task = self.executor.submit_read(self.tasks.get_task, task_id).result()
+
+        self.assertEqual(task['name'], "Background")
+
+    def test_threads_use_their_own_connection(self):
+        main_conn = self.db.conn
+        writer_conn = self.executor.submit_write(lambda: self.db.conn).result()
+        reader_conn = self.executor.submit_read(lambda: self.db.conn).result()
+
+        self.assertIsNot(main_conn, writer_conn)
+        self.assertIsNot(writer_conn, reader_conn)
+
+    def test_reader_not_blocked_by_open_write(self):
+        self.tasks.create_task("Existing")
+
+        # Hold a write transaction open on this thread while a reader queries
+        with self.db.transaction():
+            self.db.execute("INSERT INTO tasks (name) VALUES (?)", ("uncommitted",))
+            count = self.executor.submit_read(
+                self.db.execute, "SELECT COUNT(*) FROM tasks", fetchone=True
+            ).result(timeout=2)[0]
+
+        self.assertEqual(count, 1)
+
+    def test_steps_interleave_with_writes(self):
+        order = []
+        remaining = [3]
+
+        def step():
+            order.append("step")
+            if len(order) == 1:
+                # Queued while the job runs: goes before the next step
+                self.executor.submit_write(order.append, "write")
+            remaining[0] -= 1
+            return remaining[0] > 0
+
+        self.assertEqual(self.executor.submit_steps(step).result(timeout=2), 3)
+        self.assertEqual(order, ["step", "write", "step", "step"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import csv
+import gzip
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from app.controllers.export_controller import ExportController
+from app.models.database import Database
+
+
+class ExportControllerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.tmp.name, "export.db"))
+        self.exporter = ExportController(self.db, chunk_size=4)
+
+        # One row per table per day, so every date filter has something to cut
+        for day in range(1, 11):
+            stamp = f"2025-01-{day:02d} 12:00:00"
+            task_id = self.db.execute("INSERT INTO tasks (name, category, created_at) VALUES (?, ?, ?)",
+                                      (f"Task {day}", "Work, \"quoted\"", stamp))
+            self.db.execute("INSERT INTO time_entries (task_id, start_time, end_time, duration) "
+                            "VALUES (?, ?, ?, 60)", (task_id, stamp, stamp))
+            self.db.execute("INSERT INTO notes (task_id, content, created_at) VALUES (?, ?, ?)",
+                            (task_id, f"Line one\nline two of note {day}", stamp))
+            self.db.execute("INSERT INTO task_history (task_id, change_date, field_name, new_value) "
+                            "VALUES (?, ?, 'creation', 'created')", (task_id, stamp))
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def read(self, path):
+        """Rows of an export file as dicts of strings (CSV) or values (JSONL)"""
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8", newline="") as f:
+            if ".jsonl" in path:
+                return [json.loads(line) for line in f]
+            return list(csv.DictReader(f))
+
+    def table_rows(self, table):
+        return [dict(row) for row in self.db.execute(f"SELECT * FROM {table} ORDER BY id", fetchall=True)]
+
+    def test_csv_round_trip(self):
+        files = self.exporter.export(self.path("backup.csv"))
+
+        self.assertEqual(set(files), set(ExportController.TABLES))
+        for table, path in files.items():
+            self.assertEqual(path, self.path(f"backup_{table}.csv"))
+            expected = [{key: "" if value is None else str(value) for key, value in row.items()}
+                        for row in self.table_rows(table)]
+            self.assertEqual(self.read(path), expected, table)
+
+    def test_jsonl_round_trip(self):
+        files = self.exporter.export(self.path("backup.jsonl"))
+
+        for table, path in files.items():
+            self.assertEqual(self.read(path), self.table_rows(table), table)
+
+    def test_gzip_inferred_from_extension(self):
+        files = self.exporter.export(self.path("backup.jsonl.gz"), tables=["notes"])
+
+        with open(files["notes"], "rb") as f:
+            self.assertEqual(f.read(2), b"\x1f\x8b")
+        self.assertEqual(self.read(files["notes"]), self.table_rows("notes"))
+
+        # An explicit argument wins over the extension
+        path = self.path("plain.csv")
+        self.exporter.export_table("tasks", path, compress=True)
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(2), b"\x1f\x8b")
+
+    def test_date_range_uses_each_tables_timestamp(self):
+        files = self.exporter.export(self.path("range.jsonl"), start="2025-01-03", end="2025-01-06")
+
+        for table, path in files.items():
+            column = ExportController.TABLES[table]
+            stamps = [row[column] for row in self.read(path)]
+            self.assertEqual(stamps, [f"2025-01-{day:02d} 12:00:00" for day in (3, 4, 5)], table)
+
+    def test_progress_reported_per_chunk(self):
+        calls = []
+        written = self.exporter.export_table("tasks", self.path("tasks.csv"),
+                                             progress=lambda table, rows: calls.append((table, rows)))
+
+        self.assertEqual(written, 10)
+        self.assertEqual(calls, [("tasks", 4), ("tasks", 8), ("tasks", 10)])
+
+    def test_cancel_stops_after_current_chunk(self):
+        cancel = threading.Event()
+
+        def progress(table, rows):
+            cancel.set()
+
+        files = self.exporter.export(self.path("cancelled.jsonl"), progress=progress, cancel_event=cancel)
+
+        self.assertEqual(list(files), ["tasks"])
+        self.assertEqual(len(self.read(files["tasks"])), 4)
+
+    def test_empty_table_gets_header_only(self):
+        self.db.execute("DELETE FROM notes")
+        path = self.path("notes.csv")
+
+        self.assertEqual(self.exporter.export_table("notes", path), 0)
+        with open(path, encoding="utf-8") as f:
+            header = [col["name"] for col in self.db.execute("PRAGMA table_info(notes)", fetchall=True)]
+            self.assertEqual(f.read().splitlines(), [",".join(header)])
+
+        self.assertEqual(self.exporter.export_table("notes", self.path("notes.jsonl")), 0)
+        self.assertEqual(os.path.getsize(self.path("notes.jsonl")), 0)
+
+    def test_unknown_table_or_format(self):
+        with self.assertRaises(ValueError):
+            self.exporter.export_table("sqlite_master", self.path("x.csv"))
+        with self.assertRaises(ValueError):
+            self.exporter.export_table("tasks", self.path("x.csv"), fmt="xml")
+
+    def test_background_export(self):
+        job = self.exporter.export_in_background(self.path("background.csv"), tables=["tasks", "notes"])
+
+        self.assertTrue(job.finished.wait(5))
+        self.assertTrue(job.done)
+        self.assertIsNone(job.error)
+        self.assertEqual(set(job.files), {"tasks", "notes"})
+        self.assertEqual(job.rows, {"tasks": 10, "notes": 10})
+        self.assertEqual(job.total_rows, 20)
+        self.assertEqual(len(self.read(job.files["notes"])), 10)
+
+    def test_background_export_error(self):
+        job = self.exporter.export_in_background(self.path("broken.csv"), tables=["bogus"])
+
+        self.assertTrue(job.finished.wait(5))
+        self.assertIsInstance(job.error, ValueError)
+        self.assertIsNone(job.files)
+
+
+if __name__ == "__main__":
+    unittest.main()
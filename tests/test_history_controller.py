@@ -0,0 +1,137 @@
+import sqlite3
+import unittest
+
+from app.controllers.history_controller import HistoryController
+from app.controllers.task_controller import TaskController
+from app.controllers.timer_controller import NS_PER_SECOND, TimerController
+from app.models.database import Database
+from app.models.migrations import MIGRATIONS
+
+
+class HistoryCompactionTest(unittest.TestCase):
+    def setUp(self):
+        self.db = Database(":memory:")
+        self.tasks = TaskController(self.db)
+        self.history = HistoryController(self.db, retention_days=30, batch_size=2)
+        self.task_ids = [self.tasks.create_task(f"Task {i}") for i in range(5)]
+
+    def tearDown(self):
+        self.db.close()
+
+    def add_time(self, task_id, change_date, delta):
+        self.db.execute(
+            "INSERT INTO task_history (task_id, change_date, field_name, delta) VALUES (?, ?, 'total_time', ?)",
+            (task_id, change_date, delta)
+        )
+
+    def time_rows(self, task_id):
+        return self.db.execute(
+            "SELECT change_date, delta, merged FROM task_history "
+            "WHERE task_id = ? AND field_name = 'total_time' ORDER BY id",
+            (task_id,), fetchall=True
+        )
+
+    def test_timer_writes_typed_delta(self):
+        timer = TimerController(self.db)
+        timer.start(self.task_ids[0])
+        timer._state.segment_start_ns -= 90 * NS_PER_SECOND
+        timer.stop()
+
+        row = self.time_rows(self.task_ids[0])[0]
+        self.assertEqual(row['delta'], 90)
+        self.assertEqual(row['merged'], 1)
+
+    def test_flags_stored_as_digits(self):
+        self.tasks.update_task(self.task_ids[0], completed=True)
+
+        change = self.tasks.get_task_history(self.task_ids[0])[0]
+        self.assertEqual((change['old_value'], change['new_value']), ("0", "1"))
+
+    def test_same_day_rows_merged(self):
+        for task_id in self.task_ids:
+            for hour in (9, 11, 15):
+                self.add_time(task_id, f"2020-03-02 {hour:02d}:00:00", hour * 60)
+            self.add_time(task_id, "2020-03-03 10:00:00", 30)
+
+        result = HistoryController(self.db, retention_days=None, batch_size=2).run()
+
+        self.assertEqual(result, {"merged": 10, "expired": 0})
+        for task_id in self.task_ids:
+            rows = [tuple(row) for row in self.time_rows(task_id)]
+            self.assertEqual(rows, [("2020-03-02 15:00:00", 35 * 60, 3), ("2020-03-03 10:00:00", 30, 1)])
+
+    def test_today_not_compacted(self):
+        today = self.db.execute("SELECT datetime('now')", fetchone=True)[0]
+        self.add_time(self.task_ids[0], today, 10)
+        self.add_time(self.task_ids[0], today, 20)
+
+        self.assertEqual(self.history.run()["merged"], 0)
+        self.assertEqual(len(self.time_rows(self.task_ids[0])), 2)
+
+    def test_expired_rows_archived(self):
+        self.add_time(self.task_ids[0], "2001-01-01 10:00:00", 60)
+        self.tasks.update_task(self.task_ids[0], category="Recent")
+        self.db.execute("UPDATE task_history SET change_date = '2001-01-01 09:00:00' WHERE field_name = 'creation'")
+
+        result = self.history.run()
+
+        self.assertEqual(result["expired"], 1)
+        fields = sorted(h['field_name'] for h in self.tasks.get_task_history(self.task_ids[0]))
+        self.assertEqual(fields, ["category", "creation"])
+        archived = self.db.execute("SELECT task_id, delta FROM task_history_archive", fetchall=True)
+        self.assertEqual([tuple(row) for row in archived], [(self.task_ids[0], 60)])
+
+    def test_old_rows_kept_by_default(self):
+        for hour in (9, 11):
+            self.add_time(self.task_ids[0], f"2001-01-01 {hour:02d}:00:00", 60)
+
+        for retention_days in (None, 0):
+            result = HistoryController(self.db, retention_days=retention_days).run()
+            self.assertEqual(result["expired"], 0)
+        self.assertEqual(HistoryController(self.db).retention_days, None)
+
+        self.assertEqual([tuple(row) for row in self.time_rows(self.task_ids[0])],
+                         [("2001-01-01 11:00:00", 120, 2)])
+        self.assertEqual(self.db.execute("SELECT COUNT(*) FROM task_history_archive", fetchone=True)[0], 0)
+
+    def test_expired_rows_dropped_without_archive(self):
+        self.add_time(self.task_ids[0], "2001-01-01 10:00:00", 60)
+
+        HistoryController(self.db, retention_days=30, archive=False).run()
+
+        self.assertEqual(self.time_rows(self.task_ids[0]), [])
+        self.assertEqual(self.db.execute("SELECT COUNT(*) FROM task_history_archive", fetchone=True)[0], 0)
+
+    def test_run_in_steps(self):
+        for task_id in self.task_ids:
+            self.add_time(task_id, "2020-03-02 09:00:00", 1)
+            self.add_time(task_id, "2020-03-02 10:00:00", 1)
+
+        # Three compaction batches of at most two tasks, then retention
+        self.assertTrue(self.history.run_step())
+        self.assertEqual(self.history.merged, 2)
+        while self.history.run_step():
+            pass
+        self.assertEqual(self.history.merged, 5)
+        self.assertFalse(self.history.run_step())
+
+    def test_legacy_history_converted(self):
+        conn = sqlite3.connect(":memory:")
+        for migration in MIGRATIONS[:7]:
+            migration(conn)
+        conn.execute("INSERT INTO tasks (name) VALUES ('old')")
+        conn.executemany(
+            "INSERT INTO task_history (task_id, field_name, old_value, new_value) VALUES (1, ?, ?, ?)",
+            [("total_time", None, "+125 seconds"), ("completed", "False", "True"), ("name", "a", "True")]
+        )
+        MIGRATIONS[7](conn)
+
+        rows = conn.execute("SELECT field_name, old_value, new_value, delta, merged FROM task_history ORDER BY id").fetchall()
+        self.assertEqual(rows, [("total_time", None, None, 125, 1),
+                                ("completed", "0", "1", None, 1),
+                                ("name", "a", "True", None, 1)])
+        conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import datetime
+import os
+import tempfile
+import unittest
+
+from app.controllers.import_controller import ImportController
+from app.controllers.report_controller import ReportController
+from app.controllers.task_controller import TaskController
+from app.models.database import Database
+from app.utils.validators import ValidationError, parse_bool, parse_datetime, validate_task, validate_time_entry
+
+
+class ValidatorsTest(unittest.TestCase):
+    def test_validate_task_normalises_fields(self):
+        task = validate_task({"name": "  Report ", "category": "", "deadline": "2025-05-01T12:00",
+                              "priority": "yes", "completed": "0"})
+
+        self.assertEqual(task["name"], "Report")
+        self.assertIsNone(task["category"])
+        self.assertEqual(str(task["deadline"]), "2025-05-01")
+        self.assertTrue(task["priority"])
+        self.assertFalse(task["completed"])
+
+    def test_invalid_values_raise(self):
+        for row in ({"name": ""}, {"name": "x" * 500}, {"name": "ok", "deadline": "tomorrow"}):
+            with self.assertRaises(ValidationError):
+                validate_task(row)
+        with self.assertRaises(ValidationError):
+            parse_bool("maybe")
+
+    def test_time_entry_derives_missing_field(self):
+        entry = validate_time_entry({"task": "Report", "start_time": "2025-05-01 09:00", "duration": "90"})
+        self.assertEqual(str(entry["end_time"]), "2025-05-01 09:01:30")
+
+        entry = validate_time_entry({"task_id": "3", "start_time": "2025-05-01 09:00",
+                                     "end_time": "2025-05-01 10:00"})
+        self.assertEqual((entry["task_id"], entry["duration"]), (3, 3600))
+
+        with self.assertRaises(ValidationError):
+            validate_time_entry({"task": "Report", "start_time": "2025-05-01 09:00",
+                                 "end_time": "2025-05-01 08:00"})
+
+    def test_utc_offsets_converted_to_local_time(self):
+        local = parse_datetime("2024-01-01T10:00:00+02:00")
+        self.assertIsNone(local.tzinfo)
+        self.assertEqual(local, datetime.datetime(2024, 1, 1, 8, tzinfo=datetime.timezone.utc)
+                         .astimezone().replace(tzinfo=None))
+
+        # Mixed with a naive end_time the entry is checked, not a TypeError
+        start = "2024-01-01T10:00:00+00:00"
+        end = (local + datetime.timedelta(days=2)).isoformat()
+        entry = validate_time_entry({"task": "Report", "start_time": start, "end_time": end})
+        self.assertIsNone(entry["start_time"].tzinfo)
+        with self.assertRaises(ValidationError):
+            validate_time_entry({"task": "Report", "start_time": start, "end_time": "2023-12-30 10:00"})
+
+
+class ImportTest(unittest.TestCase):
+    def setUp(self):
+        self.db = Database(":memory:")
+        self.tasks = TaskController(self.db)
+        self.importer = ImportController(self.db, chunk_size=2)
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w", encoding="utf-8") as out:
+            out.write(text)
+        return path
+
+    def test_import_tasks_csv(self):
+        self.tasks.create_task("Existing", category="Work")
+        path = self.write("tasks.csv", "name,category,deadline,priority\n"
+                                       "Existing,Work,,\n"
+                                       "New,Work,2025-06-01,yes\n"
+                                       ",Work,,\n"
+                                       "New,Work,,\n"
+                                       "Other,,bad date,\n")
+
+        report = self.importer.import_tasks(path)
+
+        self.assertEqual((report.rows, report.inserted, report.duplicates, report.error_count), (5, 1, 2, 2))
+        self.assertEqual([line for line, _ in report.errors], [4, 6])
+        new = [t for t in self.tasks.get_all_tasks() if t['name'] == "New"]
+        self.assertEqual(len(new), 1)
+        self.assertEqual(new[0]['deadline'], "2025-06-01")
+        self.assertTrue(new[0]['priority'])
+
+    def test_import_time_entries_jsonl(self):
+        task_id = self.tasks.create_task("Report", category="Work")
+        path = self.write("entries.jsonl",
+                          '{"task": "Report", "start_time": "2025-03-03 09:00:00", "duration": 600}\n'
+                          '{"task_id": %d, "start_time": "2025-03-03 14:00:00", "end_time": "2025-03-03 14:05:00"}\n'
+                          '{"task": "Missing", "start_time": "2025-03-03 09:00:00", "duration": 60}\n'
+                          'not json\n' % task_id)
+
+        report = self.importer.import_time_entries(path)
+
+        self.assertEqual((report.inserted, report.error_count), (2, 2))
+        self.assertEqual(self.tasks.get_task(task_id)['total_time'], 900)
+        rows = ReportController(self.db).time_per_task(task_id=task_id)
+        self.assertEqual([(r['period'], r['seconds']) for r in rows], [("2025-03-03", 900)])
+
+        # Importing the same file again adds nothing
+        again = self.importer.import_time_entries(path)
+        self.assertEqual((again.inserted, again.duplicates), (0, 2))
+        self.assertEqual(self.tasks.get_task(task_id)['total_time'], 900)
+
+    def test_offset_timestamps_checked_per_row(self):
+        self.tasks.create_task("Report")
+        path = self.write("offsets.jsonl",
+                          '{"task": "Report", "start_time": "2024-01-01T10:00:00+02:00", '
+                          '"end_time": "2023-12-30 10:00:00"}\n'
+                          '{"task": "Report", "start_time": "2024-01-02T10:00:00+02:00", "duration": 60}\n')
+
+        report = self.importer.import_time_entries(path)
+
+        self.assertEqual((report.inserted, [line for line, _ in report.errors]), (1, [1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
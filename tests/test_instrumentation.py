@@ -0,0 +1,69 @@
+import unittest
+
+from app.controllers.task_controller import TaskController
+from app.models.database import Database
+from app.models.instrumentation import normalize_sql
+from app.views.gui.diagnostics_window import query_rows, summarize
+
+
+class InstrumentationTest(unittest.TestCase):
+    def setUp(self):
+        self.db = Database(":memory:", instrument=True)
+        self.tasks = TaskController(self.db, cache_size=0)
+        # Leave out the statements that created the schema
+        self.db.query_stats.reset()
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_normalize_sql(self):
+        self.assertEqual(normalize_sql("SELECT *\n  FROM tasks WHERE id IN (?, ?,?) AND name = 'x' LIMIT 10"),
+                         "SELECT * FROM tasks WHERE id IN (?, ...) AND name = ? LIMIT ?")
+        self.assertEqual(normalize_sql("SAVEPOINT sp_1"), "SAVEPOINT sp_1")
+
+    def test_statements_rows_and_commits(self):
+        task_ids = [self.tasks.create_task(f"Task {i}") for i in range(3)]
+        self.tasks.get_tasks(task_ids)
+        self.tasks.get_tasks(task_ids[:2])
+        self.db.execute("UPDATE tasks SET priority = 1")
+        self.assertEqual(len(list(self.db.iterate("SELECT id FROM tasks", chunk_size=2))), 3)
+
+        stats = self.db.stats()
+        lookup = stats["queries"]["SELECT * FROM tasks WHERE id IN (?, ...) AND owner = ?"]
+        self.assertEqual((lookup["count"], lookup["rows"]), (2, 5))
+        self.assertEqual(sum(lookup["histogram"]), 2)
+        self.assertEqual(stats["queries"]["SELECT id FROM tasks"]["rows"], 3)
+        self.assertEqual(stats["commits"]["count"], 3)
+        self.assertEqual(stats["autocommits"], 1)
+
+    def test_slow_queries_logged_with_plan(self):
+        self.db.enable_instrumentation(slow_query_ms=0)
+        self.tasks.get_all_tasks(sort_by='deadline')
+        self.tasks.get_all_tasks(sort_by='deadline')
+
+        slow = [item for item in self.db.stats()["slow_queries"] if item["sql"].startswith("SELECT * FROM tasks")]
+        self.assertEqual(len(slow), 2)
+        self.assertTrue(any("idx_tasks_owner_deadline" in step for step in slow[0]["plan"]))
+
+    def test_off_and_reset(self):
+        self.db.disable_instrumentation()
+        self.tasks.create_task("Unrecorded")
+        stats = self.db.stats()
+        self.assertFalse(stats["instrumented"])
+        self.assertNotIn("queries", stats)
+        self.assertIn("contention", stats)
+
+        self.db.enable_instrumentation()
+        self.tasks.create_task("Recorded")
+        self.db.query_stats.reset()
+        self.assertEqual(self.db.stats()["queries"], {})
+
+    def test_diagnostics_panel_text(self):
+        self.tasks.create_task("Shown")
+        stats = self.db.stats()
+        self.assertIn("Commits: 1 ", "\n".join(summarize(stats)))
+        self.assertEqual({row[-1] for row in query_rows(stats)}, set(stats["queries"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
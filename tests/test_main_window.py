@@ -0,0 +1,71 @@
+import unittest
+
+from app.views.gui.main_window import diff_rows
+
+
+def apply(shown, order, rows):
+    """Replay diff_rows() on a dict and a list the way _sync_task_rows drives the Treeview"""
+    removed, inserted, changed, new_order = diff_rows(shown, tuple(order), rows)
+    shown = dict(shown)
+    order = [iid for iid in order if iid not in removed]
+    for iid in removed:
+        del shown[iid]
+    for iid, values in inserted:
+        shown[iid] = values
+        order.append(iid)
+    for iid, values in changed:
+        shown[iid] = values
+    if new_order is not None:
+        order = list(new_order)
+    return shown, order
+
+
+class DiffRowsTest(unittest.TestCase):
+    def setUp(self):
+        self.rows = [("1", ("Alpha", "0:00:00")), ("2", ("Beta", "0:01:00")), ("3", ("Gamma", "0:02:00"))]
+        self.shown = dict(self.rows)
+        self.order = ("1", "2", "3")
+
+    def test_unchanged_rows_need_no_calls(self):
+        self.assertEqual(diff_rows(self.shown, self.order, self.rows), ([], [], [], None))
+
+    def test_only_changed_values_updated(self):
+        rows = [self.rows[0], ("2", ("Beta", "0:05:00")), self.rows[2]]
+        removed, inserted, changed, order = diff_rows(self.shown, self.order, rows)
+
+        self.assertEqual((removed, inserted, order), ([], [], None))
+        self.assertEqual(changed, [("2", ("Beta", "0:05:00"))])
+
+    def test_insert_and_delete(self):
+        rows = [self.rows[0], self.rows[2], ("4", ("Delta", "0:00:00"))]
+        removed, inserted, changed, order = diff_rows(self.shown, self.order, rows)
+
+        self.assertEqual(removed, ["2"])
+        self.assertEqual(inserted, [("4", ("Delta", "0:00:00"))])
+        self.assertEqual(changed, [])
+        # New rows go to the end, which is where they belong here
+        self.assertIsNone(order)
+
+    def test_reorder_in_one_call(self):
+        rows = [("0", ("Aardvark", "")), self.rows[2], self.rows[0]]
+        removed, inserted, changed, order = diff_rows(self.shown, self.order, rows)
+
+        self.assertEqual(removed, ["2"])
+        self.assertEqual(inserted, [("0", ("Aardvark", ""))])
+        self.assertEqual(order, ("0", "3", "1"))
+
+    def test_replaying_the_diff_gives_the_rows(self):
+        cases = [
+            [],
+            list(reversed(self.rows)),
+            [("5", ("Epsilon", "")), self.rows[1]],
+            [self.rows[1], ("1", ("Alpha", "0:09:00")), ("6", ("Zeta", ""))],
+        ]
+        for rows in cases:
+            shown, order = apply(self.shown, self.order, rows)
+            self.assertEqual(shown, dict(rows))
+            self.assertEqual(order, [iid for iid, _ in rows])
+
+
+if __name__ == "__main__":
+    unittest.main()
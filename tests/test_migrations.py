@@ -0,0 +1,74 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from app.controllers.task_controller import TaskController
+from app.models.database import Database
+from app.models.migrations import SCHEMA_VERSION, get_schema_version, run_migrations
+
+
+class MigrationTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "legacy.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_fresh_database_is_current(self):
+        db = Database(self.path)
+        try:
+            self.assertEqual(get_schema_version(db.conn), SCHEMA_VERSION)
+            self.assertEqual(run_migrations(db), 0)
+        finally:
+            db.close()
+
+    def test_unversioned_database_is_upgraded(self):
+        # A database created before the priority column and before versioning
+        conn = sqlite3.connect(self.path)
+        conn.execute("CREATE TABLE tasks (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, "
+                     "description TEXT, category TEXT, created_at DATETIME DEFAULT CURRENT_TIMESTAMP, "
+                     "deadline DATETIME, completed BOOLEAN DEFAULT 0, total_time INTEGER DEFAULT 0)")
+        conn.execute("INSERT INTO tasks (name) VALUES ('old task')")
+        conn.commit()
+        conn.close()
+
+        db = Database(self.path)
+        try:
+            task = TaskController(db).get_task(1)
+            self.assertEqual(task['name'], "old task")
+            self.assertEqual(task['priority'], 0)
+            self.assertEqual(get_schema_version(db.conn), SCHEMA_VERSION)
+        finally:
+            db.close()
+
+    def test_newer_schema_rejected(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+        conn.close()
+
+        with self.assertRaises(RuntimeError):
+            Database(self.path)
+
+    def test_stale_rollup_categories_corrected(self):
+        # A version 11 database whose rollup kept the category of the first session
+        db = Database(self.path)
+        task_id = TaskController(db).create_task("Recategorised", category="Home")
+        db.execute("DROP TRIGGER tasks_rollup_category")
+        db.execute("INSERT INTO daily_rollups (task_id, day, category, seconds, entries) "
+                   "VALUES (?, '2025-03-03', 'Work', 60, 1)", (task_id,))
+        db.execute("PRAGMA user_version = 11")
+        db.close()
+
+        db = Database(self.path)
+        try:
+            self.assertEqual(db.execute("SELECT category FROM daily_rollups", fetchone=True)[0], "Home")
+            TaskController(db).update_task(task_id, category="Errands")
+            self.assertEqual(db.execute("SELECT category FROM daily_rollups", fetchone=True)[0], "Errands")
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import unittest
+
+from app.controllers.note_controller import NoteController
+from app.controllers.task_controller import TaskController
+from app.models.database import Database
+
+
+class NoteControllerTest(unittest.TestCase):
+    def setUp(self):
+        self.db = Database(":memory:")
+        self.tasks = TaskController(self.db)
+        self.notes = NoteController(self.db)
+        self.task_id = self.tasks.create_task("Noted task")
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_add_update_delete(self):
+        note_id = self.notes.add_note(self.task_id, "First thought")
+
+        self.assertEqual(self.notes.get_note(note_id)['content'], "First thought")
+        self.assertTrue(self.notes.update_note(note_id, "Second thought"))
+        self.assertFalse(self.notes.update_note(note_id, "Second thought"))
+        self.assertTrue(self.notes.delete_note(note_id))
+        self.assertIsNone(self.notes.get_note(note_id))
+        with self.assertRaises(ValueError):
+            self.notes.delete_note(note_id)
+
+    def test_validation(self):
+        with self.assertRaises(ValueError):
+            self.notes.add_note(self.task_id, "   ")
+        with self.assertRaises(ValueError):
+            self.notes.add_note(9999, "Orphan")
+
+    def test_notes_deleted_with_task(self):
+        self.notes.add_note(self.task_id, "Goes away")
+        self.tasks.delete_task(self.task_id)
+
+        self.assertEqual(self.notes.count_notes(self.task_id), 0)
+
+    def test_notes_of_other_users_tasks_hidden(self):
+        note_id = self.notes.add_note(self.task_id, "Private")
+        bob = NoteController(self.db, owner="bob")
+
+        with self.assertRaises(ValueError):
+            bob.add_note(self.task_id, "Snooping")
+        with self.assertRaises(ValueError):
+            bob.update_note(note_id, "Changed")
+        with self.assertRaises(ValueError):
+            bob.delete_note(note_id)
+        self.assertIsNone(bob.get_note(note_id))
+        self.assertIsNone(bob.read_content(note_id))
+        self.assertEqual(bob.get_notes_page(self.task_id), [])
+        self.assertEqual(bob.count_notes(self.task_id), 0)
+        self.assertEqual(self.notes.get_note(note_id)['content'], "Private")
+
+    def test_long_content_streams_in_chunks(self):
+        body = "".join(f"line {i}\n" for i in range(5000))
+        note_id = self.notes.add_note(self.task_id, body + "é")
+
+        row = self.notes.get_notes_page(self.task_id)[0]
+        self.assertEqual(len(row['preview']), NoteController.PREVIEW_LENGTH)
+        self.assertEqual(row['length'], len(body) + 1)
+
+        chunks = list(self.notes.iter_content(note_id, chunk_size=1000))
+        self.assertTrue(all(len(chunk) == 1000 for chunk in chunks[:-1]))
+        self.assertEqual("".join(chunks), body + "é")
+        self.assertEqual(self.notes.read_content(note_id, offset=len(body) + 5), "")
+        self.assertIsNone(self.notes.read_content(9999))
+
+
+class NotePaginationTest(unittest.TestCase):
+    """Paging through tasks with thousands of notes"""
+
+    NOTES = 3000
+
+    def setUp(self):
+        self.db = Database(":memory:")
+        self.tasks = TaskController(self.db)
+        self.notes = NoteController(self.db)
+        self.task_id = self.tasks.create_task("Busy task")
+        other = self.tasks.create_task("Other task")
+
+        # Many notes share a timestamp, so the id has to break ties
+        self.db.executemany(
+            "INSERT INTO notes (task_id, content, created_at) VALUES (?, ?, ?)",
+            [(task_id, f"note {i}", f"2025-01-{1 + i // 500:02d} 10:00:00")
+             for i in range(self.NOTES) for task_id in (self.task_id, other)]
+        )
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_pages_cover_every_note_once(self):
+        seen = []
+        cursor = None
+        while True:
+            page = self.notes.get_notes_page(self.task_id, after=cursor, limit=128)
+            if not page:
+                break
+            seen.extend(row['id'] for row in page)
+            cursor = self.notes.note_cursor(page[-1])
+
+        expected = [row['id'] for row in self.db.execute(
+            "SELECT id FROM notes WHERE task_id = ? ORDER BY created_at DESC, id DESC",
+            (self.task_id,), fetchall=True
+        )]
+        self.assertEqual(len(seen), self.NOTES)
+        self.assertEqual(seen, expected)
+
+    def test_page_queries_use_index(self):
+        page = self.notes.get_notes_page(self.task_id, limit=10)
+
+        statements = []
+        self.db.conn.set_trace_callback(statements.append)
+        self.notes.get_notes_page(self.task_id, after=self.notes.note_cursor(page[-1]), limit=10)
+        self.notes.count_notes(self.task_id)
+        self.db.conn.set_trace_callback(None)
+        self.assertEqual(len(statements), 2)
+
+        # The trace has the parameters inlined, so the plans can be checked as is
+        for statement in statements:
+            plan = " ".join(self.db.explain(statement))
+            self.assertIn("idx_notes_task", plan)
+            self.assertNotIn("TEMP B-TREE", plan)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+import os
+import time
+import unittest
+
+from app.controllers.report_controller import ReportController
+from app.controllers.task_controller import TaskController
+from app.controllers.timer_controller import NS_PER_SECOND, TimerController
+from app.models.database import Database
+from app.views.gui.report_window import build_chart
+
+
+class DailyRollupTest(unittest.TestCase):
+    def setUp(self):
+        self.db = Database(":memory:")
+        self.tasks = TaskController(self.db)
+        self.reports = ReportController(self.db)
+        self.work = self.tasks.create_task("Work task", category="Work")
+        self.home = self.tasks.create_task("Home task", category="Home")
+        entries = [
+            (self.work, "2025-03-03 09:00:00", 600),
+            (self.work, "2025-03-03 14:00:00", 300),
+            (self.work, "2025-03-04 09:00:00", 120),
+            (self.home, "2025-03-10 20:00:00", 60),
+            (self.home, "2025-04-01 20:00:00", 30),
+        ]
+        self.db.executemany(
+            "INSERT INTO time_entries (task_id, start_time, end_time, duration) VALUES (?, ?, ?, ?)",
+            [(task_id, start, start, duration) for task_id, start, duration in entries]
+        )
+        self.reports.rebuild_rollups()
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_time_per_task_by_day(self):
+        rows = self.reports.time_per_task(start="2025-03-01", end="2025-03-05")
+        self.assertEqual([tuple(r) for r in rows], [
+            ("2025-03-03", self.work, "Work task", 900),
+            ("2025-03-04", self.work, "Work task", 120),
+        ])
+
+    def test_time_per_category_by_month(self):
+        rows = self.reports.time_per_category(period='month')
+        self.assertEqual([tuple(r) for r in rows], [
+            ("2025-03", "Home", 60),
+            ("2025-03", "Work", 1020),
+            ("2025-04", "Home", 30),
+        ])
+
+    def test_recategorised_task_moves_its_time(self):
+        self.reports.time_per_category(period='month')
+        self.tasks.update_task(self.work, category="Home")
+
+        rows = self.reports.time_per_category(period='month')
+        self.assertEqual([tuple(r) for r in rows], [("2025-03", "Home", 1080), ("2025-04", "Home", 30)])
+
+        # Later sessions of the day roll up under the new category too
+        self.tasks.update_tasks([self.work, self.home], category=None)
+        timer = TimerController(self.db)
+        for _ in range(2):
+            timer.start(self.home)
+            timer._state.segment_start_ns -= 10 * NS_PER_SECOND
+            timer.stop()
+            self.tasks.update_task(self.home, category="Errands")
+
+        rows = self.reports.time_per_category(period='all')
+        self.assertEqual([tuple(r) for r in rows], [("all", None, 1020), ("all", "Errands", 110)])
+
+    def test_stop_updates_rollup_incrementally(self):
+        timer = TimerController(self.db)
+        timer.start(self.home)
+        timer._state.segment_start_ns -= 45 * NS_PER_SECOND  # Pretend 45 seconds were tracked
+        timer.stop()
+
+        today = self.db.execute("SELECT date('now', 'localtime')", fetchone=True)[0]
+        rows = self.reports.time_per_task(start=today, task_id=self.home)
+        self.assertEqual(sum(r['seconds'] for r in rows), 45)
+
+        # A full rebuild agrees with the incremental update
+        before = [tuple(r) for r in self.db.execute("SELECT * FROM daily_rollups ORDER BY task_id, day", fetchall=True)]
+        self.reports.rebuild_rollups()
+        after = [tuple(r) for r in self.db.execute("SELECT * FROM daily_rollups ORDER BY task_id, day", fetchall=True)]
+        self.assertEqual(before, after)
+
+    def test_unknown_period_rejected(self):
+        with self.assertRaises(ValueError):
+            self.reports.time_per_task(period='fortnight')
+
+    def test_time_per_period_and_totals(self):
+        rows = self.reports.time_per_period(period='month')
+        self.assertEqual([tuple(r) for r in rows], [("2025-03", 1080), ("2025-04", 30)])
+
+        rows = self.reports.time_per_task(period='all')
+        self.assertEqual([(r['name'], r['seconds']) for r in rows], [("Home task", 90), ("Work task", 1020)])
+
+    def test_results_cached_until_entries_change(self):
+        first = self.reports.time_per_category(period='month')
+        self.assertEqual([tuple(r) for r in self.reports.time_per_category(period='month')],
+                         [tuple(r) for r in first])
+        self.assertEqual(self.reports.cache_stats()["hits"], 1)
+
+        # Another range or grouping is a separate entry
+        self.reports.time_per_category(period='year')
+        self.assertEqual(self.reports.cache_stats()["misses"], 2)
+
+        timer = TimerController(self.db)
+        timer.start(self.home)
+        timer._state.segment_start_ns -= 30 * NS_PER_SECOND
+        timer.stop()
+
+        self.assertEqual(self.reports.cache_stats()["size"], 0)
+        total = sum(r['seconds'] for r in self.reports.time_per_category(period='month'))
+        self.assertEqual(total, 1110 + 30)
+
+    def test_completion_velocity(self):
+        self.tasks.update_task(self.work, completed=True)
+        self.db.execute("UPDATE tasks SET completed_at = '2025-03-05 10:00:00' WHERE id = ?", (self.work,))
+        other = self.tasks.create_task("Imported")
+        self.tasks.update_tasks([other, self.home], completed=True)
+        self.tasks.update_task(self.home, completed=False)
+
+        today = self.db.execute("SELECT date('now', 'localtime')", fetchone=True)[0]
+        rows = self.reports.completion_velocity(period='day')
+        self.assertEqual([tuple(r) for r in rows], [("2025-03-05", 1), (today, 1)])
+        self.assertIsNone(self.tasks.get_task(self.home)['completed_at'])
+
+    def test_deadline_adherence(self):
+        late = self.tasks.create_task("Late", deadline="2025-01-10")
+        on_time = self.tasks.create_task("On time", deadline="2025-01-20")
+        self.tasks.create_task("Overdue", deadline="2025-01-31")
+        self.tasks.create_task("Pending", deadline="2999-01-01")
+        self.tasks.update_tasks([late, on_time], completed=True)
+        self.db.executemany("UPDATE tasks SET completed_at = ? WHERE id = ?",
+                            [("2025-01-12 09:00:00", late), ("2025-01-20 18:00:00", on_time)])
+
+        rows = self.reports.deadline_adherence(period='year')
+        self.assertEqual([tuple(r) for r in rows], [("2025", 1, 1, 1, 0), ("2999", 0, 0, 0, 1)])
+
+    def test_completion_days_in_local_time(self):
+        # UTC+10: completed at 20:00 UTC is the next morning locally
+        self.use_timezone("Etc/GMT-10")
+        task_id = self.tasks.create_task("Late at night", deadline="2025-03-05")
+        self.tasks.update_task(task_id, completed=True)
+        self.db.execute("UPDATE tasks SET completed_at = '2025-03-05 20:00:00' WHERE id = ?", (task_id,))
+
+        rows = self.reports.completion_velocity(start="2025-03-06", end="2025-03-07", period='day')
+        self.assertEqual([tuple(r) for r in rows], [("2025-03-06", 1)])
+        self.assertEqual(self.reports.completion_velocity(end="2025-03-06"), [])
+        rows = self.reports.deadline_adherence(period='all')
+        self.assertEqual([tuple(r) for r in rows], [("all", 0, 1, 0, 0)])
+
+    def use_timezone(self, name):
+        """Switch the process (and SQLite's 'localtime') to another timezone for this test"""
+        previous = os.environ.get("TZ")
+        os.environ["TZ"] = name
+        time.tzset()
+
+        def restore():
+            if previous is None:
+                del os.environ["TZ"]
+            else:
+                os.environ["TZ"] = previous
+            time.tzset()
+        self.addCleanup(restore)
+
+    def test_build_chart(self):
+        chart = build_chart("Time per category", self.reports.time_per_category(period='all'))
+        self.assertEqual(chart["labels"], ["Work", "Home"])
+        self.assertEqual(chart["series"][0][2], [1020, 90])
+        self.assertTrue(chart["seconds"])
+
+        chart = build_chart("Deadline adherence", [])
+        self.assertEqual(len(chart["series"]), 4)
+        self.assertEqual(chart["labels"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
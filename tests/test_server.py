@@ -0,0 +1,205 @@
+import asyncio
+import http.client
+import json
+import os
+import tempfile
+import threading
+import unittest
+from urllib.parse import quote
+
+from app.controllers.timer_controller import TimerRegistry
+from app.models.database import Database
+from app.models.executor import DbExecutor
+from app.server import ApiServer
+
+
+class ApiServerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.tmp.name, "api.db"), profile="wal")
+        self.executor = DbExecutor(self.db)
+        self.server = ApiServer(self.db, self.executor)
+
+        # Run the server's event loop in a background thread
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.port = self.call(self.server.start("127.0.0.1", 0))
+        self.conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+
+    def tearDown(self):
+        self.conn.close()
+        self.call(self.server.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+        self.executor.shutdown()
+        self.db.close()
+        self.tmp.cleanup()
+
+    def call(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(timeout=5)
+
+    def request(self, method, path, body=None, headers=None):
+        """Send a request on the keep-alive connection; return (status, json, headers)"""
+        payload = json.dumps(body) if body is not None else None
+        self.conn.request(method, path, body=payload, headers=headers or {})
+        response = self.conn.getresponse()
+        data = response.read()
+        return response.status, json.loads(data) if data else None, response
+
+    def test_task_crud(self):
+        status, created, _ = self.request("POST", "/tasks", {"name": "From editor", "category": "Work"})
+        self.assertEqual(status, 201)
+        task_id = created["id"]
+
+        status, task, _ = self.request("GET", f"/tasks/{task_id}")
+        self.assertEqual((status, task["name"]), (200, "From editor"))
+
+        status, result, _ = self.request("PATCH", f"/tasks/{task_id}", {"completed": True, "id": 99})
+        self.assertEqual((status, result), (200, {"changed": True}))
+
+        self.assertEqual(self.request("DELETE", f"/tasks/{task_id}")[0], 204)
+        self.assertEqual(self.request("GET", f"/tasks/{task_id}")[0], 404)
+
+    def test_errors(self):
+        self.assertEqual(self.request("POST", "/tasks", {"name": ""})[0], 400)
+        self.assertEqual(self.request("GET", "/nowhere")[0], 404)
+        self.assertEqual(self.request("PUT", "/tasks")[0], 405)
+        self.assertEqual(self.request("GET", "/tasks?sort=colour")[0], 400)
+        self.assertEqual(self.request("POST", "/timers/1/stop")[0], 409)
+
+    def raw_request(self, head):
+        """Send raw request bytes on a new connection; return the status code"""
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+        try:
+            conn.connect()
+            conn.sock.sendall(head)
+            response = http.client.HTTPResponse(conn.sock)
+            response.begin()
+            response.read()
+            return response.status
+        finally:
+            conn.close()
+
+    def test_invalid_content_length(self):
+        for length in (b"abc", b"-5", b"1e3", b" 4 2"):
+            request = b"POST /tasks HTTP/1.1\r\nContent-Length: " + length + b"\r\n\r\n{}"
+            self.assertEqual(self.raw_request(request), 400, length)
+        too_long = f"POST /tasks HTTP/1.1\r\nContent-Length: {10 ** 12}\r\n\r\n".encode()
+        self.assertEqual(self.raw_request(too_long), 413)
+        self.assertEqual(self.request("GET", "/tasks")[0], 200)
+
+    def test_list_pages_and_search(self):
+        for i in range(5):
+            self.request("POST", "/tasks", {"name": f"Task {i}"})
+
+        status, page, _ = self.request("GET", "/tasks?limit=3")
+        self.assertEqual([task["name"] for task in page["tasks"]], ["Task 0", "Task 1", "Task 2"])
+        status, page, _ = self.request("GET", "/tasks?limit=3&after=" + quote(json.dumps(page["next"])))
+        self.assertEqual([task["name"] for task in page["tasks"]], ["Task 3", "Task 4"])
+        self.assertIsNone(page["next"])
+
+        status, page, _ = self.request("GET", "/tasks?q=task&limit=2")
+        self.assertEqual(len(page["tasks"]), 2)
+
+        for cursor in ('[["nested"], 1]', '[{"a": 1}, 1]', '{"a": 1}', 'not json', '[]', '["Task 1"]'):
+            self.assertEqual(self.request("GET", "/tasks?after=" + quote(cursor))[0], 400, cursor)
+        self.assertEqual(self.request("GET", "/tasks?sort=deadline&after=" + quote('[0, null, "a", 1]'))[0], 200)
+        self.assertEqual(self.request("GET", "/tasks/1/notes?after=" + quote('["2025-01-01", 1, 2]'))[0], 400)
+
+        for path in ("/tasks", "/tasks/1/notes"):
+            self.assertEqual(self.request("GET", f"{path}?limit=0")[0], 400)
+            self.assertEqual(self.request("GET", f"{path}?limit=-1")[0], 400)
+        status, page, _ = self.request("GET", f"/tasks?limit={10 ** 6}")
+        self.assertEqual((status, len(page["tasks"])), (200, 5))
+
+    def test_task_fields_validated(self):
+        for body in ({"name": 5}, {"name": None}, {"name": "Ok", "priority": "yes"}, {"name": "Ok", "category": 3}):
+            self.assertEqual(self.request("POST", "/tasks", body)[0], 400, body)
+        _, created, _ = self.request("POST", "/tasks", {"name": "Valid", "priority": True})
+        task_id = created["id"]
+
+        for body in ({"name": None}, {"name": ""}, {"name": "   "}, {"name": 5}, {"completed": "no"}):
+            self.assertEqual(self.request("PATCH", f"/tasks/{task_id}", body)[0], 400, body)
+        _, task, _ = self.request("GET", f"/tasks/{task_id}")
+        self.assertEqual((task["name"], task["priority"], task["completed"]), ("Valid", 1, 0))
+
+    def test_etag_until_data_changes(self):
+        self.request("POST", "/tasks", {"name": "Polled"})
+        status, _, response = self.request("GET", "/tasks")
+        etag = response.getheader("ETag")
+        self.assertEqual(status, 200)
+
+        status, body, _ = self.request("GET", "/tasks", headers={"If-None-Match": etag})
+        self.assertEqual((status, body), (304, None))
+        self.assertEqual(self.server.not_modified, 1)
+
+        # A change made outside the server (another connection) is noticed too
+        other = Database(self.db.db_path)
+        other.execute("INSERT INTO tasks (name) VALUES ('Elsewhere')")
+        other.close()
+        status, body, _ = self.request("GET", "/tasks", headers={"If-None-Match": etag})
+        self.assertEqual(status, 200)
+        self.assertEqual(len(body["tasks"]), 2)
+
+    def test_identical_reads_coalesced(self):
+        self.request("POST", "/tasks", {"name": "Shared"})
+        gate = threading.Event()
+        calls = []
+
+        def slow_page(**kwargs):
+            calls.append(kwargs)
+            gate.wait(5)
+            return []
+
+        async def concurrent_reads():
+            reads = [asyncio.ensure_future(self.server._read(slow_page, limit=10)) for _ in range(5)]
+            await asyncio.sleep(0.05)
+            gate.set()
+            return await asyncio.gather(*reads)
+
+        self.assertEqual(self.call(concurrent_reads()), [[]] * 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.server.coalesced, 4)
+
+    def test_timers_notes_and_reports(self):
+        _, created, _ = self.request("POST", "/tasks", {"name": "Timed"})
+        task_id = created["id"]
+
+        status, result, _ = self.request("POST", f"/timers/{task_id}/start")
+        self.assertEqual(status, 200)
+        self.assertTrue(result["timers"][0]["running"])
+        _, result, _ = self.request("GET", "/timers")
+        self.assertEqual(result["timers"][0]["task_id"], task_id)
+        status, result, _ = self.request("POST", f"/timers/{task_id}/stop")
+        self.assertEqual((status, result["task_id"]), (200, task_id))
+        self.assertEqual(self.request("GET", "/timers")[1], {"timers": []})
+
+        self.assertEqual(self.request("POST", f"/tasks/{task_id}/notes", {"content": "Remember"})[0], 201)
+        _, notes, _ = self.request("GET", f"/tasks/{task_id}/notes")
+        self.assertEqual(notes["notes"][0]["preview"], "Remember")
+
+        status, report, _ = self.request("GET", "/reports/task")
+        self.assertEqual(status, 200)
+        self.assertEqual(report["rows"][0]["name"], "Timed")
+        self.assertEqual(self.request("GET", "/reports/bogus")[0], 404)
+
+    def test_start_leaves_timers_of_running_processes(self):
+        task_id = self.db.execute("INSERT INTO tasks (name) VALUES ('In the GUI')")
+        gui = TimerRegistry(self.db)
+        entry_id = gui.start(task_id)
+
+        other = ApiServer(self.db, self.executor)
+        self.call(other.start("127.0.0.1", 0))
+        self.assertEqual(len(other.timers), 0)
+        self.call(other.close())
+
+        self.assertGreaterEqual(gui.stop(task_id), 0)
+        entries = self.db.execute("SELECT id FROM time_entries", fetchall=True)
+        self.assertEqual([entry["id"] for entry in entries], [entry_id])
+        self.assertEqual(self.db.execute("SELECT SUM(entries) FROM daily_rollups", fetchone=True)[0], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
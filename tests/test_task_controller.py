@@ -0,0 +1,437 @@
+import json
+import os
+import re
+import tempfile
+import unittest
+
+from app.controllers.export_controller import ExportController
+from app.controllers.report_controller import ReportController
+from app.controllers.task_controller import TaskController, SORT_ORDERS, SORT_KEYS
+from app.controllers.timer_controller import NS_PER_SECOND, TimerController, TimerRegistry
+from app.models.database import Database
+
+
+class RecordingDatabase(Database):
+    """Database that remembers every statement the controllers run"""
+
+    def __init__(self, *args, **kwargs):
+        self.recorded = []
+        super().__init__(*args, **kwargs)
+
+    def execute(self, query, params=(), fetchone=False, fetchall=False):
+        self.recorded.append((query, tuple(params)))
+        return super().execute(query, params, fetchone=fetchone, fetchall=fetchall)
+
+    def executemany(self, query, seq_of_params):
+        seq_of_params = list(seq_of_params)
+        if seq_of_params:
+            self.recorded.append((query, tuple(seq_of_params[0])))
+        return super().executemany(query, seq_of_params)
+
+
+# A plan step that reads a whole table without an index, or sorts in a temp b-tree
+FULL_SCAN = re.compile(r"^SCAN \w+$|USE TEMP B-TREE")
+
+# Reports sort their (small) aggregated output, so only table scans count there
+TABLE_SCAN = re.compile(r"^SCAN \w+$")
+
+
+class TaskControllerTest(unittest.TestCase):
+    def setUp(self):
+        self.db = Database(":memory:")
+        self.controller = TaskController(self.db)
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_create_task_logs_history(self):
+        task_id = self.controller.create_task("Write report", category="Work")
+
+        task = self.controller.get_task(task_id)
+        self.assertEqual(task['name'], "Write report")
+        history = self.controller.get_task_history(task_id)
+        self.assertEqual([h['field_name'] for h in history], ["creation"])
+
+    def test_create_task_requires_name(self):
+        with self.assertRaises(ValueError):
+            self.controller.create_task("   ")
+
+    def test_update_task_records_each_field(self):
+        task_id = self.controller.create_task("Old name")
+
+        self.assertTrue(self.controller.update_task(task_id, name="New name", priority=True))
+
+        task = self.controller.get_task(task_id)
+        self.assertEqual(task['name'], "New name")
+        self.assertEqual(task['priority'], 1)
+        fields = sorted(h['field_name'] for h in self.controller.get_task_history(task_id))
+        self.assertEqual(fields, ["creation", "name", "priority"])
+
+    def test_delete_task_cascades(self):
+        task_id = self.controller.create_task("Temporary")
+        self.controller.delete_task(task_id)
+
+        self.assertIsNone(self.controller.get_task(task_id))
+        self.assertEqual(self.controller.get_task_history(task_id), [])
+
+    def test_update_task_skips_unchanged_fields(self):
+        task_id = self.controller.create_task("Same", category="Work")
+
+        self.assertFalse(self.controller.update_task(task_id, name="Same", category="Work", priority=False))
+        self.assertEqual(len(self.controller.get_task_history(task_id)), 1)
+
+    def test_update_task_validates_name(self):
+        task_id = self.controller.create_task("Named")
+
+        for name in (None, "", "   ", "x" * 201):
+            with self.assertRaises(ValueError):
+                self.controller.update_task(task_id, name=name)
+            with self.assertRaises(ValueError):
+                self.controller.update_tasks([task_id], name=name)
+        self.assertTrue(self.controller.update_task(task_id, name="  Renamed "))
+        self.assertEqual(self.controller.get_task(task_id)['name'], "Renamed")
+
+
+class TaskCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.db = Database(":memory:")
+        self.controller = TaskController(self.db, cache_size=2)
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_repeated_reads_hit_cache(self):
+        task_id = self.controller.create_task("Cached")
+        self.controller.get_task(task_id)
+        self.controller.get_task(task_id)
+
+        self.assertEqual(self.controller.cache_stats(), {"hits": 1, "misses": 1, "size": 1})
+
+    def test_update_and_timer_invalidate(self):
+        task_id = self.controller.create_task("Cached")
+        self.controller.update_task(task_id, name="Renamed")
+        self.assertEqual(self.controller.get_task(task_id)['name'], "Renamed")
+
+        timer = TimerController(self.db)
+        timer.start(task_id)
+        timer._state.segment_start_ns -= 42 * NS_PER_SECOND  # Pretend 42 seconds were tracked
+        timer.stop()
+        self.assertEqual(self.controller.get_task(task_id)['total_time'], 42)
+
+    def test_delete_invalidates(self):
+        task_id = self.controller.create_task("Doomed")
+        self.controller.get_task(task_id)
+        self.controller.delete_task(task_id)
+
+        self.assertIsNone(self.controller.get_task(task_id))
+
+    def test_cache_is_bounded(self):
+        ids = [self.controller.create_task(f"task {i}") for i in range(3)]
+        for task_id in ids:
+            self.controller.get_task(task_id)
+
+        self.assertEqual(self.controller.cache_stats()["size"], 2)
+        self.controller.get_task(ids[0])  # Evicted as least recently used
+        self.assertEqual(self.controller.cache_misses, 4)
+
+
+class BatchOperationsTest(unittest.TestCase):
+    def setUp(self):
+        self.db = Database(":memory:")
+        self.controller = TaskController(self.db)
+
+    def tearDown(self):
+        self.db.close()
+
+    def statements(self, func, *args, **kwargs):
+        """Run func and return (result, SQL statements it executed)"""
+        statements = []
+        self.db.conn.set_trace_callback(statements.append)
+        try:
+            return func(*args, **kwargs), statements
+        finally:
+            self.db.conn.set_trace_callback(None)
+
+    def test_create_tasks(self):
+        ids, statements = self.statements(self.controller.create_tasks,
+                                          [{"name": f"task {i}", "priority": i % 2} for i in range(1200)])
+
+        self.assertEqual(len(ids), 1200)
+        self.assertEqual(sum(s.startswith("BEGIN") for s in statements), 1)
+        self.assertEqual(self.controller.get_task(ids[7])['name'], "task 7")
+        self.assertEqual([h['field_name'] for h in self.controller.get_task_history(ids[-1])], ["creation"])
+
+    def test_create_tasks_validates_before_writing(self):
+        with self.assertRaises(ValueError):
+            self.controller.create_tasks([{"name": "ok"}, {"name": " "}])
+        self.assertEqual(self.controller.get_all_tasks(), [])
+
+    def test_update_tasks(self):
+        ids = self.controller.create_tasks([{"name": f"task {i}"} for i in range(1200)])
+        self.controller.update_task(ids[0], completed=True)
+        self.controller.get_task(ids[1])  # Cached row must not go stale
+
+        changed, statements = self.statements(self.controller.update_tasks, ids, completed=True, category="Bulk")
+
+        self.assertEqual(changed, 1200)
+        self.assertEqual(sum(s.startswith("BEGIN") for s in statements), 1)
+        self.assertEqual(self.controller.get_task(ids[1])['category'], "Bulk")
+        self.assertTrue(all(t['completed'] for t in self.controller.get_tasks(ids)))
+        fields = [h['field_name'] for h in self.controller.get_task_history(ids[0])]
+        self.assertEqual(fields.count("completed"), 1)  # Already completed: only category changed
+        self.assertEqual(self.controller.update_tasks(ids, completed=True), 0)
+
+    def test_update_and_delete_require_existing_tasks(self):
+        ids = self.controller.create_tasks([{"name": "a"}, {"name": "b"}])
+
+        with self.assertRaises(ValueError):
+            self.controller.update_tasks(ids + [999], priority=True)
+        with self.assertRaises(ValueError):
+            self.controller.delete_tasks(ids + [999])
+        self.assertEqual(len(self.controller.get_tasks(ids)), 2)
+        self.assertFalse(any(t['priority'] for t in self.controller.get_tasks(ids)))
+
+    def test_delete_tasks(self):
+        ids = self.controller.create_tasks([{"name": f"task {i}"} for i in range(1200)])
+        self.controller.get_task(ids[0])
+
+        self.assertEqual(self.controller.delete_tasks(ids[:1000]), 1000)
+        self.assertIsNone(self.controller.get_task(ids[0]))
+        self.assertEqual(len(self.controller.get_all_tasks()), 200)
+
+
+class SearchTest(unittest.TestCase):
+    def setUp(self):
+        self.db = Database(":memory:")
+        self.controller = TaskController(self.db)
+        self.report = self.controller.create_task("Final report", description="Quarterly numbers")
+        self.school = self.controller.create_task("School", description="Sign the report card")
+        self.misc = self.controller.create_task("Misc")
+        self.db.execute("INSERT INTO notes (task_id, content) VALUES (?, ?)",
+                        (self.misc, "Reporting deadline moved"))
+
+    def tearDown(self):
+        self.db.close()
+
+    def names(self, *args, **kwargs):
+        return [task['name'] for task in self.controller.search(*args, **kwargs)]
+
+    def test_prefix_match_ranks_names_first(self):
+        self.assertEqual(self.names("rep"), ["Final report", "School", "Misc"])
+        self.assertEqual(self.names("rep fin"), ["Final report"])
+        self.assertEqual(self.names("quarter"), ["Final report"])
+
+    def test_index_follows_changes(self):
+        self.controller.update_task(self.report, name="Draft memo")
+        self.controller.delete_task(self.school)
+        self.db.execute("DELETE FROM notes")
+
+        self.assertEqual(self.names("memo"), ["Draft memo"])
+        self.assertEqual(self.names("final"), [])
+        self.assertEqual(self.names("card"), [])
+        self.assertEqual(self.names("deadline"), [])
+
+    def test_filters_and_odd_input(self):
+        self.controller.update_task(self.school, completed=True)
+
+        self.assertEqual(self.names("report", completed=False), ["Final report", "Misc"])
+        self.assertEqual(self.names("report", limit=1), ["Final report"])
+        self.assertEqual(self.names('"NEAR( OR*'), [])
+        self.assertEqual(self.names("  "), [])
+
+
+class PaginationTest(unittest.TestCase):
+    def setUp(self):
+        self.db = Database(":memory:")
+        self.controller = TaskController(self.db)
+        # Duplicate names and NULL categories/deadlines exercise the tie-breakers
+        rows = []
+        for i in range(97):
+            rows.append((f"task {i % 13}",
+                         None if i % 4 == 0 else f"cat {i % 3}",
+                         None if i % 5 == 0 else f"2025-0{1 + i % 9}-1{i % 7}",
+                         i % 2 == 0,
+                         i % 3 == 0))
+        self.db.executemany(
+            "INSERT INTO tasks (name, category, deadline, priority, completed) VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+
+    def tearDown(self):
+        self.db.close()
+
+    def walk(self, sort_by, completed, direction, start=None):
+        """Collect task ids page by page, following cursors in one direction"""
+        seen = []
+        cursor = start
+        while True:
+            page = self.controller.get_tasks_page(completed=completed, sort_by=sort_by,
+                                                  limit=10, **{direction: cursor})
+            if not page:
+                return seen
+            if direction == "after":
+                seen.extend(t['id'] for t in page)
+                cursor = self.controller.sort_cursor(page[-1], sort_by)
+            else:
+                seen[:0] = [t['id'] for t in page]
+                cursor = self.controller.sort_cursor(page[0], sort_by)
+
+    def test_pages_forward_and_backward(self):
+        for sort_by in SORT_KEYS:
+            for completed in (None, True, False):
+                everything = self.controller.get_tasks_page(completed=completed, sort_by=sort_by, limit=1000)
+                expected = [t['id'] for t in everything]
+
+                self.assertEqual(self.walk(sort_by, completed, "after"), expected)
+
+                last = self.controller.sort_cursor(everything[-1], sort_by)
+                self.assertEqual(self.walk(sort_by, completed, "before", last), expected[:-1])
+
+    def test_order_matches_list_queries(self):
+        for sort_by in SORT_KEYS:
+            listed = self.controller.get_all_tasks(sort_by=sort_by)
+            paged = self.controller.get_tasks_page(sort_by=sort_by, limit=1000)
+            key = lambda t: self.controller.sort_cursor(t, sort_by)[:-1]
+            self.assertEqual([key(t) for t in listed], [key(t) for t in paged])
+
+
+class OwnerTest(unittest.TestCase):
+    """Tasks and timers are partitioned by user"""
+
+    def setUp(self):
+        self.db = Database(":memory:")
+        self.alice = TaskController(self.db, owner="alice")
+        self.bob = TaskController(self.db, owner="bob")
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_tasks_only_visible_to_owner(self):
+        task_id = self.alice.create_task("Alice's task", description="private")
+        self.bob.create_tasks([{"name": "Bob's task"}])
+
+        self.assertEqual([t['name'] for t in self.alice.get_all_tasks()], ["Alice's task"])
+        self.assertEqual([t['name'] for t in self.bob.get_tasks_page()], ["Bob's task"])
+        self.assertEqual(self.bob.search("private"), [])
+        self.assertIsNone(self.bob.get_task(task_id))
+        with self.assertRaises(ValueError):
+            self.bob.update_task(task_id, completed=True)
+
+        self.alice.update_task(task_id, priority=True)
+        users = {row['user'] for row in self.alice.get_task_history(task_id)}
+        self.assertEqual(users, {"alice"})
+        self.assertEqual(self.bob.get_task_history(task_id), [])
+
+    def test_reports_and_exports_only_cover_owner(self):
+        alice_task = self.alice.create_task("Alice's task", category="Private")
+        bob_task = self.bob.create_task("Bob's task", category="Work")
+        for owner, task_id in (("alice", alice_task), ("bob", bob_task)):
+            timers = TimerRegistry(self.db, owner=owner)
+            timers.start(task_id)
+            timers.get(task_id).segment_start_ns -= 60 * NS_PER_SECOND
+            timers.stop(task_id)
+
+        reports = ReportController(self.db, owner="bob")
+        self.assertEqual([row['name'] for row in reports.time_per_task(period="all")], ["Bob's task"])
+        self.assertEqual([row['category'] for row in reports.time_per_category(period="all")], ["Work"])
+        self.assertEqual(reports.time_per_period(period="all")[0]['seconds'], 60)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            files = ExportController(self.db, owner="bob").export(os.path.join(tmp, "bob.jsonl"))
+            for table, path in files.items():
+                with open(path, encoding="utf-8") as f:
+                    task_ids = {json.loads(line)["id" if table == "tasks" else "task_id"] for line in f}
+                self.assertEqual(task_ids, set() if table == "notes" else {bob_task}, table)
+
+    def test_recover_leaves_other_users_sessions(self):
+        task_id = self.alice.create_task("Timed by Alice")
+        alice_timers = TimerRegistry(self.db, owner="alice")
+        entry_id = alice_timers.start(task_id)
+
+        self.assertEqual(TimerRegistry(self.db, owner="bob").recover(), [])
+        self.assertEqual(TimerRegistry(self.db, owner="bob").stored_sessions(), [])
+        entry = self.db.execute("SELECT owner, end_time FROM time_entries WHERE id = ?", (entry_id,), fetchone=True)
+        self.assertEqual((entry['owner'], entry['end_time']), ("alice", None))
+        self.assertGreaterEqual(alice_timers.stop(task_id), 0)
+
+
+class QueryPlanTest(unittest.TestCase):
+    """Every controller query must be served by an index"""
+
+    def setUp(self):
+        self.db = RecordingDatabase(":memory:")
+        self.tasks = TaskController(self.db)
+        self.timer = TimerController(self.db)
+
+    def tearDown(self):
+        self.db.close()
+
+    def assertIndexed(self, pattern=FULL_SCAN):
+        self.assertTrue(self.db.recorded)
+        for query, params in self.db.recorded:
+            if not query.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+                continue
+            for step in self.db.explain(query, params):
+                self.assertNotRegex(step, pattern, f"Full scan in: {query}")
+
+    def test_task_list_queries(self):
+        for sort_by in SORT_ORDERS:
+            self.tasks.get_all_tasks(sort_by=sort_by)
+            self.tasks.get_all_tasks(include_completed=False, sort_by=sort_by)
+            self.tasks.get_filtered_tasks(completed=True, sort_by=sort_by)
+        self.tasks.get_filtered_tasks(priority=True)
+        self.tasks.get_filtered_tasks(category="Work")
+        self.assertIndexed()
+
+    def test_page_queries(self):
+        task_id = self.tasks.create_task("Anchor", category="Work", deadline="2025-01-01")
+        task = self.tasks.get_task(task_id)
+        for sort_by in SORT_KEYS:
+            cursor = self.tasks.sort_cursor(task, sort_by)
+            for completed in (None, False):
+                self.tasks.get_tasks_page(completed=completed, sort_by=sort_by, after=cursor)
+                self.tasks.get_tasks_page(completed=completed, sort_by=sort_by, before=cursor)
+        self.assertIndexed()
+
+    def test_single_task_queries(self):
+        task_id = self.tasks.create_task("Plan me", category="Work")
+        self.tasks.update_task(task_id, completed=True)
+        self.tasks.get_task_history(task_id)
+        self.timer.start(task_id)
+        self.timer.checkpoint(force=True)
+        self.timer.stop()
+        self.timer.recover()
+        self.tasks.delete_task(task_id)
+        self.assertIndexed()
+
+    def test_report_queries(self):
+        reports = ReportController(self.db)
+        for period in ReportController.PERIODS:
+            reports.time_per_task(start="2025-01-01", end="2025-02-01", period=period)
+            reports.time_per_category(start="2025-01-01", end="2025-02-01", period=period)
+            reports.time_per_period(start="2025-01-01", end="2025-02-01", period=period)
+            reports.completion_velocity(start="2025-01-01", end="2025-02-01", period=period)
+            reports.deadline_adherence(start="2025-01-01", end="2025-02-01", period=period)
+        reports.time_per_task(task_id=1)
+        self.assertIndexed(TABLE_SCAN)
+
+    def test_search_queries(self):
+        self.tasks.create_task("Searchable", description="Full text")
+        self.tasks.search("sea")
+        self.tasks.search("full text", completed=False)
+        # Ranked results are sorted by score in a temp b-tree
+        self.assertIndexed(TABLE_SCAN)
+
+    def test_foreign_keys_are_indexed(self):
+        # Without an index on the child column, ON DELETE CASCADE scans the table
+        for table in ("time_entries", "notes", "task_history", "time_segments"):
+            indexed_columns = set()
+            for index in self.db.execute(f"PRAGMA index_list({table})", fetchall=True):
+                first = self.db.execute(f"PRAGMA index_info({index['name']})", fetchall=True)[0]
+                indexed_columns.add(first['name'])
+            for fk in self.db.execute(f"PRAGMA foreign_key_list({table})", fetchall=True):
+                self.assertIn(fk['from'], indexed_columns, f"{table}.{fk['from']} is not indexed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+
+from app.views.gui.ticker import TickScheduler
+
+
+class FakeWidget:
+    """Records after() calls instead of running a Tk event loop"""
+
+    def __init__(self):
+        self.scheduled = {}
+        self.next_id = 0
+
+    def after(self, ms, callback):
+        self.next_id += 1
+        self.scheduled[self.next_id] = (ms, callback)
+        return self.next_id
+
+    def after_cancel(self, after_id):
+        del self.scheduled[after_id]
+
+    def run_next(self):
+        after_id = min(self.scheduled)
+        ms, callback = self.scheduled.pop(after_id)
+        callback()
+        return ms
+
+
+class FakeLabel:
+    def __init__(self):
+        self.configs = []
+
+    def config(self, text):
+        self.configs.append(text)
+
+
+class TickSchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.widget = FakeWidget()
+        self.ticker = TickScheduler(self.widget)
+        self.elapsed = {}
+        self.running = set()
+
+    def add(self, key, elapsed, running=True):
+        self.elapsed[key] = elapsed
+        if running:
+            self.running.add(key)
+        label = FakeLabel()
+        self.ticker.add(key, label, lambda: self.elapsed[key], lambda: key in self.running,
+                        lambda seconds: str(int(seconds)))
+        return label
+
+    def test_sleeps_when_nothing_runs(self):
+        label = self.add("paused", 12.5, running=False)
+
+        self.assertEqual(label.configs, ["12"])
+        self.assertTrue(self.ticker.idle)
+
+    def test_ticks_on_second_boundaries(self):
+        self.add("timer", 3.4)
+
+        self.assertEqual(self.widget.scheduled[max(self.widget.scheduled)][0], 601)
+
+    def test_only_changed_text_is_configured(self):
+        label = self.add("timer", 3.4)
+        self.elapsed["timer"] = 3.9
+        self.widget.run_next()
+        self.elapsed["timer"] = 4.0
+        self.widget.run_next()
+
+        self.assertEqual(label.configs, ["3", "4"])
+
+    def test_many_labels_share_wakeups(self):
+        labels = [self.add(i, 10 + i / 1000) for i in range(100)]
+
+        # All boundaries lie within the slack: one pending tick covers them
+        self.assertEqual(len(self.widget.scheduled), 1)
+        for key in self.elapsed:
+            self.elapsed[key] += 1
+        self.widget.run_next()
+        self.assertEqual(len(self.widget.scheduled), 1)
+        self.assertTrue(all(label.configs == ["10", "11"] for label in labels))
+
+    def test_wake_resumes_after_idle(self):
+        self.add("timer", 0.0, running=False)
+        self.assertTrue(self.ticker.idle)
+
+        self.running.add("timer")
+        self.ticker.wake()
+        self.assertFalse(self.ticker.idle)
+
+
+if __name__ == "__main__":
+    unittest.main()
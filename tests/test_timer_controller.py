@@ -0,0 +1,280 @@
+import time
+import unittest
+from unittest import mock
+
+from app.controllers.task_controller import TaskController
+from app.controllers.timer_controller import HEARTBEAT_MARGIN, NS_PER_SECOND, TimerController, TimerRegistry
+from app.models.database import Database
+
+
+class TimerControllerTest(unittest.TestCase):
+    def setUp(self):
+        self.db = Database(":memory:")
+        self.tasks = TaskController(self.db)
+        self.timer = TimerController(self.db)
+        self.task_id = self.tasks.create_task("Timed task")
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_start_twice_raises(self):
+        self.timer.start(self.task_id)
+        with self.assertRaises(RuntimeError):
+            self.timer.start(self.task_id)
+
+    def test_stop_updates_entry_task_and_history(self):
+        entry_id = self.timer.start(self.task_id)
+        duration = self.timer.stop()
+
+        entry = self.db.execute("SELECT * FROM time_entries WHERE id = ?", (entry_id,), fetchone=True)
+        self.assertIsNotNone(entry['end_time'])
+        self.assertEqual(entry['duration'], duration)
+        self.assertEqual(self.tasks.get_task(self.task_id)['total_time'], duration)
+        fields = [h['field_name'] for h in self.tasks.get_task_history(self.task_id)]
+        self.assertIn("total_time", fields)
+        self.assertFalse(self.timer.is_running)
+
+    def test_stop_without_start_raises(self):
+        with self.assertRaises(RuntimeError):
+            self.timer.stop()
+
+    def test_paused_task_resumes_same_entry(self):
+        entry_id = self.timer.start(self.task_id)
+        self.timer.pause()
+
+        self.assertEqual(self.timer.start(self.task_id), entry_id)
+        self.assertTrue(self.timer.is_running)
+        other = self.tasks.create_task("Other")
+        self.timer.pause()
+        with self.assertRaises(RuntimeError):
+            self.timer.start(other)
+
+    def test_pause_and_resume_store_segments(self):
+        entry_id = self.timer.start(self.task_id)
+        self.timer._state.segment_start_ns -= 5 * NS_PER_SECOND
+        self.timer.pause()
+        self.timer.resume()
+        self.timer._state.segment_start_ns -= 7 * NS_PER_SECOND
+        self.assertEqual(self.timer.stop(), 12)
+
+        segments = self.db.execute(
+            "SELECT duration_ns, ended_at FROM time_segments WHERE entry_id = ? ORDER BY id",
+            (entry_id,), fetchall=True
+        )
+        self.assertEqual(len(segments), 2)
+        self.assertTrue(all(s['ended_at'] is not None for s in segments))
+        self.assertEqual([s['duration_ns'] // NS_PER_SECOND for s in segments], [5, 7])
+        entry = self.db.execute("SELECT duration_ns FROM time_entries WHERE id = ?", (entry_id,), fetchone=True)
+        self.assertEqual(entry['duration_ns'], sum(s['duration_ns'] for s in segments))
+
+    def test_wall_clock_jump_does_not_change_duration(self):
+        self.timer.start(self.task_id)
+        self.timer._state.segment_start_ns -= 10 * NS_PER_SECOND
+        # Setting the system clock back an hour mid-session
+        with mock.patch("time.time", return_value=time.time() - 3600):
+            self.assertEqual(int(self.timer.get_elapsed_time()), 10)
+            self.assertEqual(self.timer.stop(), 10)
+
+    def test_format_time(self):
+        self.assertEqual(self.timer.format_time(3725), "01:02:05")
+
+
+class CheckpointRecoveryTest(unittest.TestCase):
+    def setUp(self):
+        self.db = Database(":memory:")
+        self.tasks = TaskController(self.db)
+        self.task_id = self.tasks.create_task("Crashy task")
+
+    def tearDown(self):
+        self.db.close()
+
+    def crash_after(self, seconds):
+        """Start a session, checkpoint it at `seconds` and drop the controller"""
+        timer = TimerController(self.db, checkpoint_interval=10)
+        entry_id = timer.start(self.task_id)
+        # Pretend the session has been running for a while
+        timer._state.segment_start_ns -= seconds * NS_PER_SECOND
+        timer._state.last_checkpoint -= seconds
+        self.assertTrue(timer.checkpoint())
+        self.assertFalse(timer.checkpoint())  # Not due again yet
+        self.go_stale()
+        return entry_id
+
+    def go_stale(self):
+        """Age the heartbeats of open sessions, as if their process had died"""
+        self.db.execute("UPDATE time_entries SET heartbeat = datetime(heartbeat, '-1 hour') "
+                        "WHERE end_time IS NULL")
+
+    def test_checkpoint_saves_elapsed_time(self):
+        entry_id = self.crash_after(42)
+
+        entry = self.db.execute("SELECT * FROM time_entries WHERE id = ?", (entry_id,), fetchone=True)
+        self.assertEqual(entry['duration'], 42)
+        self.assertIsNone(entry['end_time'])
+
+    def test_recover_closes_open_sessions(self):
+        entry_id = self.crash_after(42)
+
+        closed = TimerController(self.db).recover()
+
+        self.assertEqual(closed, [(entry_id, self.task_id, 42)])
+        entry = self.db.execute("SELECT * FROM time_entries WHERE id = ?", (entry_id,), fetchone=True)
+        self.assertIsNotNone(entry['end_time'])
+        self.assertEqual(self.tasks.get_task(self.task_id)['total_time'], 42)
+        self.assertEqual(TimerController(self.db).recover(), [])
+
+    def test_recover_closes_running_segment(self):
+        entry_id = self.crash_after(42)
+
+        TimerController(self.db).recover()
+
+        segments = self.db.execute(
+            "SELECT ended_at, duration_ns FROM time_segments WHERE entry_id = ?",
+            (entry_id,), fetchall=True
+        )
+        self.assertEqual(len(segments), 1)
+        self.assertIsNotNone(segments[0]['ended_at'])
+        self.assertEqual(segments[0]['duration_ns'] // NS_PER_SECOND, 42)
+
+    def test_recover_can_resume_latest_session(self):
+        entry_id = self.crash_after(42)
+
+        timer = TimerController(self.db)
+        self.assertEqual(timer.recover(resume=True), [])
+        self.assertEqual(timer.current_entry_id, entry_id)
+        self.assertEqual(int(timer.get_elapsed_time()), 42)
+
+        timer.start(self.task_id)
+        self.assertGreaterEqual(timer.stop(), 42)
+        self.assertGreaterEqual(self.tasks.get_task(self.task_id)['total_time'], 42)
+
+    def test_recover_leaves_live_sessions_alone(self):
+        live = TimerController(self.db, checkpoint_interval=10)
+        entry_id = live.start(self.task_id)
+        live.pause()
+
+        other = TimerController(self.db, checkpoint_interval=10)
+        self.assertEqual(other.recover(resume=True), [])
+        self.assertIsNone(other.current_entry_id)
+        with self.assertRaises(RuntimeError):
+            other.start(self.task_id)
+
+        # Past the interval and margin without a heartbeat it is up for grabs
+        self.db.execute("UPDATE time_entries SET heartbeat = datetime(heartbeat, ?)",
+                        (f"-{10 + HEARTBEAT_MARGIN + 5} seconds",))
+        self.assertEqual(other.recover(resume=True), [])
+        self.assertEqual(other.current_entry_id, entry_id)
+
+    def test_released_session_recovered_at_once(self):
+        gui = TimerController(self.db, checkpoint_interval=10)
+        entry_id = gui.start(self.task_id)
+        gui._state.segment_start_ns -= 20 * NS_PER_SECOND
+        self.assertTrue(gui.release())
+        self.assertIsNone(gui.current_entry_id)
+
+        # Reopened within the heartbeat interval: the session comes back paused
+        reopened = TimerController(self.db, checkpoint_interval=10)
+        self.assertEqual(reopened.recover(resume=True), [])
+        self.assertEqual(reopened.current_entry_id, entry_id)
+        self.assertTrue(reopened.is_paused)
+        self.assertEqual(int(reopened.get_elapsed_time()), 20)
+        reopened.start(self.task_id)
+        self.assertGreaterEqual(reopened.stop(), 20)
+
+    def test_released_session_closed_at_release(self):
+        timer = TimerController(self.db)
+        entry_id = timer.start(self.task_id)
+        timer.release()
+        released_at = self.db.execute("SELECT ended_at FROM time_segments", fetchone=True)[0]
+
+        self.assertEqual(TimerController(self.db).registry.recover(), [(entry_id, self.task_id, 0)])
+        entry = self.db.execute("SELECT end_time FROM time_entries", fetchone=True)
+        self.assertEqual(entry['end_time'], released_at)
+
+
+class TimerRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.db = Database(":memory:")
+        self.tasks = TaskController(self.db)
+        self.registry = TimerRegistry(self.db)
+        self.task_ids = [self.tasks.create_task(f"Kiosk task {i}") for i in range(5)]
+
+    def tearDown(self):
+        self.db.close()
+
+    def rewind(self, task_id, seconds):
+        """Pretend a running timer started `seconds` earlier"""
+        self.registry.get(task_id).segment_start_ns -= seconds * NS_PER_SECOND
+
+    def test_timers_run_concurrently(self):
+        entries = [self.registry.start(task_id) for task_id in self.task_ids]
+
+        self.assertEqual(len(set(entries)), len(self.task_ids))
+        self.assertEqual(self.registry.running_task_ids(), self.task_ids)
+        with self.assertRaises(RuntimeError):
+            self.registry.start(self.task_ids[0])
+
+    def test_only_own_tasks_can_be_timed(self):
+        with self.assertRaises(ValueError):
+            TimerRegistry(self.db, owner="bob").start(self.task_ids[0])
+        with self.assertRaises(ValueError):
+            self.registry.start(9999)
+        self.assertEqual(self.db.execute("SELECT COUNT(*) FROM time_entries", fetchone=True)[0], 0)
+
+    def test_elapsed_times_without_queries(self):
+        for i, task_id in enumerate(self.task_ids):
+            self.registry.start(task_id)
+            self.rewind(task_id, i * 10)
+        self.registry.pause(self.task_ids[1])
+
+        statements = []
+        self.db.conn.set_trace_callback(statements.append)
+        elapsed = self.registry.elapsed_times()
+        self.db.conn.set_trace_callback(None)
+
+        self.assertEqual(statements, [])
+        self.assertEqual({task_id: int(seconds) for task_id, seconds in elapsed.items()},
+                         {task_id: i * 10 for i, task_id in enumerate(self.task_ids)})
+
+    def test_stop_all_in_one_transaction(self):
+        for i, task_id in enumerate(self.task_ids):
+            self.registry.start(task_id)
+            self.rewind(task_id, i + 1)
+        self.registry.pause(self.task_ids[0])
+
+        statements = []
+        self.db.conn.set_trace_callback(statements.append)
+        durations = self.registry.stop_all()
+        self.db.conn.set_trace_callback(None)
+
+        self.assertEqual(durations, {task_id: i + 1 for i, task_id in enumerate(self.task_ids)})
+        self.assertEqual(sum(s.startswith("BEGIN") for s in statements), 1)
+        self.assertEqual(len(self.registry), 0)
+        for i, task_id in enumerate(self.task_ids):
+            self.assertEqual(self.tasks.get_task(task_id)['total_time'], i + 1)
+
+    def test_checkpoint_writes_only_due_timers(self):
+        for task_id in self.task_ids:
+            self.registry.start(task_id)
+        self.registry.get(self.task_ids[0]).last_checkpoint -= self.registry.checkpoint_interval
+
+        self.assertEqual(self.registry.checkpoint(), 1)
+        self.assertEqual(self.registry.checkpoint(), 0)
+        self.assertEqual(self.registry.checkpoint(force=True), len(self.task_ids))
+
+    def test_recover_resumes_every_task(self):
+        for task_id in self.task_ids[:3]:
+            self.registry.start(task_id)
+            self.rewind(task_id, 20)
+        self.registry.checkpoint(force=True)
+        self.db.execute("UPDATE time_entries SET heartbeat = datetime(heartbeat, '-1 hour')")
+
+        registry = TimerRegistry(self.db)
+        self.assertEqual(registry.recover(resume=True), [])
+        self.assertEqual(registry.active_task_ids(), self.task_ids[:3])
+        self.assertEqual(registry.running_task_ids(), [])
+        self.assertEqual(int(registry.elapsed_time(self.task_ids[0])), 20)
+
+
+if __name__ == "__main__":
+    unittest.main()